@@ -1,55 +1,94 @@
-"""Main application entry point for the Project Manager backend."""
+"""Main application entry point for the Project Manager backend.
+
+``create_app(config)`` builds an app; nothing is built at import time. Blueprint
+modules are imported inside the factory, and the optional ones (GitHub, iCal,
+attachments — GitHub pulls in ``requests``) only when listed in
+``OPTIONAL_BLUEPRINTS``. ``app.app`` is still available (built on first access)
+for ``gunicorn app:app`` and ``from app import app``.
+"""
+from importlib import import_module
 from flask import Flask
 from flask_cors import CORS
+from config import Config
 from models import db
-from routes.auth import auth_bp
-from routes.projects import projects_bp
-from routes.tasks import tasks_bp
-from routes.github import github_bp
-from routes.sprints import sprints_bp
-from routes.analytics import analytics_bp
-from routes.notifications import notifications_bp
-from routes.profile import profile_bp
-from routes.comments import comments_bp
-from routes.labels import labels_bp
-from routes.time_tracking import time_tracking_bp
-from routes.attachments import attachments_bp
-from routes.templates import templates_bp
-from routes.ical import ical_bp
-
-app = Flask(__name__)
-# Enable CORS for frontend integration
-CORS(app)
-
-# Configure SQLite database
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///project_manager.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SECRET_KEY'] = 'your-super-secret-key' # In production, use environment variable
-
-db.init_app(app)
-
-# Register Blueprints
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(projects_bp, url_prefix='/api/projects')
-app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
-app.register_blueprint(github_bp, url_prefix='/api/github')
-app.register_blueprint(sprints_bp, url_prefix='/api/sprints')
-app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
-app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
-app.register_blueprint(profile_bp, url_prefix='/api/profile')
-app.register_blueprint(comments_bp, url_prefix='/api/comments')
-app.register_blueprint(labels_bp, url_prefix='/api/labels')
-app.register_blueprint(time_tracking_bp, url_prefix='/api/time')
-app.register_blueprint(attachments_bp, url_prefix='/api/attachments')
-app.register_blueprint(templates_bp, url_prefix='/api/templates')
-app.register_blueprint(ical_bp, url_prefix='/api/ical')
-
-@app.route("/")
+from services.database import init_db
+from services.metrics import init_metrics
+
+# (module, blueprint attribute, url prefix)
+CORE_BLUEPRINTS = (
+    ('routes.auth', 'auth_bp', '/api/auth'),
+    ('routes.projects', 'projects_bp', '/api/projects'),
+    ('routes.tasks', 'tasks_bp', '/api/tasks'),
+    ('routes.sprints', 'sprints_bp', '/api/sprints'),
+    ('routes.analytics', 'analytics_bp', '/api/analytics'),
+    ('routes.notifications', 'notifications_bp', '/api/notifications'),
+    ('routes.profile', 'profile_bp', '/api/profile'),
+    ('routes.comments', 'comments_bp', '/api/comments'),
+    ('routes.labels', 'labels_bp', '/api/labels'),
+    ('routes.time_tracking', 'time_tracking_bp', '/api/time'),
+    ('routes.templates', 'templates_bp', '/api/templates'),
+    ('routes.jobs', 'jobs_bp', '/api/jobs'),
+)
+OPTIONAL_BLUEPRINTS = {
+    'github': ('routes.github', 'github_bp', '/api/github'),
+    'ical': ('routes.ical', 'ical_bp', '/api/ical'),
+    'attachments': ('routes.attachments', 'attachments_bp', '/api/attachments'),
+}
+
 def home():
     """Health check endpoint to verify backend is running."""
     return "Backend Running!"
 
+def create_app(config=None):
+    """Build an app from ``Config`` plus ``config`` (a mapping or config class)."""
+    app = Flask(__name__)
+    # Database URL, secret and engine tuning come from the environment (see config.py)
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+
+    # Enable CORS for frontend integration
+    CORS(app)
+    init_db(app)
+    init_metrics(app)
+
+    enabled = app.config['OPTIONAL_BLUEPRINTS']
+    unknown = set(enabled) - OPTIONAL_BLUEPRINTS.keys()
+    if unknown:
+        raise ValueError(f"Unknown optional blueprints: {', '.join(sorted(unknown))}")
+    specs = list(CORE_BLUEPRINTS) + [OPTIONAL_BLUEPRINTS[name] for name in enabled]
+    for module, attr, prefix in specs:
+        app.register_blueprint(getattr(import_module(module), attr), url_prefix=prefix)
+
+    app.add_url_rule('/', 'home', home)
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create missing tables/indexes and fail jobs left over from a previous run."""
+        from migrate import upgrade
+        from services.jobs import fail_interrupted_jobs
+        upgrade()
+        fail_interrupted_jobs()
+
+    return app
+
+_app = None
+
+def __getattr__(name):
+    # Module-level ``app`` for WSGI servers and scripts, built on first access
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(name)
+
 if __name__ == "__main__":
+    from services.jobs import fail_interrupted_jobs
+    app = create_app()
     with app.app_context():
         db.create_all()
-    app.run(debug=True, port=5001)
\ No newline at end of file
+        fail_interrupted_jobs()
+    app.run(debug=True, port=5001)
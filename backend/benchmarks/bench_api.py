@@ -0,0 +1,145 @@
+"""Latency and query counts of the key API endpoints against a seeded dataset.
+
+Usage (from backend/):
+    python benchmarks/bench_api.py [--scale medium] [--runs 30] [--save out.json] [--compare baseline.json]
+
+Seeds a throwaway SQLite file with ``seed_data.generate`` and drives the real
+app through the Flask test client as the hot project's owner. For each endpoint
+it reports the first (cold-cache) request, then p50/p95 over ``runs`` warm
+requests and the SQL statements per request. ``--save`` writes the results as
+JSON; ``--compare`` exits non-zero when an endpoint issues more statements than
+the baseline or its p95 exceeds the baseline by more than ``--tolerance``
+(default 1.5x), so it can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import event
+from models import db
+from seed_data import generate, PASSWORD
+
+# name -> URL; {project}, {sprint} are filled from the seeded dataset
+ENDPOINTS = {
+    'get_tasks (board)': '/api/tasks/project/{project}',
+    'get_tasks (page)': '/api/tasks/project/{project}?limit=50',
+    'get_project_stats': '/api/analytics/project/{project}/stats',
+    'get_burndown': '/api/analytics/project/{project}/burndown?sprint_id={sprint}',
+    'export_project_ical': '/api/ical/project/{project}',
+    'get_notifications': '/api/notifications/',
+    'get_projects': '/api/projects',
+}
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+class _StatementCounter:
+    def __init__(self, engines):
+        self.count = 0
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def close(self, engines):
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', self._on_execute)
+
+def _request(client, counter, url, headers):
+    counter.count = 0
+    start = time.perf_counter()
+    res = client.get(url, headers=headers)
+    res.get_data()  # drain streamed bodies (iCal) inside the timing
+    elapsed = (time.perf_counter() - start) * 1000
+    if res.status_code != 200:
+        raise RuntimeError(f'GET {url} -> {res.status_code}')
+    return elapsed, counter.count
+
+def measure(app, dataset, runs=30, endpoints=None):
+    """Time every endpoint; returns {name: {cold_ms, p50_ms, p95_ms, queries}}."""
+    client = app.test_client()
+    res = client.post('/api/auth/login', json={'username': dataset['username'], 'password': PASSWORD})
+    headers = {'Authorization': f"Bearer {res.get_json()['token']}"}
+    engines = list(db.engines.values())
+    counter = _StatementCounter(engines)
+    results = {}
+    try:
+        for name, template in (endpoints or ENDPOINTS).items():
+            url = template.format(project=dataset['project_id'], sprint=dataset['sprint_id'])
+            cold, _ = _request(client, counter, url, headers)
+            samples = [_request(client, counter, url, headers) for _ in range(runs)]
+            latencies = [ms for ms, _ in samples]
+            results[name] = {
+                'cold_ms': round(cold, 2),
+                'p50_ms': round(statistics.median(latencies), 2),
+                'p95_ms': round(_percentile(latencies, .95), 2),
+                'queries': max(q for _, q in samples),
+            }
+    finally:
+        counter.close(engines)
+    return results
+
+def _regressions(results, baseline, tolerance):
+    problems = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        if now['queries'] > before['queries']:
+            problems.append(f"{name}: {now['queries']} statements (baseline {before['queries']})")
+        if now['p95_ms'] > before['p95_ms'] * tolerance:
+            problems.append(f"{name}: p95 {now['p95_ms']:.1f} ms (baseline {before['p95_ms']:.1f} ms)")
+    return problems
+
+def main():
+    from app import create_app
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', default='medium', choices=('small', 'medium', 'large'))
+    parser.add_argument('--runs', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save')
+    parser.add_argument('--compare')
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'SECRET_KEY': 'bench-' + 'k' * 32,
+                      'METRICS_ENABLED': False})
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        dataset = generate(args.scale, args.seed)
+        print(f"seeded {args.scale}: {dataset['tasks']} tasks ({dataset['hot_tasks']} on the hot project) "
+              f"in {time.perf_counter() - start:.1f}s")
+        db.session.remove()
+        results = measure(app, dataset, args.runs)
+        db.engine.dispose()
+    os.remove(path)
+
+    print(f"\n{args.runs} warm runs per endpoint (ms)")
+    print(f"{'endpoint':<22}{'cold':>9}{'p50':>9}{'p95':>9}{'queries':>9}")
+    for name, r in results.items():
+        print(f"{name:<22}{r['cold_ms']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['queries']:>9}")
+
+    if args.save:
+        with open(args.save, 'w') as fh:
+            json.dump({'scale': args.scale, 'runs': args.runs, 'results': results}, fh, indent=2)
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)['results']
+        problems = _regressions(results, baseline, args.tolerance)
+        if problems:
+            print('\nregressions against ' + args.compare + ':\n  ' + '\n  '.join(problems))
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
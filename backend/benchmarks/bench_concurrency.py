@@ -0,0 +1,111 @@
+"""Many simultaneous writers (and readers) against SQLite: stock settings vs config.py tuning.
+
+Usage (from backend/):  python benchmarks/bench_concurrency.py [writers] [readers] [seconds]
+Each profile gets a fresh SQLite file seeded with 20k tasks. Writer threads
+insert a task plus an activity-log row per transaction (what create_task does);
+reader threads load a page (50) of a project board. Reports committed writes/s, reads/s,
+p50/p95 latencies and "database is locked" failures.
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from sqlalchemy.exc import OperationalError
+from config import Config
+from models import db, User, Project, Task, ActivityLog
+from services.database import init_db
+
+PROJECTS = 20
+SEED_TASKS = 20_000
+
+PROFILES = {
+    # What app.py did before: no pragmas, rollback journal, synchronous=FULL, pysqlite's 5s wait
+    'stock': {'SQLITE_JOURNAL_MODE': None, 'SQLITE_SYNCHRONOUS': None, 'SQLITE_BUSY_TIMEOUT_MS': 5000,
+              'SQLITE_MMAP_SIZE': 0, 'SQLITE_CACHE_SIZE_KB': 0},
+    'tuned': {},  # config.py defaults (WAL, NORMAL, 5s busy timeout, mmap, 64 MB cache)
+}
+
+def _percentile(values, pct):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] * 1000
+
+def _seed():
+    db.session.execute(User.__table__.insert(), [{'id': 1, 'username': 'bench', 'password': 'x'}])
+    db.session.execute(Project.__table__.insert(), [
+        {'id': i, 'name': f'Project {i}', 'owner_id': 1} for i in range(1, PROJECTS + 1)
+    ])
+    db.session.execute(Task.__table__.insert(), [{
+        'title': f'Task {i}', 'status': 'todo', 'priority': 'medium',
+        'project_id': i % PROJECTS + 1, 'created_at': datetime(2025, 1, 1)
+    } for i in range(SEED_TASKS)])
+    db.session.commit()
+
+def _worker(app, kind, stop, stats, seed):
+    rnd = random.Random(seed)
+    with app.app_context():
+        while not stop.is_set():
+            project_id = rnd.randint(1, PROJECTS)
+            start = time.perf_counter()
+            try:
+                if kind == 'write':
+                    db.session.add(Task(title='bench', project_id=project_id))
+                    db.session.add(ActivityLog(project_id=project_id, user_id=1,
+                                               action_type='task_created', description='bench'))
+                    db.session.commit()
+                else:
+                    Task.query.filter_by(project_id=project_id).order_by(Task.created_at, Task.id).limit(50).all()
+                    db.session.rollback()
+                stats[kind].append(time.perf_counter() - start)
+            except OperationalError:
+                db.session.rollback()
+                stats['errors'] += 1
+        db.session.remove()
+
+def run_profile(overrides, writers, readers, seconds):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(overrides)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    init_db(app)
+    with app.app_context():
+        db.create_all()
+        _seed()
+        db.session.remove()
+
+    stats = {'write': [], 'read': [], 'errors': 0}
+    stop = threading.Event()
+    threads = [threading.Thread(target=_worker, args=(app, 'write', stop, stats, i)) for i in range(writers)]
+    threads += [threading.Thread(target=_worker, args=(app, 'read', stop, stats, 1000 + i)) for i in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    with app.app_context():
+        db.engine.dispose()
+    os.remove(path)
+    return stats
+
+def main(writers=16, readers=8, seconds=10):
+    print(f"{writers} writer + {readers} reader threads, {seconds}s per profile")
+    print(f"{'profile':<8}{'writes/s':>10}{'w p50':>8}{'w p95':>8}{'reads/s':>10}{'r p50':>8}{'r p95':>8}{'locked':>8}")
+    for name, overrides in PROFILES.items():
+        s = run_profile(overrides, writers, readers, seconds)
+        print(f"{name:<8}{len(s['write']) / seconds:>10.0f}{_percentile(s['write'], .5):>8.1f}"
+              f"{_percentile(s['write'], .95):>8.1f}{len(s['read']) / seconds:>10.0f}"
+              f"{_percentile(s['read'], .5):>8.1f}{_percentile(s['read'], .95):>8.1f}{s['errors']:>8}")
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:4]]
+    main(*args)
@@ -0,0 +1,108 @@
+"""Compare hot-path query latency with and without the declared indexes.
+
+Usage (from backend/):  python benchmarks/bench_indexes.py [task_count]
+Builds a throwaway SQLite file, times the queries the routes issue most, then
+applies migrate.upgrade() and times them again.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from sqlalchemy import func
+from models import db, User, Project, ProjectMember, Task, ActivityLog, Notification, TimeLog
+from migrate import upgrade
+
+PROJECTS = 200
+USERS = 500
+
+def _seed(task_count):
+    rnd = random.Random(42)
+    base = datetime(2025, 1, 1)
+    db.session.execute(User.__table__.insert(), [
+        {'id': i, 'username': f'user{i}', 'password': 'x', 'created_at': base} for i in range(1, USERS + 1)
+    ])
+    db.session.execute(Project.__table__.insert(), [
+        {'id': i, 'name': f'Project {i}', 'owner_id': rnd.randint(1, USERS), 'created_at': base}
+        for i in range(1, PROJECTS + 1)
+    ])
+    db.session.execute(ProjectMember.__table__.insert(), [
+        {'project_id': rnd.randint(1, PROJECTS), 'user_id': rnd.randint(1, USERS), 'role': 'member'}
+        for _ in range(PROJECTS * 10)
+    ])
+    db.session.execute(Task.__table__.insert(), [{
+        'title': f'Task {i}',
+        'status': rnd.choice(('todo', 'in_progress', 'done')),
+        'priority': rnd.choice(('low', 'medium', 'high')),
+        'project_id': rnd.randint(1, PROJECTS),
+        'assignee_id': rnd.randint(1, USERS),
+        'github_issue_id': i if i % 10 == 0 else None,
+        'created_at': base + timedelta(minutes=i),
+    } for i in range(task_count)])
+    db.session.execute(ActivityLog.__table__.insert(), [{
+        'project_id': rnd.randint(1, PROJECTS), 'user_id': rnd.randint(1, USERS),
+        'action_type': 'task_created', 'description': 'x', 'created_at': base + timedelta(minutes=i)
+    } for i in range(task_count)])
+    db.session.execute(Notification.__table__.insert(), [{
+        'user_id': rnd.randint(1, USERS), 'message': 'x', 'is_read': rnd.random() < 0.8,
+        'created_at': base + timedelta(minutes=i)
+    } for i in range(task_count)])
+    db.session.execute(TimeLog.__table__.insert(), [{
+        'task_id': rnd.randint(1, task_count), 'user_id': rnd.randint(1, USERS), 'minutes': 30,
+        'logged_at': base + timedelta(minutes=i)
+    } for i in range(task_count // 2)])
+    db.session.commit()
+
+QUERIES = {
+    'board (project tasks)': lambda: Task.query.filter_by(project_id=7).order_by(Task.created_at, Task.id).all(),
+    'board column (status)': lambda: Task.query.filter_by(project_id=7, status='todo').all(),
+    'github dedupe': lambda: Task.query.filter(Task.project_id == 7, Task.github_issue_id.isnot(None)).all(),
+    'profile counts': lambda: Task.query.filter_by(assignee_id=13, status='done').count(),
+    'activity feed': lambda: ActivityLog.query.filter_by(project_id=7)
+        .order_by(ActivityLog.created_at.desc()).limit(50).all(),
+    'unread count': lambda: Notification.query.filter_by(user_id=13, is_read=False).count(),
+    'notifications': lambda: Notification.query.filter_by(user_id=13)
+        .order_by(Notification.created_at.desc()).limit(30).all(),
+    'membership check': lambda: ProjectMember.query.filter_by(project_id=7, user_id=13).first(),
+    'time logs': lambda: db.session.query(func.sum(TimeLog.minutes)).filter_by(task_id=4242).scalar(),
+}
+
+def _time_all(repeat):
+    results = {}
+    for name, run in QUERIES.items():
+        run()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            run()
+            db.session.expunge_all()
+        results[name] = (time.perf_counter() - start) / repeat * 1000
+    return results
+
+def main(task_count=100_000, repeat=20):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.drop(bind=db.engine)
+        _seed(task_count)
+        before = _time_all(repeat)
+        upgrade()
+        after = _time_all(repeat)
+
+    print(f"{task_count} tasks, mean of {repeat} runs (ms)")
+    print(f"{'query':<24}{'no index':>10}{'indexed':>10}{'speedup':>9}")
+    for name in QUERIES:
+        print(f"{name:<24}{before[name]:>10.2f}{after[name]:>10.2f}{before[name] / after[name]:>8.1f}x")
+    os.remove(path)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,98 @@
+"""Compare task search via LIKE scans with the FTS5 index (services/search.py).
+
+Usage (from backend/):  python benchmarks/bench_search.py [task_count]
+Builds a throwaway SQLite file with task_count tasks (default 1M) and half as
+many comments, times LIKE scans over title/description, builds the FTS index
+the way migrate.py does (one backfill), then times the same searches via
+services.search.
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from sqlalchemy import event, or_
+from models import db, User, Project, Task, TaskComment
+from services import search
+
+PROJECTS = 50
+BATCH = 50_000
+WORDS = ('deploy pipeline login signup oauth token cache query index sprint board label '
+         'export import search upload download refactor migrate schema render layout mobile '
+         'payment invoice webhook timeout retry crash memory leak latency regression flaky').split()
+# Zipf-distributed vocabulary: a few common words, a long tail of rare ones
+VOCAB = WORDS + [f'{w}{i}' for i in range(200) for w in ('alpha', 'kilo', 'zulu')]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCAB))]
+QUERIES = ['deploy', 'webhook', 'deploy pipeline', 'migr', 'kilo150', 'zulu199 alpha3', 'nonexistentword']
+
+def _text(rnd, n):
+    return ' '.join(rnd.choices(VOCAB, WEIGHTS, k=n))
+
+def _seed(task_count):
+    rnd = random.Random(42)
+    base = datetime(2025, 1, 1)
+    db.session.execute(User.__table__.insert(), [{'id': 1, 'username': 'bench', 'password': 'x'}])
+    db.session.execute(Project.__table__.insert(), [
+        {'id': i, 'name': f'Project {i}', 'owner_id': 1, 'created_at': base} for i in range(1, PROJECTS + 1)
+    ])
+    for start in range(0, task_count, BATCH):
+        db.session.execute(Task.__table__.insert(), [{
+            'id': i + 1,
+            'title': _text(rnd, 4),
+            'description': _text(rnd, 20),
+            'status': 'todo', 'priority': 'medium',
+            'project_id': rnd.randint(1, PROJECTS),
+            'created_at': base + timedelta(minutes=i),
+        } for i in range(start, min(start + BATCH, task_count))])
+        db.session.execute(TaskComment.__table__.insert(), [{
+            'task_id': rnd.randint(1, task_count), 'user_id': 1, 'content': _text(rnd, 12), 'created_at': base
+        } for _ in range(min(BATCH, task_count - start) // 2)])
+    db.session.commit()
+
+def _like(q, project_ids, limit=20):
+    query = Task.query.filter(Task.project_id.in_(project_ids))
+    for term in q.split():
+        pattern = f'%{term}%'
+        query = query.filter(or_(Task.title.ilike(pattern), Task.description.ilike(pattern)))
+    return query.order_by(Task.created_at.desc()).limit(limit).all()
+
+def _time(run, repeat):
+    run()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+        db.session.expunge_all()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main(task_count=1_000_000, repeat=5):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    scope = list(range(1, PROJECTS // 2 + 1))  # a user in half of the projects
+    with app.app_context():
+        # Seed without the triggers, then build the index in one pass like migrate.py
+        event.remove(db.metadata, 'after_create', search._create_index)
+        db.create_all()
+        _seed(task_count)
+        like = {q: _time(lambda q=q: _like(q, scope), repeat) for q in QUERIES}
+        start = time.perf_counter()
+        with db.engine.begin() as conn:
+            search.ensure_index(conn)
+        build = time.perf_counter() - start
+        fts = {q: _time(lambda q=q: search.search(q, scope, 20), repeat) for q in QUERIES}
+
+    print(f"{task_count} tasks + {task_count // 2} comments, mean of {repeat} runs (ms); "
+          f"FTS index build {build:.1f}s")
+    print(f"{'query':<20}{'LIKE':>10}{'FTS5':>10}{'speedup':>9}")
+    for q in QUERIES:
+        print(f"{q:<20}{like[q]:>10.2f}{fts[q]:>10.2f}{like[q] / fts[q]:>8.1f}x")
+    os.remove(path)
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,67 @@
+"""Cold-start cost of a worker: importing app.py and building the app with create_app().
+
+Usage (from backend/):  python benchmarks/bench_startup.py [runs] [budget_ms]
+Each measurement runs in a fresh interpreter (like a newly forked/recycled
+worker that did not preload). Reports the median of ``runs`` for: importing
+``app``, create_app() with all optional blueprints, create_app() with none, and
+the first request. Exits non-zero if the full startup median exceeds
+``budget_ms`` (default 1500), so it can gate CI.
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND = os.path.join(os.path.dirname(__file__), '..')
+
+PROBE = r"""
+import time, tempfile, os
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+a = app.create_app({'OPTIONAL_BLUEPRINTS': %r,
+                    'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'b.db')})
+t2 = time.perf_counter()
+a.test_client().get('/')
+t3 = time.perf_counter()
+print((t1 - t0) * 1000, (t2 - t1) * 1000, (t3 - t2) * 1000)
+"""
+
+def _probe(optional):
+    out = subprocess.run([sys.executable, '-c', PROBE % (optional,)], cwd=BACKEND,
+                         check=True, capture_output=True, text=True).stdout
+    return [float(v) for v in out.split()]
+
+def _slowest_imports(limit=8):
+    """Top self+children import times (ms) from -X importtime for app + create_app()."""
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app; app.create_app()'],
+                         cwd=BACKEND, check=True, capture_output=True, text=True).stderr
+    rows = []
+    for line in err.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit() and not parts[2].startswith('  '):
+            rows.append((int(parts[1]) / 1000, parts[2].strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+def main(runs=7, budget_ms=1500):
+    results = {}
+    for label, optional in (('all blueprints', ('github', 'ical', 'attachments')), ('core only', ())):
+        samples = [_probe(optional) for _ in range(runs)]
+        results[label] = [statistics.median(s[i] for s in samples) for i in range(3)]
+
+    print(f"median of {runs} fresh interpreters (ms)")
+    print(f"{'profile':<16}{'import app':>12}{'create_app':>12}{'1st request':>13}{'total':>9}")
+    for label, (imp, build, first) in results.items():
+        print(f"{label:<16}{imp:>12.1f}{build:>12.1f}{first:>13.1f}{imp + build + first:>9.1f}")
+    print("\nslowest top-level imports (cumulative ms):")
+    for ms, module in _slowest_imports():
+        print(f"  {module:<28}{ms:>8.1f}")
+
+    total = sum(results['all blueprints'])
+    if total > budget_ms:
+        print(f"\nstartup {total:.0f} ms exceeds budget {budget_ms} ms")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
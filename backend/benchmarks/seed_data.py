@@ -0,0 +1,153 @@
+"""Seeded synthetic data at production-like scale, for benchmarks and load tests.
+
+Usage (from backend/):  python benchmarks/seed_data.py <sqlite path> [scale] [seed]
+or from code, inside an app context:  ``generate('medium')``.
+
+Rows are bulk-inserted through Core (no ORM objects, no flush hooks), so a
+``large`` dataset builds in seconds. The same seed always produces the same
+data. Every user's password is ``bench``. One "hot" project (id 1) is much
+bigger than the rest and has an active sprint, like a real busiest board; the
+returned dict names it, its owner and that sprint.
+"""
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from itertools import islice
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from werkzeug.security import generate_password_hash
+from models import (db, task_labels, User, Project, ProjectMember, Sprint, SprintSnapshot, Label, Task,
+                    ChecklistItem, TaskComment, TaskStatusChange, TimeLog, ActivityLog, Notification)
+
+PASSWORD = 'bench'
+
+# users, projects, members per project, tasks, tasks on the hot project
+SCALES = {
+    'small': dict(users=20, projects=5, members=4, tasks=500, hot_tasks=200),
+    'medium': dict(users=500, projects=100, members=8, tasks=20_000, hot_tasks=5_000),
+    'large': dict(users=2_000, projects=400, members=12, tasks=100_000, hot_tasks=20_000),
+}
+
+SPRINTS_PER_PROJECT = 4
+LABELS_PER_PROJECT = 8
+INSERT_CHUNK = 5_000
+WORDS = ('login', 'api', 'cache', 'deploy', 'board', 'sprint', 'export', 'search', 'latency', 'crash',
+         'mobile', 'billing', 'webhook', 'migration', 'onboarding', 'report', 'timeout', 'refactor')
+
+def _insert(table, rows):
+    rows = iter(rows)
+    while chunk := list(islice(rows, INSERT_CHUNK)):
+        db.session.execute(table.insert(), chunk)
+
+def _sentence(rnd, n):
+    return ' '.join(rnd.choice(WORDS) for _ in range(n))
+
+def generate(scale='medium', seed=42, now=None):
+    """Fill the (empty) database; returns ids of the hot project, its owner and its active sprint."""
+    size = SCALES[scale]
+    rnd = random.Random(seed)
+    now = now or datetime.utcnow().replace(microsecond=0)
+    start = now - timedelta(days=90)
+    n_users, n_projects = size['users'], size['projects']
+
+    password = generate_password_hash(PASSWORD)
+    _insert(User.__table__, ({'id': i, 'username': f'user{i}', 'password': password, 'created_at': start}
+                             for i in range(1, n_users + 1)))
+    owners = {p: rnd.randint(1, n_users) for p in range(1, n_projects + 1)}
+    _insert(Project.__table__, ({'id': p, 'name': f'Project {p}', 'description': _sentence(rnd, 8),
+                                 'owner_id': owners[p], 'created_at': start} for p in owners))
+
+    members = {}
+    for p, owner in owners.items():
+        others = rnd.sample(range(1, n_users + 1), min(n_users, size['members']))
+        members[p] = [owner] + [u for u in others if u != owner][:size['members'] - 1]
+    _insert(ProjectMember.__table__, ({'project_id': p, 'user_id': u, 'role': 'admin' if u == owners[p] else 'member'}
+                                      for p, users in members.items() for u in users))
+
+    # Sprints: two completed, one active (spanning now), one planned
+    sprints, sprint_id = {}, 0
+    for p in owners:
+        sprints[p] = []
+        for k in range(SPRINTS_PER_PROJECT):
+            sprint_id += 1
+            begin = now - timedelta(days=7 + 14 * (2 - k))
+            status = ('completed', 'completed', 'active', 'planned')[k]
+            sprints[p].append({'id': sprint_id, 'project_id': p, 'name': f'Sprint {k + 1}', 'status': status,
+                               'start_date': begin, 'end_date': begin + timedelta(days=14), 'created_at': start})
+    _insert(Sprint.__table__, (s for rows in sprints.values() for s in rows))
+
+    labels = {p: list(range((p - 1) * LABELS_PER_PROJECT + 1, p * LABELS_PER_PROJECT + 1)) for p in owners}
+    _insert(Label.__table__, ({'id': label, 'project_id': p, 'name': f'label-{label}', 'color': '#3b82f6'}
+                              for p, ids in labels.items() for label in ids))
+
+    # Tasks: the hot project gets hot_tasks, the rest are spread over the others
+    task_project = [1] * size['hot_tasks'] + [rnd.randint(2, n_projects) if n_projects > 1 else 1
+                                              for _ in range(size['tasks'] - size['hot_tasks'])]
+    tasks = []
+    for task_id, p in enumerate(task_project, 1):
+        sprint = rnd.choice(sprints[p] + [None])
+        created = start + timedelta(minutes=rnd.randint(0, 90 * 24 * 60))
+        status = 'done' if sprint and sprint['status'] == 'completed' else rnd.choice(('todo', 'in_progress', 'done'))
+        tasks.append({
+            'id': task_id, 'title': f'{_sentence(rnd, 3)} #{task_id}', 'description': _sentence(rnd, 20),
+            'status': status, 'priority': rnd.choice(('low', 'medium', 'high')), 'project_id': p,
+            'assignee_id': rnd.choice(members[p] + [None]), 'sprint_id': sprint and sprint['id'],
+            'due_date': created + timedelta(days=rnd.randint(1, 30)) if rnd.random() < 0.5 else None,
+            'estimate': rnd.choice((1, 2, 3, 5, 8, None)), 'created_at': created,
+        })
+    _insert(Task.__table__, tasks)
+
+    _insert(task_labels, ({'task_id': t['id'], 'label_id': label}
+                          for t in tasks for label in rnd.sample(labels[t['project_id']], rnd.randint(0, 2))))
+    _insert(ChecklistItem.__table__, ({'task_id': t['id'], 'content': _sentence(rnd, 4),
+                                       'is_completed': rnd.random() < 0.5, 'created_at': t['created_at']}
+                                      for t in tasks for _ in range(rnd.randint(0, 4))))
+    _insert(TaskComment.__table__, ({'task_id': t['id'], 'user_id': rnd.choice(members[t['project_id']]),
+                                     'content': _sentence(rnd, 12), 'created_at': t['created_at']}
+                                    for t in tasks for _ in range(rnd.randint(0, 3))))
+    _insert(TimeLog.__table__, ({'task_id': t['id'], 'user_id': rnd.choice(members[t['project_id']]),
+                                 'minutes': rnd.choice((15, 30, 60, 120)), 'logged_at': t['created_at']}
+                                for t in tasks if rnd.random() < 0.3))
+    _insert(TaskStatusChange.__table__, ({'task_id': t['id'], 'sprint_id': t['sprint_id'], 'user_id': None,
+                                          'from_status': 'todo', 'to_status': t['status'],
+                                          'changed_at': t['created_at'] + timedelta(hours=1)}
+                                         for t in tasks if t['status'] != 'todo'))
+    _insert(ActivityLog.__table__, ({'project_id': t['project_id'], 'user_id': rnd.choice(members[t['project_id']]),
+                                     'action_type': 'task_created', 'description': f"Created task '{t['title']}'",
+                                     'created_at': t['created_at']} for t in tasks))
+    _insert(Notification.__table__, ({'user_id': rnd.randint(1, n_users), 'project_id': t['project_id'],
+                                      'message': f"You were assigned '{t['title']}'"[:255],
+                                      'link': f"/project/{t['project_id']}", 'is_read': rnd.random() < 0.8,
+                                      'created_at': t['created_at']} for t in tasks))
+
+    # Daily burndown points for every started sprint, burning down linearly-ish
+    points = {}
+    for t in tasks:
+        if t['sprint_id']:
+            points[t['sprint_id']] = points.get(t['sprint_id'], 0) + (t['estimate'] or 1)
+    snapshots = []
+    for s in (s for rows in sprints.values() for s in rows if s['start_date'] <= now):
+        total, days = points.get(s['id'], 0), (min(s['end_date'], now) - s['start_date']).days
+        for d in range(days + 1):
+            snapshots.append({'sprint_id': s['id'], 'day': (s['start_date'] + timedelta(days=d)).date(),
+                              'total_points': total, 'remaining_points': round(total * (1 - d / 14)),
+                              'updated_at': now})
+    _insert(SprintSnapshot.__table__, snapshots)
+    db.session.commit()
+
+    active = next(s['id'] for s in sprints[1] if s['status'] == 'active')
+    return {'project_id': 1, 'owner_id': owners[1], 'username': f'user{owners[1]}', 'sprint_id': active,
+            'tasks': len(tasks), 'hot_tasks': size['hot_tasks']}
+
+if __name__ == '__main__':
+    from app import create_app
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    path = os.path.abspath(sys.argv[1])
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+    with app.app_context():
+        db.create_all()
+        info = generate(sys.argv[2] if len(sys.argv) > 2 else 'medium', int(sys.argv[3]) if len(sys.argv) > 3 else 42)
+    print(f"seeded {path}: {info}")
@@ -0,0 +1,33 @@
+"""Bring an existing project_manager.db up to date with models.py.
+
+Run from the backend directory:  python migrate.py
+It is safe to run repeatedly; only missing tables and indexes are created.
+"""
+from sqlalchemy import inspect, text
+from models import db
+from services.search import ensure_index
+
+def upgrade():
+    """Create missing tables and indexes on the current app's database."""
+    db.create_all()
+    with db.engine.begin() as conn:
+        ensure_index(conn)  # FTS5 task search table + triggers (backfilled when new)
+    inspector = inspect(db.engine)
+    created = []
+    for table in db.metadata.sorted_tables:
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=db.engine)
+                created.append(index.name)
+    if created and db.engine.dialect.name == 'sqlite':
+        # Refresh planner statistics so the new indexes are picked up immediately
+        with db.engine.begin() as conn:
+            conn.execute(text('ANALYZE'))
+    return created
+
+if __name__ == '__main__':
+    from app import app
+    with app.app_context():
+        names = upgrade()
+    print(f"Created {len(names)} index(es)" + (": " + ", ".join(names) if names else ''))
@@ -1,12 +1,28 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 
-db = SQLAlchemy()
+READ_BIND = 'replica'
+
+class RoutingSession(Session):
+    """Sends reads to the ``replica`` engine while ``info['read_only']`` is set.
+
+    Flushes always go to the primary; see ``services.database.read_only``.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('read_only') and not self._flushing:
+            engine = self._db.engines.get(READ_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper, clause, bind, **kwargs)
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Association table for Task <-> Label many-to-many relationship
 task_labels = db.Table('task_labels',
     db.Column('task_id', db.Integer, db.ForeignKey('task.id'), primary_key=True),
-    db.Column('label_id', db.Integer, db.ForeignKey('label.id'), primary_key=True)
+    db.Column('label_id', db.Integer, db.ForeignKey('label.id'), primary_key=True),
+    db.Index('ix_task_labels_label', 'label_id')
 )
 
 class User(db.Model):
@@ -24,7 +40,7 @@ class Project(db.Model):
     github_repo = db.Column(db.String(255), nullable=True) # owner/repo format
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     deleted_at = db.Column(db.DateTime, nullable=True, default=None)  # soft-delete
-    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
 
     owner = db.relationship('User', backref=db.backref('projects_owned', lazy=True))
 
@@ -41,10 +57,34 @@ class ProjectMember(db.Model):
     )
     user = db.relationship('User', backref=db.backref('project_memberships', lazy=True))
 
+    __table_args__ = (
+        db.Index('ix_project_member_project_user', 'project_id', 'user_id'),
+        db.Index('ix_project_member_user', 'user_id'),
+    )
+
+class ProjectVersion(db.Model):
+    """Change counter behind a project's conditional GETs, bumped in the writing transaction."""
+    project_id = db.Column(db.Integer, primary_key=True)  # no FK: outlives hard-deleted projects harmlessly
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+class StreamChannel(db.Model):
+    """Last event sequence number of a live-update channel (``project:<id>``, ``user:<id>``)."""
+    channel = db.Column(db.String(64), primary_key=True)
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+
+class StreamEvent(db.Model):
+    """Recent events of a channel, kept so any worker can stream or replay them."""
+    channel = db.Column(db.String(64), primary_key=True)
+    seq = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    event_type = db.Column(db.String(50), nullable=False)
+    data = db.Column(db.Text, nullable=False)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class Sprint(db.Model):
     """Sprint/Milestone representation for a project."""
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False, index=True)
     name = db.Column(db.String(120), nullable=False)
     start_date = db.Column(db.DateTime, nullable=True)
     end_date = db.Column(db.DateTime, nullable=True)
@@ -56,7 +96,7 @@ class Sprint(db.Model):
 class Label(db.Model):
     """Tags/Labels that can be attached to tasks."""
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False, index=True)
     name = db.Column(db.String(50), nullable=False)
     color = db.Column(db.String(20), nullable=False, default='#3b82f6') # Hex color code
     
@@ -71,8 +111,8 @@ class Task(db.Model):
     priority = db.Column(db.String(50), nullable=False, default='medium') # low, medium, high
     project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
     assignee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
-    sprint_id = db.Column(db.Integer, db.ForeignKey('sprint.id'), nullable=True)
-    parent_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=True) # For subtasks
+    sprint_id = db.Column(db.Integer, db.ForeignKey('sprint.id'), nullable=True, index=True)
+    parent_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=True, index=True) # For subtasks
     github_issue_id = db.Column(db.Integer, nullable=True)
     due_date = db.Column(db.DateTime, nullable=True)
     estimate = db.Column(db.Integer, nullable=True) # Story points or hours
@@ -88,6 +128,47 @@ class Task(db.Model):
     labels = db.relationship('Label', secondary=task_labels, lazy='subquery',
         backref=db.backref('tasks', lazy=True))
 
+    __table_args__ = (
+        # Keyset pagination and filtered board columns: (project, [status,] created_at, id)
+        db.Index('ix_task_project_created', 'project_id', 'created_at', 'id'),
+        db.Index('ix_task_project_status_created', 'project_id', 'status', 'created_at', 'id'),
+        # GitHub import dedupe lookup
+        db.Index('ix_task_project_github_issue', 'project_id', 'github_issue_id'),
+        # Profile stats (counts by status) and "my tasks" (newest first)
+        db.Index('ix_task_assignee_status', 'assignee_id', 'status'),
+        db.Index('ix_task_assignee_created', 'assignee_id', 'created_at'),
+    )
+
+class TaskStatusChange(db.Model):
+    """Append-only history of task status transitions (feeds sprint burndown)."""
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=False)
+    sprint_id = db.Column(db.Integer, db.ForeignKey('sprint.id'), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    from_status = db.Column(db.String(50), nullable=True)
+    to_status = db.Column(db.String(50), nullable=False)
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    task = db.relationship('Task', backref=db.backref('status_changes', lazy=True, cascade="all, delete-orphan"))
+
+    __table_args__ = (
+        db.Index('ix_task_status_change_task_changed', 'task_id', 'changed_at'),
+        db.Index('ix_task_status_change_sprint_changed', 'sprint_id', 'changed_at'),
+    )
+
+class SprintSnapshot(db.Model):
+    """End-of-day burndown point for a sprint, refreshed whenever its tasks change."""
+    id = db.Column(db.Integer, primary_key=True)
+    sprint_id = db.Column(db.Integer, db.ForeignKey('sprint.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    total_points = db.Column(db.Integer, nullable=False, default=0)
+    remaining_points = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    sprint = db.relationship('Sprint', backref=db.backref('snapshots', lazy=True, cascade="all, delete-orphan"))
+
+    __table_args__ = (db.UniqueConstraint('sprint_id', 'day', name='uq_sprint_snapshot_day'),)
+
 class TaskComment(db.Model):
     """Comments on a specific task."""
     id = db.Column(db.Integer, primary_key=True)
@@ -99,10 +180,12 @@ class TaskComment(db.Model):
     task = db.relationship('Task', backref=db.backref('comments', lazy=True, cascade="all, delete-orphan"))
     user = db.relationship('User', backref=db.backref('comments', lazy=True))
 
+    __table_args__ = (db.Index('ix_task_comment_task_created', 'task_id', 'created_at'),)
+
 class ChecklistItem(db.Model):
     """Checklist item within a task."""
     id = db.Column(db.Integer, primary_key=True)
-    task_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=False, index=True)
     content = db.Column(db.String(255), nullable=False)
     is_completed = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -121,6 +204,11 @@ class ActivityLog(db.Model):
     project = db.relationship('Project', backref=db.backref('activity_logs', lazy=True, cascade="all, delete-orphan"))
     user = db.relationship('User', backref=db.backref('activities', lazy=True))
 
+    __table_args__ = (
+        db.Index('ix_activity_log_project_created', 'project_id', 'created_at'),
+        db.Index('ix_activity_log_user_created', 'user_id', 'created_at'),
+    )
+
 class Notification(db.Model):
     """In-app notification for a user."""
     id = db.Column(db.Integer, primary_key=True)
@@ -134,6 +222,11 @@ class Notification(db.Model):
     user = db.relationship('User', backref=db.backref('notifications', lazy=True))
     project = db.relationship('Project', backref=db.backref('notifications', lazy=True, cascade="all, delete-orphan"))
 
+    __table_args__ = (
+        db.Index('ix_notification_user_read_created', 'user_id', 'is_read', 'created_at'),
+        db.Index('ix_notification_user_created', 'user_id', 'created_at'),
+    )
+
 class TimeLog(db.Model):
     """Time entry logged against a task."""
     id = db.Column(db.Integer, primary_key=True)
@@ -146,13 +239,15 @@ class TimeLog(db.Model):
     task = db.relationship('Task', backref=db.backref('time_logs', lazy=True, cascade="all, delete-orphan"))
     user = db.relationship('User', backref=db.backref('time_logs', lazy=True))
 
+    __table_args__ = (db.Index('ix_time_log_task_logged', 'task_id', 'logged_at'),)
+
 class Attachment(db.Model):
     """File attachment linked to a task."""
     id = db.Column(db.Integer, primary_key=True)
     task_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     filename = db.Column(db.String(255), nullable=False)       # original filename
-    stored_name = db.Column(db.String(255), nullable=False)    # UUID-based stored name
+    stored_name = db.Column(db.String(255), nullable=False)    # blobs/ab/cd/<sha256> (older rows: a UUID name)
     mimetype = db.Column(db.String(100), nullable=True)
     size_bytes = db.Column(db.Integer, nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -160,10 +255,34 @@ class Attachment(db.Model):
     task = db.relationship('Task', backref=db.backref('attachments', lazy=True, cascade="all, delete-orphan"))
     user = db.relationship('User', backref=db.backref('attachments', lazy=True))
 
+    __table_args__ = (db.Index('ix_attachment_task_uploaded', 'task_id', 'uploaded_at'),)
+
+class Blob(db.Model):
+    """Content-addressed attachment file, shared by every Attachment with the same bytes."""
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    refs = db.Column(db.Integer, nullable=False, default=0)  # Attachment rows pointing here
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Upload(db.Model):
+    """An in-progress chunked attachment upload; becomes an Attachment when completed."""
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex, also names the partial file
+    task_id = db.Column(db.Integer, db.ForeignKey('task.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False, index=True)  # for quotas
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    mimetype = db.Column(db.String(100), nullable=True)
+    size = db.Column(db.Integer, nullable=False)  # declared total, reserved against the quota
+    received = db.Column(db.Integer, nullable=False, default=0)  # bytes durably written = next offset
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    task = db.relationship('Task', backref=db.backref('uploads', lazy=True, cascade="all, delete-orphan"))
+
 class TaskTemplate(db.Model):
     """Reusable task templates for a project."""
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False, index=True)
     name = db.Column(db.String(120), nullable=False)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=True)
@@ -172,3 +291,28 @@ class TaskTemplate(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     project = db.relationship('Project', backref=db.backref('templates', lazy=True, cascade="all, delete-orphan"))
+
+class GitHubCache(db.Model):
+    """Last GitHub API response per URL, replayed when GitHub answers 304 Not Modified."""
+    url = db.Column(db.String(512), primary_key=True)
+    etag = db.Column(db.String(255), nullable=True)
+    link = db.Column(db.Text, nullable=True)  # raw Link header, for pagination of cached pages
+    body = db.Column(db.Text, nullable=False)
+    fetched_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class Job(db.Model):
+    """Background job (e.g. GitHub import) run by the in-process job runner."""
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    kind = db.Column(db.String(50), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='queued') # queued, running, succeeded, failed
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.Text, nullable=True)  # JSON
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (db.Index('ix_job_project_created', 'project_id', 'created_at'),)
@@ -1,14 +1,29 @@
-"""File attachment routes — upload, list, download, delete."""
+"""File attachment routes — upload (single request or chunked/resumable), list, download, delete.
+
+Chunked protocol (see services/uploads.py):
+    POST   /task/<task_id>/uploads        {filename, size, mimetype?} -> 201 {upload_id, offset, chunk_size}
+    PUT    /uploads/<upload_id>?offset=N  raw chunk body             -> {offset}
+    GET    /uploads/<upload_id>                                      -> {offset, size} (resume point)
+    POST   /uploads/<upload_id>/complete  {sha256?}                  -> 201 attachment
+    DELETE /uploads/<upload_id>
+
+Files are stored content-addressed and shared between identical attachments
+(services/blobs.py); ``flask attachments gc`` reconciles the upload folder.
+"""
+import mimetypes
 import os
-import uuid
+import click
 from flask import Blueprint, jsonify, request, send_from_directory, current_app
 from werkzeug.utils import secure_filename
-from models import db, Task, Attachment, User
+from models import db, Task, Attachment, Upload
 from routes.auth import token_required
+from services.database import read_only
+from services import blobs, uploads
+from services.uploads import UploadError, upload_folder
+from services.users import usernames_for
 
 attachments_bp = Blueprint('attachments', __name__)
 
-UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), '..', 'uploads')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'txt', 'md', 'zip', 'docx', 'xlsx', 'csv'}
 
 def _allowed(filename):
@@ -16,24 +31,39 @@ def _allowed(filename):
 
 @attachments_bp.route('/task/<int:task_id>', methods=['GET'])
 @token_required
+@read_only
 def list_attachments(current_user, task_id):
     _ = current_user
     Task.query.get_or_404(task_id)
     items = Attachment.query.filter_by(task_id=task_id).order_by(Attachment.uploaded_at.desc()).all()
+    usernames = usernames_for(a.user_id for a in items)
     return jsonify([{
         'id': a.id,
         'filename': a.filename,
         'mimetype': a.mimetype,
         'size_bytes': a.size_bytes,
-        'username': User.query.get(a.user_id).username if a.user_id else '?',
+        'username': usernames.get(a.user_id, '?'),
         'uploaded_at': a.uploaded_at.isoformat(),
         'download_url': f'/api/attachments/download/{a.id}'
     } for a in items])
 
+def _upload_error(e):
+    return jsonify({'error': str(e), **e.extra}), e.status
+
 @attachments_bp.route('/task/<int:task_id>', methods=['POST'])
 @token_required
 def upload_attachment(current_user, task_id):
-    Task.query.get_or_404(task_id)
+    """Single-request upload for small files; large ones should use the chunked protocol."""
+    task = Task.query.get_or_404(task_id)
+    # Caps bodies without a Content-Length (chunked transfer encoding) too; only for this route
+    request.max_content_length = current_app.config['MAX_ATTACHMENT_BYTES']
+    if (request.content_length or 0) > current_app.config['MAX_ATTACHMENT_BYTES']:
+        return jsonify({'error': 'File too large; use a chunked upload'}), 413
+    try:
+        # Before the body is read: an over-quota project must not get its bytes written to disk
+        uploads.check_quota(task.project_id, request.content_length or 0)
+    except UploadError as e:
+        return _upload_error(e)
     if 'file' not in request.files:
         return jsonify({'error': 'No file provided'}), 400
     file = request.files['file']
@@ -42,19 +72,19 @@ def upload_attachment(current_user, task_id):
     if not _allowed(file.filename):
         return jsonify({'error': 'File type not allowed'}), 400
 
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
     original = secure_filename(file.filename)
-    ext = original.rsplit('.', 1)[-1] if '.' in original else ''
-    stored = f"{uuid.uuid4().hex}.{ext}" if ext else uuid.uuid4().hex
-    path = os.path.join(UPLOAD_FOLDER, stored)
-    file.save(path)
-    size = os.path.getsize(path)
+    path, digest, size = uploads.save_stream(file.stream)
+    try:
+        uploads.check_quota(task.project_id, size)
+    except UploadError as e:
+        os.remove(path)
+        return _upload_error(e)
 
     attachment = Attachment(
         task_id=task_id,
         user_id=current_user.id,
         filename=original,
-        stored_name=stored,
+        stored_name=blobs.store(path, digest, size),
         mimetype=file.mimetype,
         size_bytes=size
     )
@@ -62,13 +92,135 @@ def upload_attachment(current_user, task_id):
     db.session.commit()
     return jsonify({'id': attachment.id, 'filename': original, 'size_bytes': size}), 201
 
+@attachments_bp.route('/task/<int:task_id>/uploads', methods=['POST'])
+@token_required
+def start_upload(current_user, task_id):
+    """Start a chunked upload: declare the file, reserve quota, get an upload id."""
+    task = Task.query.get_or_404(task_id)
+    data = request.get_json() or {}
+    filename = secure_filename(data.get('filename') or '')
+    size = data.get('size')
+    if not filename:
+        return jsonify({'error': 'Empty filename'}), 400
+    if not _allowed(filename):
+        return jsonify({'error': 'File type not allowed'}), 400
+    if not isinstance(size, int) or isinstance(size, bool) or size < 0:
+        return jsonify({'error': 'size must be a non-negative integer'}), 400
+    try:
+        upload = uploads.start(task, current_user.id, filename, size, data.get('mimetype'))
+    except UploadError as e:
+        return _upload_error(e)
+    return jsonify({'upload_id': upload.id, 'offset': 0, 'size': size,
+                    'chunk_size': current_app.config['UPLOAD_CHUNK_BYTES']}), 201
+
+def _own_upload(current_user, upload_id):
+    upload = Upload.query.get_or_404(upload_id)
+    if upload.user_id != current_user.id:
+        return None, (jsonify({'error': 'Not your upload'}), 403)
+    return upload, None
+
+@attachments_bp.route('/uploads/<upload_id>', methods=['GET'])
+@token_required
+def get_upload(current_user, upload_id):
+    """Where to resume: the number of bytes received so far."""
+    upload, error = _own_upload(current_user, upload_id)
+    if error:
+        return error
+    return jsonify({'upload_id': upload.id, 'offset': upload.received, 'size': upload.size})
+
+@attachments_bp.route('/uploads/<upload_id>', methods=['PUT'])
+@token_required
+def put_chunk(current_user, upload_id):
+    """Stream one chunk (raw body) to disk at ``?offset=``."""
+    upload, error = _own_upload(current_user, upload_id)
+    if error:
+        return error
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'offset query param required'}), 400
+    if request.content_length is None:
+        return jsonify({'error': 'Content-Length required'}), 411
+    try:
+        received = uploads.write_chunk(upload, request.stream, offset, request.content_length)
+    except UploadError as e:
+        return _upload_error(e)
+    return jsonify({'upload_id': upload.id, 'offset': received, 'size': upload.size})
+
+@attachments_bp.route('/uploads/<upload_id>/complete', methods=['POST'])
+@token_required
+def complete_upload(current_user, upload_id):
+    """Verify length and (optional) SHA-256, then turn the upload into an attachment."""
+    upload, error = _own_upload(current_user, upload_id)
+    if error:
+        return error
+    try:
+        attachment, digest = uploads.complete(upload, (request.get_json(silent=True) or {}).get('sha256'))
+    except UploadError as e:
+        return _upload_error(e)
+    return jsonify({'id': attachment.id, 'filename': attachment.filename,
+                    'size_bytes': attachment.size_bytes, 'sha256': digest}), 201
+
+@attachments_bp.route('/uploads/<upload_id>', methods=['DELETE'])
+@token_required
+def cancel_upload(current_user, upload_id):
+    upload, error = _own_upload(current_user, upload_id)
+    if error:
+        return error
+    uploads.discard(upload)
+    return jsonify({'message': 'Upload cancelled'})
+
 @attachments_bp.route('/download/<int:attachment_id>', methods=['GET'])
 @token_required
 def download_attachment(current_user, attachment_id):
+    """Serve a file with Range support, a strong SHA-256 ETag and cache headers.
+
+    Blob content never changes, so those downloads are cacheable for a year. The
+    older UUID-named files revalidate on every use. With ``ATTACHMENT_OFFLOAD``
+    set, the bytes (and Range handling) are left to the front proxy.
+    """
     _ = current_user
     attachment = Attachment.query.get_or_404(attachment_id)
-    return send_from_directory(UPLOAD_FOLDER, attachment.stored_name, as_attachment=True,
-                               download_name=attachment.filename)
+    digest = blobs.digest_of(attachment.stored_name)
+    if current_app.config['ATTACHMENT_OFFLOAD']:
+        response = _offloaded(attachment, digest)
+    else:
+        response = send_from_directory(upload_folder(), attachment.stored_name, as_attachment=True,
+                                       download_name=attachment.filename, mimetype=attachment.mimetype,
+                                       etag=digest or True, max_age=0)
+    return _cache_headers(response, digest)
+
+def _cache_headers(response, digest):
+    response.cache_control.public = False
+    response.cache_control.private = True  # downloads need a login, so no shared caches
+    response.expires = None
+    if digest:
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = current_app.config['ATTACHMENT_MAX_AGE']
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+        response.cache_control.max_age = None
+    return response
+
+def _offloaded(attachment, digest):
+    """An empty response telling nginx (X-Accel-Redirect) or Apache/lighttpd (X-Sendfile) what to send."""
+    mode = current_app.config['ATTACHMENT_OFFLOAD']
+    response = current_app.response_class(
+        mimetype=attachment.mimetype or mimetypes.guess_type(attachment.filename)[0] or 'application/octet-stream')
+    response.headers.set('Content-Disposition', 'attachment', filename=attachment.filename)
+    if digest:
+        response.set_etag(digest)
+        if request.if_none_match.contains(digest):
+            response.status_code = 304
+            return response
+    if mode == 'x-accel-redirect':
+        prefix = current_app.config['ATTACHMENT_OFFLOAD_PREFIX'].rstrip('/')
+        response.headers['X-Accel-Redirect'] = f'{prefix}/{attachment.stored_name}'
+    elif mode == 'x-sendfile':
+        response.headers['X-Sendfile'] = os.path.abspath(os.path.join(upload_folder(), attachment.stored_name))
+    else:
+        raise ValueError(f'Unknown ATTACHMENT_OFFLOAD mode: {mode}')
+    return response
 
 @attachments_bp.route('/<int:attachment_id>', methods=['DELETE'])
 @token_required
@@ -76,9 +228,17 @@ def delete_attachment(current_user, attachment_id):
     attachment = Attachment.query.get_or_404(attachment_id)
     if attachment.user_id != current_user.id:
         return jsonify({'error': 'Can only delete your own attachments'}), 403
-    path = os.path.join(UPLOAD_FOLDER, attachment.stored_name)
-    if os.path.exists(path):
-        os.remove(path)
-    db.session.delete(attachment)
+    db.session.delete(attachment)  # drops the blob reference; the file goes with the last one
     db.session.commit()
     return jsonify({'message': 'Deleted'})
+
+@attachments_bp.cli.command('gc')
+@click.option('--dry-run', is_flag=True, help='Report what would change without touching anything.')
+@click.option('--grace', default=3600, show_default=True, help='Leave files younger than this many seconds.')
+def gc_command(dry_run, grace):
+    """Adopt legacy files as blobs, fix reference counts and delete orphaned files."""
+    report = blobs.collect_garbage(dry_run=dry_run, grace_seconds=grace)
+    missing = report.pop('missing')
+    click.echo(('[dry run] ' if dry_run else '') + ', '.join(f'{k}={v}' for k, v in report.items()))
+    if missing:
+        click.echo(f"attachments with missing files: {', '.join(map(str, missing))}")
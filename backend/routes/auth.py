@@ -4,7 +4,10 @@ from functools import wraps
 from flask import Blueprint, request, jsonify, current_app
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
+from sqlalchemy import event
 from models import db, User, ProjectMember, Project, ActivityLog
+from services.auth_cache import Principal, principal_cache
+from services.users import remember_username
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -25,18 +28,29 @@ def token_required(f):
         if not token:
             return jsonify({'message': 'Token is missing!'}), 401
 
-        try:
-            data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
-            current_user = User.query.filter_by(id=data['user_id']).first()
-            if not current_user:
-                return jsonify({'message': 'Token is invalid or user no longer exists!'}), 401
-        except jwt.PyJWTError:
-            return jsonify({'message': 'Token is invalid!'}), 401
+        current_user = principal_cache.get(token)
+        if current_user is None:
+            try:
+                data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=["HS256"])
+                user = User.query.filter_by(id=data['user_id']).first()
+                if not user:
+                    return jsonify({'message': 'Token is invalid or user no longer exists!'}), 401
+            except jwt.PyJWTError:
+                return jsonify({'message': 'Token is invalid!'}), 401
+            current_user = Principal.from_user(user)
+            principal_cache.put(token, current_user, data.get('exp'))
+        remember_username(current_user.id, current_user.username)
 
         return f(current_user, *args, **kwargs)
 
     return decorated
 
+@event.listens_for(User, 'after_delete')
+def _evict_deleted_user(mapper, connection, target):
+    """Deleted users must not keep authenticating from the token cache."""
+    _ = mapper, connection
+    principal_cache.invalidate_user(target.id)
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """Register a new user account."""
@@ -88,3 +102,10 @@ def login():
     }, current_app.config['SECRET_KEY'], algorithm="HS256")
 
     return jsonify({'token': token, 'username': user.username, 'user_id': user.id})
+
+@auth_bp.route('/cache-stats', methods=['GET'])
+@token_required
+def cache_stats(current_user):
+    """Hit/miss counters for the authenticated-principal cache."""
+    _ = current_user
+    return jsonify(principal_cache.stats())
@@ -1,24 +1,54 @@
 """Task comments CRUD routes."""
 from flask import Blueprint, jsonify, request
-from models import db, Task, TaskComment, User, ActivityLog
+from sqlalchemy import tuple_
+from models import db, Task, TaskComment, ActivityLog
 from routes.auth import token_required
+from routes.tasks import publish_comment_event, encode_cursor, decode_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.users import usernames_for
+from services.database import read_only
 
 comments_bp = Blueprint('comments', __name__)
 
 @comments_bp.route('/task/<int:task_id>', methods=['GET'])
 @token_required
+@read_only
 def get_comments(current_user, task_id):
+    """List a task's comments, oldest first.
+
+    Pass ``limit`` (and then ``cursor``) to page through long threads; the
+    response becomes ``{'comments': [...], 'next_cursor': ...}``.
+    """
     _ = current_user
-    task = Task.query.get_or_404(task_id)
-    _ = task
-    comments = TaskComment.query.filter_by(task_id=task_id).order_by(TaskComment.created_at.asc()).all()
-    return jsonify([{
+    Task.query.get_or_404(task_id)
+    comments = TaskComment.query.filter_by(task_id=task_id)
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            comments = comments.filter(tuple_(TaskComment.created_at, TaskComment.id) > decode_cursor(cursor))
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    comments = comments.order_by(TaskComment.created_at.asc(), TaskComment.id.asc())
+
+    paginated = 'limit' in request.args or cursor
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    rows = comments.limit(limit + 1).all() if paginated else comments.all()
+    has_more = paginated and len(rows) > limit
+    rows = rows[:limit] if paginated else rows
+
+    usernames = usernames_for(c.user_id for c in rows)
+    result = [{
         'id': c.id,
         'content': c.content,
         'user_id': c.user_id,
-        'username': User.query.get(c.user_id).username if c.user_id else 'Unknown',
+        'username': usernames.get(c.user_id, 'Unknown'),
         'created_at': c.created_at.isoformat()
-    } for c in comments])
+    } for c in rows]
+    if not paginated:
+        return jsonify(result)
+    return jsonify({
+        'comments': result,
+        'next_cursor': encode_cursor(result[-1]) if has_more else None
+    })
 
 @comments_bp.route('/task/<int:task_id>', methods=['POST'])
 @token_required
@@ -40,6 +70,8 @@ def add_comment(current_user, task_id):
         description=f"{current_user.username} commented on task '{task.title}'"
     )
     db.session.add(log)
+    db.session.flush()
+    publish_comment_event(task.project_id, task_id, comment.id, 'comment_added')
     db.session.commit()
 
     return jsonify({
@@ -57,5 +89,7 @@ def delete_comment(current_user, comment_id):
     if comment.user_id != current_user.id:
         return jsonify({'error': 'You can only delete your own comments'}), 403
     db.session.delete(comment)
+    db.session.flush()
+    publish_comment_event(comment.task.project_id, comment.task_id, comment.id, 'comment_deleted')
     db.session.commit()
     return jsonify({'message': 'Comment deleted'})
@@ -1,146 +1,201 @@
 """GitHub routes for fetching public commit and issue data from GitHub."""
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, url_for
 import requests
-from models import db, Project, Task, ActivityLog
+from sqlalchemy import insert, update
+from models import db, Project, Task, TaskStatusChange, ActivityLog
 from routes.auth import token_required
+from routes.tasks import board_channel
+from services.burndown import refresh_sprint_snapshot
+from services.pubsub import publish_after_commit
+from services import jobs, project_stats, versioning
+from services.github_client import get_client, GitHubError
 
 github_bp = Blueprint('github', __name__)
 
+IMPORT_BATCH_SIZE = 500
+
+def _clean_repo(repo):
+    # Clean the repo string in case user pasted a full URL or .git
+    clean_repo = repo.replace('https://github.com/', '').replace('http://github.com/', '')
+    if clean_repo.endswith('.git'):
+        clean_repo = clean_repo[:-4]
+    return clean_repo
+
+def _github_failure(message, err):
+    if isinstance(err, GitHubError):
+        return jsonify({'message': message}), err.status_code
+    return jsonify({'message': f'{message} (GitHub unreachable)'}), 502
+
 @github_bp.route('/commits/<path:repo_path>', methods=['GET'])
 @token_required
 def get_commits(current_user, repo_path):
     """Fetch public commits from a specified GitHub repository."""
     _ = current_user
-    
-    # Clean the repo string in case user pasted a full URL or .git
-    clean_repo = repo_path.replace('https://github.com/', '').replace('http://github.com/', '')
-    if clean_repo.endswith('.git'):
-        clean_repo = clean_repo[:-4]
-        
-    url = f"https://api.github.com/repos/{clean_repo}/commits"
-    response = requests.get(url, timeout=10)
-    if response.status_code == 200:
-        commits = response.json()
-        result = []
-        if isinstance(commits, list):
-            for c in commits[:10]: # Return top 10
-                if isinstance(c, dict) and 'commit' in c:
-                    result.append({
-                        'sha': c.get('sha', ''),
-                        'message': c['commit'].get('message', ''),
-                        'author': c['commit'].get('author', {}).get('name', ''),
-                        'date': c['commit'].get('author', {}).get('date', '')
-                    })
-        return jsonify(result)
-    return jsonify({'message': 'Failed to fetch commits from GitHub API'}), response.status_code
+    try:
+        commits = get_client().get(f"/repos/{_clean_repo(repo_path)}/commits", {'per_page': 10})
+    except (GitHubError, requests.RequestException) as err:
+        return _github_failure('Failed to fetch commits from GitHub API', err)
+
+    result = []
+    if isinstance(commits, list):
+        for c in commits[:10]: # Return top 10
+            if isinstance(c, dict) and 'commit' in c:
+                result.append({
+                    'sha': c.get('sha', ''),
+                    'message': c['commit'].get('message', ''),
+                    'author': c['commit'].get('author', {}).get('name', ''),
+                    'date': c['commit'].get('author', {}).get('date', '')
+                })
+    return jsonify(result)
 
 @github_bp.route('/issues/<path:repo_path>', methods=['GET'])
 @token_required
 def get_issues(current_user, repo_path):
     """Fetch open issues and pull requests from a specified GitHub repository."""
     _ = current_user
-    
-    # Clean the repo string in case user pasted a full URL or .git
-    clean_repo = repo_path.replace('https://github.com/', '').replace('http://github.com/', '')
-    if clean_repo.endswith('.git'):
-        clean_repo = clean_repo[:-4]
-        
-    url = f"https://api.github.com/repos/{clean_repo}/issues?state=open"
     # GitHub API returns both issues and PRs in the issues endpoint. PRs have a pull_request key.
-    response = requests.get(url, timeout=10)
-    if response.status_code == 200:
-        all_issues = response.json()
-        
-        issues = []
-        prs = []
-
-        if isinstance(all_issues, list):
-            for item in all_issues[:20]: # Parse top 20
-                if isinstance(item, dict):
-                    record = {
-                        'id': item.get('id'),
-                        'number': item.get('number'),
-                        'title': item.get('title'),
-                        'user': item.get('user', {}).get('login') if isinstance(item.get('user'), dict) else None,
-                        'url': item.get('html_url'),
-                        'created_at': item.get('created_at')
-                    }
-                    if 'pull_request' in item:
-                        prs.append(record)
-                    else:
-                        issues.append(record)
-
-            return jsonify({
-                'issues': issues[:5], 
-                'pull_requests': prs[:5]
-            })
-        return jsonify({'issues': [], 'pull_requests': []})
-    return jsonify({'message': 'Failed to fetch issues/PRs from GitHub API'}), response.status_code
+    try:
+        all_issues = get_client().get(f"/repos/{_clean_repo(repo_path)}/issues", {'state': 'open', 'per_page': 20})
+    except (GitHubError, requests.RequestException) as err:
+        return _github_failure('Failed to fetch issues/PRs from GitHub API', err)
+
+    issues = []
+    prs = []
+    if isinstance(all_issues, list):
+        for item in all_issues[:20]: # Parse top 20
+            if isinstance(item, dict):
+                record = {
+                    'id': item.get('id'),
+                    'number': item.get('number'),
+                    'title': item.get('title'),
+                    'user': item.get('user', {}).get('login') if isinstance(item.get('user'), dict) else None,
+                    'url': item.get('html_url'),
+                    'created_at': item.get('created_at')
+                }
+                if 'pull_request' in item:
+                    prs.append(record)
+                else:
+                    issues.append(record)
+
+    return jsonify({
+        'issues': issues[:5], 
+        'pull_requests': prs[:5]
+    })
+
+def _import_row(item, project_id):
+    return {
+        'title': item.get('title'),
+        'description': f"{item.get('body') or ''}\n\n*Imported from GitHub Issue #{item.get('number')}*",
+        'status': 'todo' if item.get('state') == 'open' else 'done',
+        'priority': 'medium',
+        'project_id': project_id,
+        'github_issue_id': item.get('id')
+    }
+
+def _import_batch(project_id, user_id, batch, existing, touched_sprints):
+    """Insert/update one batch of issues with executemany statements; returns (imported, updated)."""
+    new_rows, closed = [], []
+    for item in batch:
+        issue_id = item.get('id')
+        if issue_id not in existing:
+            existing[issue_id] = None  # duplicates later in the feed are skipped
+            new_rows.append(_import_row(item, project_id))
+        elif existing[issue_id] is not None:
+            # Update status of existing task if it was closed on GitHub
+            task_id, status, sprint_id = existing[issue_id]
+            if item.get('state') == 'closed' and status != 'done':
+                closed.append((task_id, status, sprint_id))
+                existing[issue_id] = (task_id, 'done', sprint_id)
+
+    changes = []
+    if new_rows:
+        new_ids = db.session.scalars(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True), new_rows
+        ).all()
+        changes += [{'task_id': task_id, 'sprint_id': None, 'user_id': user_id,
+                     'from_status': None, 'to_status': row['status']}
+                    for task_id, row in zip(new_ids, new_rows)]
+    if closed:
+        db.session.execute(update(Task), [{'id': task_id, 'status': 'done'} for task_id, _, _ in closed])
+        changes += [{'task_id': task_id, 'sprint_id': sprint_id, 'user_id': user_id,
+                     'from_status': status, 'to_status': 'done'}
+                    for task_id, status, sprint_id in closed]
+        touched_sprints.update(sprint_id for _, _, sprint_id in closed if sprint_id)
+    if changes:
+        db.session.execute(insert(TaskStatusChange), changes)
+    return len(new_rows), len(closed)
+
+def run_import(job):
+    """Job body: page through the repo's open issues and sync them into the project's tasks."""
+    project_id, user_id = job.project_id, job.user_id
+    project = db.session.get(Project, project_id)
+    if project is None or not project.github_repo:
+        raise ValueError('No GitHub repository linked to this project')
+    try:
+        all_issues, truncated = get_client().get_pages(f"/repos/{_clean_repo(project.github_repo)}/issues",
+                                                       {'state': 'open', 'per_page': 100})
+    except GitHubError as err:
+        raise RuntimeError(f'Failed to fetch issues from GitHub ({err.status_code})') from err
+    except requests.RequestException as err:
+        raise RuntimeError('Failed to fetch issues from GitHub (GitHub unreachable)') from err
+
+    # We don't want to import PRs as tasks
+    issues = [i for i in all_issues or [] if isinstance(i, dict) and 'pull_request' not in i]
+    job.report(0, len(issues))
+
+    # Existing tasks by issue id, to avoid duplicates and to update their status
+    existing = {issue_id: (task_id, status, sprint_id) for issue_id, task_id, status, sprint_id in
+                db.session.query(Task.github_issue_id, Task.id, Task.status, Task.sprint_id)
+                .filter(Task.project_id == project_id, Task.github_issue_id.isnot(None))}
+    imported_count = 0
+    updated_count = 0
+    touched_sprints = set()
+    for start in range(0, len(issues), IMPORT_BATCH_SIZE):
+        batch = issues[start:start + IMPORT_BATCH_SIZE]
+        imported, updated = _import_batch(project_id, user_id, batch, existing, touched_sprints)
+        imported_count += imported
+        updated_count += updated
+        if imported or updated:
+            versioning.bump([project_id])  # bulk statements skip the flush hook
+        job.report(start + len(batch))  # commits the batch together with the progress
+
+    if imported_count > 0 or updated_count > 0:
+        for sprint_id in touched_sprints:
+            refresh_sprint_snapshot(sprint_id)
+        log = ActivityLog(
+            project_id=project_id,
+            user_id=user_id,
+            action_type='github_sync',
+            description=f"Imported {imported_count} new issues and synced {updated_count} existing issues from GitHub"
+        )
+        db.session.add(log)
+        # Bulk statements bypass the per-task board events; tell open boards to refetch
+        publish_after_commit(board_channel(project_id), 'resync', {'reason': 'github_import'})
+        db.session.commit()
+        project_stats.invalidate(project_id)
+
+    message = f'Successfully imported {imported_count} new issues and synced {updated_count} issues'
+    if truncated:
+        message += '; stopped early to stay within the GitHub rate limit, run the import again to fetch the rest'
+    return {
+        'message': message,
+        'count': imported_count,
+        'updated': updated_count,
+        'truncated': truncated
+    }
 
 @github_bp.route('/import_issues/<int:project_id>', methods=['POST'])
 @token_required
 def import_issues(current_user, project_id):
-    """Fetch open issues from GitHub and convert them to project Tasks."""
+    """Queue a background import of the linked repo's open issues; poll the returned job."""
     project = Project.query.get_or_404(project_id)
     if not project.github_repo:
         return jsonify({'message': 'No GitHub repository linked to this project'}), 400
-        
-    clean_repo = project.github_repo.replace('https://github.com/', '').replace('http://github.com/', '')
-    if clean_repo.endswith('.git'):
-        clean_repo = clean_repo[:-4]
-        
-    url = f"https://api.github.com/repos/{clean_repo}/issues?state=open"
-    response = requests.get(url, timeout=10)
-    
-    if response.status_code != 200:
-        return jsonify({'message': 'Failed to fetch issues from GitHub'}), response.status_code
-        
-    all_issues = response.json()
-    imported_count = 0
-    
-    if isinstance(all_issues, list):
-        # Fetch existing tasks to avoid duplicates and to update their status
-        existing_tasks_by_issue_id = {t.github_issue_id: t for t in Task.query.filter(Task.project_id == project_id, Task.github_issue_id.isnot(None)).all()}
-        
-        updated_count = 0
-
-        for item in all_issues:
-            # We don't want to import PRs as tasks
-            if isinstance(item, dict) and 'pull_request' not in item:
-                issue_id = item.get('id')
-                state = item.get('state')
-                
-                if issue_id not in existing_tasks_by_issue_id:
-                    # Create new task
-                    new_task = Task(
-                        title=item.get('title'),
-                        description=f"{item.get('body') or ''}\n\n*Imported from GitHub Issue #{item.get('number')}*",
-                        status='todo' if state == 'open' else 'done',
-                        priority='medium',
-                        project_id=project_id,
-                        github_issue_id=issue_id
-                    )
-                    db.session.add(new_task)
-                    imported_count += 1
-                else:
-                    # Update status of existing task if it was closed on GitHub
-                    task = existing_tasks_by_issue_id[issue_id]
-                    if state == 'closed' and task.status != 'done':
-                        task.status = 'done'
-                        updated_count += 1
-                        
-        if imported_count > 0 or updated_count > 0:
-            log = ActivityLog(
-                project_id=project_id,
-                user_id=current_user.id,
-                action_type='github_sync',
-                description=f"Imported {imported_count} new issues and synced {updated_count} existing issues from GitHub"
-            )
-            db.session.add(log)
-            db.session.commit()
-            
+
+    job = jobs.enqueue('github_import', run_import, project_id=project_id, user_id=current_user.id)
     return jsonify({
-        'message': f'Successfully imported {imported_count} new issues and synced {updated_count} issues',
-        'count': imported_count,
-        'updated': updated_count
-    })
+        'message': 'GitHub issue import started',
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('jobs.get_job', job_id=job.id)
+    }), 202
@@ -1,11 +1,37 @@
-"""iCal export route — generates .ics file for ALL project tasks and sprints."""
-from flask import Blueprint, Response
+"""iCal export route — generates .ics file for ALL project tasks and sprints.
+
+The calendar is streamed one event at a time (tasks are read with ``yield_per``)
+and the rendered body is cached per project version, so calendar clients
+re-polling an unchanged project get a 304 or the cached bytes without a re-render.
+The version is the database counter shared by all workers (services/versioning.py),
+so a write handled anywhere retires every worker's cached body.
+"""
+import hashlib
+import hmac
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import Blueprint, Response, jsonify, current_app, stream_with_context, url_for
+from sqlalchemy.orm import lazyload
 from models import Task, Sprint, Project
 from routes.auth import token_required
+from services.versioning import conditional_by_project, project_version, request_version
+from services.database import read_only
 from datetime import datetime, timezone, timedelta
 
 ical_bp = Blueprint('ical', __name__)
 
+STATUS_MAP = {'todo': 'NEEDS-ACTION', 'in_progress': 'IN-PROCESS', 'done': 'COMPLETED'}
+PRIORITY_MAP = {'high': '1', 'medium': '5', 'low': '9'}
+SPRINT_EMOJI = {'planned': '📋', 'active': '🏃', 'completed': '🏁'}
+
+YIELD_PER = 500
+CACHE_ENTRIES = 64
+MAX_CACHED_BYTES = 4 * 1024 * 1024
+
+_cache = OrderedDict()  # (project_id, shared version) -> (body, filename); per process, LRU-bounded
+_cache_lock = threading.Lock()
+
 def _ical_dt(dt):
     """Format datetime for iCal (UTC)."""
     if dt is None:
@@ -21,107 +47,161 @@ def _ical_date(dt):
 def _escape(text):
     return (text or '').replace('\\', '\\\\').replace('\n', '\\n').replace(',', '\\,').replace(';', '\\;')
 
-@ical_bp.route('/project/<int:project_id>', methods=['GET'])
-@token_required
-def export_project_ical(current_user, project_id):
-    _ = current_user
-    project = Project.query.get_or_404(project_id)
-    tasks = Task.query.filter_by(project_id=project_id).all()
-    sprints = Sprint.query.filter_by(project_id=project_id).all()
-
-    now = _ical_dt(datetime.utcnow())
-    status_map = {'todo': 'NEEDS-ACTION', 'in_progress': 'IN-PROCESS', 'done': 'COMPLETED'}
+def _task_event(t, project_name, now):
+    uid = f"task-{t.id}@gitmanager"
+    vstatus = STATUS_MAP.get(t.status, 'NEEDS-ACTION')
+    vpriority = PRIORITY_MAP.get(t.priority, '5')
+    check = "✅ " if t.status == "done" else "🔲 "
 
-    lines = [
-        'BEGIN:VCALENDAR',
-        'VERSION:2.0',
-        f'PRODID:-//GitManager//{_escape(project.name)}//EN',
-        'CALSCALE:GREGORIAN',
-        'METHOD:PUBLISH',
-        f'X-WR-CALNAME:{_escape(project.name)}',
+    if t.due_date:
+        # Task has a due date — proper timed event
+        assignee_line = f'\\nAssigned to: {t.assignee_id}' if t.assignee_id else ''
+        return [
+            'BEGIN:VEVENT',
+            f'UID:{uid}',
+            f'DTSTAMP:{now}',
+            f'DTSTART:{_ical_dt(t.due_date)}',
+            f'DTEND:{_ical_dt(t.due_date + timedelta(hours=1))}',
+            f'SUMMARY:{check}{_escape(t.title)}',
+            f'DESCRIPTION:Project: {project_name}\\nPriority: {t.priority}\\nStatus: {t.status}{assignee_line}',
+            f'STATUS:{vstatus}',
+            f'PRIORITY:{vpriority}',
+            'END:VEVENT',
+        ]
+    # No due date — use creation date as an all-day event
+    created = t.created_at or datetime.utcnow()
+    return [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{now}',
+        f'DTSTART;VALUE=DATE:{_ical_date(created)}',
+        f'DTEND;VALUE=DATE:{_ical_date(created + timedelta(days=1))}',
+        f'SUMMARY:{check}{_escape(t.title)} [no due date]',
+        f'DESCRIPTION:Project: {project_name}\\nPriority: {t.priority}\\nStatus: {t.status}',
+        f'STATUS:{vstatus}',
+        f'PRIORITY:{vpriority}',
+        'END:VEVENT',
     ]
 
-    for t in tasks:
-        uid = f"task-{t.id}@gitmanager"
-        vstatus = status_map.get(t.status, 'NEEDS-ACTION')
-        priority_map = {'high': '1', 'medium': '5', 'low': '9'}
-        vpriority = priority_map.get(t.priority, '5')
-
-        if t.due_date:
-            # Task has a due date — proper timed event
-            dtstart = _ical_dt(t.due_date)
-            dtend = _ical_dt(t.due_date + timedelta(hours=1))
-            lines += [
-                'BEGIN:VEVENT',
-                f'UID:{uid}',
-                f'DTSTAMP:{now}',
-                f'DTSTART:{dtstart}',
-                f'DTEND:{dtend}',
-                f'SUMMARY:{"✅ " if t.status == "done" else "🔲 "}{_escape(t.title)}',
-                f'DESCRIPTION:Project: {_escape(project.name)}\\nPriority: {t.priority}\\nStatus: {t.status}{"\\nAssigned to: " + str(t.assignee_id) if t.assignee_id else ""}',
-                f'STATUS:{vstatus}',
-                f'PRIORITY:{vpriority}',
-                'END:VEVENT',
-            ]
-        else:
-            # No due date — use creation date as an all-day event
-            created = t.created_at or datetime.utcnow()
-            date_str = _ical_date(created)
-            next_date = _ical_date(created + timedelta(days=1))
-            lines += [
-                'BEGIN:VEVENT',
-                f'UID:{uid}',
-                f'DTSTAMP:{now}',
-                f'DTSTART;VALUE=DATE:{date_str}',
-                f'DTEND;VALUE=DATE:{next_date}',
-                f'SUMMARY:{"✅ " if t.status == "done" else "🔲 "}{_escape(t.title)} [no due date]',
-                f'DESCRIPTION:Project: {_escape(project.name)}\\nPriority: {t.priority}\\nStatus: {t.status}',
-                f'STATUS:{vstatus}',
-                f'PRIORITY:{vpriority}',
-                'END:VEVENT',
-            ]
+def _sprint_event(s, now):
+    uid = f"sprint-{s.id}@gitmanager"
+    status_emoji = SPRINT_EMOJI.get(s.status, '📌')
 
-    # Sprints → spanning VEVENT (fall back to creation date if no dates set)
-    for s in sprints:
-        uid = f"sprint-{s.id}@gitmanager"
-        status_emoji = {'planned': '📋', 'active': '🏃', 'completed': '🏁'}.get(s.status, '📌')
-
-        if s.start_date and s.end_date:
-            dtstart = _ical_dt(s.start_date)
-            dtend = _ical_dt(s.end_date)
-        else:
-            # No dates set — use creation date as a single all-day event
-            created = s.created_at or datetime.utcnow()
-            dtstart = f'DTSTART;VALUE=DATE:{_ical_date(created)}'
-            dtend = f'DTEND;VALUE=DATE:{_ical_date(created + timedelta(days=1))}'
-            lines += [
-                'BEGIN:VEVENT',
-                f'UID:{uid}',
-                f'DTSTAMP:{now}',
-                dtstart,
-                dtend,
-                f'SUMMARY:{status_emoji} Sprint: {_escape(s.name)} [{s.status}]',
-                f'DESCRIPTION:Sprint status: {s.status}\\nSet start/end dates in the Sprints page for a proper range.',
-                'END:VEVENT',
-            ]
-            continue
-
-        lines += [
+    if s.start_date and s.end_date:
+        return [
             'BEGIN:VEVENT',
             f'UID:{uid}',
             f'DTSTAMP:{now}',
-            f'DTSTART:{dtstart}',
-            f'DTEND:{dtend}',
+            f'DTSTART:{_ical_dt(s.start_date)}',
+            f'DTEND:{_ical_dt(s.end_date)}',
             f'SUMMARY:{status_emoji} Sprint: {_escape(s.name)}',
             f'DESCRIPTION:Sprint status: {s.status}',
             'END:VEVENT',
         ]
+    # No dates set — use creation date as a single all-day event
+    created = s.created_at or datetime.utcnow()
+    return [
+        'BEGIN:VEVENT',
+        f'UID:{uid}',
+        f'DTSTAMP:{now}',
+        f'DTSTART;VALUE=DATE:{_ical_date(created)}',
+        f'DTEND;VALUE=DATE:{_ical_date(created + timedelta(days=1))}',
+        f'SUMMARY:{status_emoji} Sprint: {_escape(s.name)} [{s.status}]',
+        f'DESCRIPTION:Sprint status: {s.status}\\nSet start/end dates in the Sprints page for a proper range.',
+        'END:VEVENT',
+    ]
 
-    lines.append('END:VCALENDAR')
-    ical_content = '\r\n'.join(lines)
-    filename = f"{project.name.replace(' ', '_')}_calendar.ics"
+def _render(project, now):
+    """Yield the calendar as CRLF-terminated chunks, one event per chunk."""
+    name = _escape(project.name)
+    yield '\r\n'.join([
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:-//GitManager//{name}//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{name}',
+    ]) + '\r\n'
+    tasks = Task.query.filter_by(project_id=project.id).options(lazyload(Task.labels)).order_by(Task.id)
+    for t in tasks.yield_per(YIELD_PER):
+        yield '\r\n'.join(_task_event(t, name, now)) + '\r\n'
+    # Sprints → spanning VEVENT (fall back to creation date if no dates set)
+    for s in Sprint.query.filter_by(project_id=project.id).order_by(Sprint.id).yield_per(YIELD_PER):
+        yield '\r\n'.join(_sprint_event(s, now)) + '\r\n'
+    yield 'END:VCALENDAR\r\n'
+
+def _caching(chunks, key, filename):
+    """Pass chunks through, keeping a copy for the cache if the project didn't change meanwhile."""
+    parts, size = [], 0
+    for chunk in chunks:
+        if parts is not None:
+            parts.append(chunk)
+            size += len(chunk)
+            if size > MAX_CACHED_BYTES:
+                parts = None
+        yield chunk
+    if parts is not None and project_version(key[0])[0] == key[1]:
+        with _cache_lock:
+            _cache[key] = (''.join(parts), filename)
+            while len(_cache) > CACHE_ENTRIES:
+                _cache.popitem(last=False)
+
+def _calendar_response(project_id):
+    version, last_modified = request_version(project_id)
+    key = (project_id, version)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached:
+            _cache.move_to_end(key)
+    if cached:
+        body, filename = cached
+    else:
+        project = Project.query.get_or_404(project_id)
+        filename = f"{project.name.replace(' ', '_')}_calendar.ics"
+        # DTSTAMP follows the project's last change so unchanged data renders identically
+        body = stream_with_context(_caching(_render(project, _ical_dt(last_modified)), key, filename))
     return Response(
-        ical_content,
+        body,
         mimetype='text/calendar',
         headers={'Content-Disposition': f'attachment; filename="{filename}"'}
     )
+
+def _feed_signature(project_id):
+    key = current_app.config['SECRET_KEY'].encode()
+    return hmac.new(key, f'ical-feed:{project_id}'.encode(), hashlib.sha256).hexdigest()[:32]
+
+def signed_feed(f):
+    """Authorize calendar-app requests by the HMAC in the URL instead of a JWT."""
+    @wraps(f)
+    def decorated(project_id, signature):
+        if not hmac.compare_digest(signature, _feed_signature(project_id)):
+            return jsonify({'message': 'Invalid calendar feed link'}), 404
+        return f(project_id=project_id)
+
+    return decorated
+
+@ical_bp.route('/project/<int:project_id>', methods=['GET'])
+@token_required
+@conditional_by_project
+@read_only
+def export_project_ical(current_user, project_id):
+    _ = current_user
+    return _calendar_response(project_id)
+
+@ical_bp.route('/project/<int:project_id>/subscribe', methods=['GET'])
+@token_required
+def get_subscription_url(current_user, project_id):
+    """Return a long-lived feed URL calendar apps can poll without a JWT."""
+    _ = current_user
+    Project.query.get_or_404(project_id)
+    url = url_for('ical.project_feed', project_id=project_id,
+                  signature=_feed_signature(project_id), _external=True)
+    return jsonify({'url': url, 'webcal_url': 'webcal://' + url.split('://', 1)[1]})
+
+@ical_bp.route('/feed/<int:project_id>/<signature>.ics', methods=['GET'])
+@signed_feed
+@conditional_by_project
+@read_only
+def project_feed(project_id):
+    """Signed, token-free calendar feed for subscriptions (ETag/304 aware)."""
+    return _calendar_response(project_id)
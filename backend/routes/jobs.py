@@ -0,0 +1,24 @@
+"""Background job status routes."""
+from flask import Blueprint, jsonify
+from models import Job
+from routes.auth import token_required
+from services.jobs import serialize
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@token_required
+def get_job(current_user, job_id):
+    """Poll the status/progress of a background job started by the current user."""
+    job = Job.query.get_or_404(job_id)
+    if job.user_id != current_user.id:
+        return jsonify({'message': 'Unauthorized'}), 403
+    return jsonify(serialize(job))
+
+@jobs_bp.route('/project/<int:project_id>', methods=['GET'])
+@token_required
+def list_project_jobs(current_user, project_id):
+    """Recent background jobs for a project (latest 20)."""
+    _ = current_user
+    jobs = Job.query.filter_by(project_id=project_id).order_by(Job.created_at.desc()).limit(20).all()
+    return jsonify([serialize(j) for j in jobs])
@@ -2,6 +2,8 @@
 from flask import Blueprint, jsonify, request
 from models import db, Label, Task, Project, ProjectMember
 from routes.auth import token_required
+from services.versioning import conditional_by_project
+from routes.tasks import publish_label_event
 
 labels_bp = Blueprint('labels', __name__)
 
@@ -13,6 +15,7 @@ def _member_or_owner(project_id, user_id):
 
 @labels_bp.route('/project/<int:project_id>', methods=['GET'])
 @token_required
+@conditional_by_project
 def get_labels(current_user, project_id):
     _ = current_user
     labels = Label.query.filter_by(project_id=project_id).all()
@@ -53,6 +56,7 @@ def assign_label(current_user, task_id):
     label = Label.query.get_or_404(label_id)
     if label not in task.labels:
         task.labels.append(label)
+        publish_label_event(task.project_id, task.id, label, assigned=True)
         db.session.commit()
     return jsonify({'message': 'Label assigned'})
 
@@ -66,5 +70,6 @@ def remove_label(current_user, task_id):
     label = Label.query.get(label_id)
     if label and label in task.labels:
         task.labels.remove(label)
+        publish_label_event(task.project_id, task.id, label, assigned=False)
         db.session.commit()
     return jsonify({'message': 'Label removed'})
@@ -1,24 +1,39 @@
 """Notification routes for in-app notification system."""
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, Response, stream_with_context, current_app
+from sqlalchemy import event
 from models import db, Notification
 from routes.auth import token_required
+from services.pubsub import broker, publish_after_commit, sse_stream
 
 notifications_bp = Blueprint('notifications', __name__)
 
-@notifications_bp.route('/', methods=['GET'])
-@token_required
-def get_notifications(current_user):
-    """Get all notifications for the current user (latest 30)."""
-    notifs = Notification.query.filter_by(user_id=current_user.id)\
-        .order_by(Notification.created_at.desc()).limit(30).all()
-    return jsonify([{
+def _serialize(n):
+    return {
         'id': n.id,
         'message': n.message,
         'link': n.link,
         'is_read': n.is_read,
         'created_at': n.created_at.isoformat(),
         'project_id': n.project_id
-    } for n in notifs])
+    }
+
+def _channel(user_id):
+    return f'user:{user_id}'
+
+@event.listens_for(Notification, 'after_insert')
+def _push_new_notification(mapper, connection, target):
+    """Every new Notification row is pushed to its owner's stream once committed."""
+    _ = mapper, connection
+    publish_after_commit(_channel(target.user_id), 'notification',
+                         {'notification': _serialize(target), 'unread_delta': 0 if target.is_read else 1})
+
+@notifications_bp.route('/', methods=['GET'])
+@token_required
+def get_notifications(current_user):
+    """Get all notifications for the current user (latest 30)."""
+    notifs = Notification.query.filter_by(user_id=current_user.id)\
+        .order_by(Notification.created_at.desc()).limit(30).all()
+    return jsonify([_serialize(n) for n in notifs])
 
 @notifications_bp.route('/unread-count', methods=['GET'])
 @token_required
@@ -27,12 +42,36 @@ def get_unread_count(current_user):
     count = Notification.query.filter_by(user_id=current_user.id, is_read=False).count()
     return jsonify({'count': count})
 
+@notifications_bp.route('/stream', methods=['GET'])
+@token_required
+def stream_notifications(current_user):
+    """Server-Sent Events stream of new notifications and unread-count deltas.
+
+    Pass the JWT as ``?token=`` (EventSource cannot set headers). Browsers resend
+    ``Last-Event-ID`` on reconnect and missed events are replayed; if they are no
+    longer available a ``resync`` event tells the client to refetch.
+    """
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    subscription = broker.subscribe(_channel(current_user.id), last_event_id)
+    # The stream reads the event log on short-lived connections; hand this one back to the pool
+    db.session.remove()
+    heartbeat = current_app.config.get('SSE_HEARTBEAT_SECONDS', 15)
+    poll = current_app.config.get('SSE_POLL_SECONDS', 1)
+    return Response(
+        stream_with_context(sse_stream(subscription, heartbeat, poll)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @notifications_bp.route('/mark-read', methods=['POST'])
 @token_required
 def mark_all_read(current_user):
     """Mark all notifications as read for the current user."""
-    Notification.query.filter_by(user_id=current_user.id, is_read=False)\
+    updated = Notification.query.filter_by(user_id=current_user.id, is_read=False)\
         .update({'is_read': True})
+    if updated:
+        publish_after_commit(_channel(current_user.id), 'read', {'all': True, 'unread_delta': -updated})
     db.session.commit()
     return jsonify({'message': 'All notifications marked as read'})
 
@@ -43,6 +82,8 @@ def mark_one_read(current_user, notif_id):
     notif = Notification.query.get_or_404(notif_id)
     if notif.user_id != current_user.id:
         return jsonify({'message': 'Unauthorized'}), 403
+    if not notif.is_read:
+        publish_after_commit(_channel(current_user.id), 'read', {'id': notif.id, 'unread_delta': -1})
     notif.is_read = True
     db.session.commit()
     return jsonify({'message': 'Notification marked as read'})
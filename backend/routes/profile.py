@@ -2,12 +2,15 @@
 from flask import Blueprint, request, jsonify
 from models import db, User, Task, ActivityLog, ProjectMember
 from routes.auth import token_required
+from services.auth_cache import principal_cache
+from services.database import read_only
 from werkzeug.security import generate_password_hash, check_password_hash
 
 profile_bp = Blueprint('profile', __name__)
 
 @profile_bp.route('/', methods=['GET'])
 @token_required
+@read_only
 def get_profile(current_user):
     """Get current user's profile with summary stats."""
     total_assigned = Task.query.filter_by(assignee_id=current_user.id).count()
@@ -29,6 +32,7 @@ def get_profile(current_user):
 
 @profile_bp.route('/tasks', methods=['GET'])
 @token_required
+@read_only
 def get_my_tasks(current_user):
     """Get all tasks assigned to the current user."""
     tasks = Task.query.filter_by(assignee_id=current_user.id)\
@@ -46,6 +50,7 @@ def get_my_tasks(current_user):
 
 @profile_bp.route('/activity', methods=['GET'])
 @token_required
+@read_only
 def get_my_activity(current_user):
     """Get recent activity performed by the current user."""
     logs = ActivityLog.query.filter_by(user_id=current_user.id)\
@@ -63,10 +68,12 @@ def get_my_activity(current_user):
 def change_password(current_user):
     """Change the current user's password."""
     data = request.get_json()
-    if not check_password_hash(current_user.password, data.get('current_password', '')):
+    user = User.query.get_or_404(current_user.id)
+    if not check_password_hash(user.password, data.get('current_password', '')):
         return jsonify({'message': 'Current password is incorrect'}), 400
     if len(data.get('new_password', '')) < 6:
         return jsonify({'message': 'New password must be at least 6 characters'}), 400
-    current_user.password = generate_password_hash(data['new_password'])
+    user.password = generate_password_hash(data['new_password'])
     db.session.commit()
+    principal_cache.invalidate_user(user.id)
     return jsonify({'message': 'Password updated successfully'})
@@ -1,12 +1,16 @@
 """Project routes for creating and listing user projects."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from models import db, Project, ProjectMember, User, ActivityLog, Label
 from routes.auth import token_required
+from services.versioning import conditional_by_project
+from services import export
+from services.database import read_only
 
 projects_bp = Blueprint('projects', __name__)
 
 @projects_bp.route('', methods=['GET'])
 @token_required
+@read_only
 def get_projects(current_user):
     """Get all projects the current user owns or is a member of (single query)."""
     member_project_ids = db.session.query(ProjectMember.project_id).filter_by(
@@ -52,6 +56,8 @@ def create_project(current_user):
 
 @projects_bp.route('/<int:project_id>/members', methods=['GET'])
 @token_required
+@conditional_by_project
+@read_only
 def get_project_members(current_user, project_id):
     """Get all members for a specific project."""
     _ = current_user
@@ -110,6 +116,8 @@ def add_project_member(current_user, project_id):
 
 @projects_bp.route('/<int:project_id>/labels', methods=['GET'])
 @token_required
+@conditional_by_project
+@read_only
 def get_project_labels(current_user, project_id):
     """Get all labels for a specific project."""
     _ = current_user
@@ -132,6 +140,43 @@ def create_project_label(current_user, project_id):
     db.session.commit()
     return jsonify({'message': 'Label created!', 'label': {'id': new_label.id, 'name': new_label.name, 'color': new_label.color}})
 
+@projects_bp.route('/<int:project_id>/export', methods=['GET'])
+@token_required
+@read_only
+def export_project(current_user, project_id):
+    """Stream the project's tasks, comments, time logs and activity as NDJSON or CSV.
+
+    ``?format=ndjson`` (default) exports every kind listed in ``?include=``;
+    ``?format=csv`` exports the single ``?kind=`` (default tasks). ``?gzip=1``
+    compresses the stream on the fly.
+    """
+    project = Project.query.get_or_404(project_id)
+    membership = ProjectMember.query.filter_by(project_id=project_id, user_id=current_user.id).first()
+    if project.owner_id != current_user.id and not membership:
+        return jsonify({'message': 'Unauthorized'}), 403
+
+    fmt = request.args.get('format', 'ndjson')
+    if fmt == 'ndjson':
+        kinds = [k for k in request.args.get('include', ','.join(export.KINDS)).split(',') if k]
+        if not kinds or set(kinds) - set(export.KINDS):
+            return jsonify({'error': f"include must be a subset of {', '.join(export.KINDS)}"}), 400
+        lines, mimetype = export.ndjson_lines(project_id, kinds), 'application/x-ndjson'
+    elif fmt == 'csv':
+        kind = request.args.get('kind', 'tasks')
+        if kind not in export.KINDS:
+            return jsonify({'error': f"kind must be one of {', '.join(export.KINDS)}"}), 400
+        lines, mimetype, fmt = export.csv_lines(project_id, kind), 'text/csv', f'{kind}.csv'
+    else:
+        return jsonify({'error': 'format must be ndjson or csv'}), 400
+
+    compress = request.args.get('gzip') in ('1', 'true')
+    filename = f"{project.name.replace(' ', '_')}_export.{fmt}" + ('.gz' if compress else '')
+    return Response(
+        stream_with_context(export.chunked(lines, compress)),
+        mimetype='application/gzip' if compress else mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{filename}"', 'X-Accel-Buffering': 'no'}
+    )
+
 @projects_bp.route('/<int:project_id>', methods=['DELETE'])
 @token_required
 def delete_project(current_user, project_id):
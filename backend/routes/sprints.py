@@ -2,12 +2,16 @@
 from flask import Blueprint, request, jsonify
 from models import db, Sprint
 from routes.auth import token_required
+from services.versioning import conditional_by_project
+from services.database import read_only
 from datetime import datetime
 
 sprints_bp = Blueprint('sprints', __name__)
 
 @sprints_bp.route('/project/<int:project_id>', methods=['GET'])
 @token_required
+@conditional_by_project
+@read_only
 def get_sprints(current_user, project_id):
     """Retrieve all sprints for a specific project."""
     _ = current_user
@@ -1,18 +1,120 @@
-from flask import Blueprint, request, jsonify
-from models import db, Task, TaskComment, ChecklistItem, Label, task_labels, Sprint, ActivityLog
+import base64
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
+from models import db, Project, ProjectMember, Task, TaskComment, ChecklistItem, Label, task_labels, Sprint, ActivityLog, TaskStatusChange, User
 from datetime import datetime
+from sqlalchemy import func, case, tuple_, select, insert
+from sqlalchemy.orm import joinedload, lazyload
 from routes.auth import token_required
+from services.versioning import conditional_by_project
+from services.burndown import track_task_change, refresh_sprint_snapshot
+from services import project_stats
+from services.task_import import TaskImporter, ImportFormatError, read_csv, read_ndjson, STATUSES, PRIORITIES
+from services import search as task_search
+from services.pubsub import broker, publish_after_commit, sse_stream
+from services.database import read_only
 
 tasks_bp = Blueprint('tasks', __name__)
 
-@tasks_bp.route('/project/<int:project_id>', methods=['GET'])
-@token_required
-def get_tasks(current_user, project_id):
-    """Retrieve all tasks for a specific project."""
-    _ = current_user
-    tasks = Task.query.filter_by(project_id=project_id).all()
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Bulk PATCH: columns one patch may set, request size cap, and IN-list chunk size
+BULK_FIELDS = ('status', 'priority', 'assignee_id', 'sprint_id', 'estimate')
+MAX_BULK_TASKS = 1000
+IN_CHUNK = 500
+
+# Task columns the board renders; update deltas carry only the ones that changed
+BOARD_FIELDS = ('title', 'description', 'status', 'priority', 'assignee_id', 'sprint_id', 'due_date', 'estimate')
+
+def board_channel(project_id):
+    return f'project:{project_id}'
+
+def publish_board_event(project_id, event_type, data):
+    """Queue a compact board delta for the project's live stream (sent on commit)."""
+    publish_after_commit(board_channel(project_id), event_type, data)
+
+def publish_label_event(project_id, task_id, label, assigned):
+    if assigned:
+        data = {'task_id': task_id, 'label': {'id': label.id, 'name': label.name, 'color': label.color}}
+    else:
+        data = {'task_id': task_id, 'label_id': label.id}
+    publish_board_event(project_id, 'label_assigned' if assigned else 'label_removed', data)
+
+def publish_task_created(task):
+    """Flush a new task and queue its board card (it has no labels, checklist or comments yet)."""
+    db.session.flush()
+    publish_board_event(task.project_id, 'task_created', {'task': dict(
+        _task_fields(task, ('id', 'parent_id', 'created_at') + BOARD_FIELDS),
+        labels=[], checklist_count=0, checklist_completed=0, comment_count=0
+    )})
+
+def publish_checklist_event(project_id, task_id, item_id):
+    """Queue a task's checklist totals; they are absolute, so a replayed event changes nothing."""
+    total, completed = db.session.query(
+        func.count(ChecklistItem.id),
+        func.coalesce(func.sum(case((ChecklistItem.is_completed.is_(True), 1), else_=0)), 0)
+    ).filter(ChecklistItem.task_id == task_id).one()
+    publish_board_event(project_id, 'checklist_changed', {
+        'task_id': task_id, 'item_id': item_id,
+        'checklist_count': int(total), 'checklist_completed': int(completed)
+    })
+
+def publish_comment_event(project_id, task_id, comment_id, event_type):
+    """Queue a comment event carrying the task's (absolute) comment total."""
+    total = db.session.query(func.count(TaskComment.id)).filter(TaskComment.task_id == task_id).scalar()
+    publish_board_event(project_id, event_type, {'task_id': task_id, 'id': comment_id, 'comment_count': total})
+
+def _task_fields(task, fields):
+    values = {}
+    for f in fields:
+        value = getattr(task, f)
+        values[f] = value.isoformat() if isinstance(value, datetime) else value
+    if 'assignee_id' in values:
+        values['assignee_username'] = task.assignee.username if task.assignee else None
+    return values
+
+def _board_payload(task_query, limit=None):
+    """Serialize board tasks in a fixed number of queries regardless of task count.
+
+    Assignees are joined onto the task rows, checklist and comment totals come from
+    grouped subqueries, and labels are fetched for every task in one extra query.
+    """
+    page_query = task_query.limit(limit) if limit else task_query
+    task_ids = page_query.with_entities(Task.id)
+
+    checklist_sq = db.session.query(
+        ChecklistItem.task_id.label('task_id'),
+        func.count(ChecklistItem.id).label('total'),
+        func.sum(case((ChecklistItem.is_completed.is_(True), 1), else_=0)).label('completed')
+    ).filter(ChecklistItem.task_id.in_(task_ids)).group_by(ChecklistItem.task_id).subquery()
+
+    comment_sq = db.session.query(
+        TaskComment.task_id.label('task_id'),
+        func.count(TaskComment.id).label('total')
+    ).filter(TaskComment.task_id.in_(task_ids)).group_by(TaskComment.task_id).subquery()
+
+    rows = task_query.options(joinedload(Task.assignee), lazyload(Task.labels)).add_columns(
+        func.coalesce(checklist_sq.c.total, 0),
+        func.coalesce(checklist_sq.c.completed, 0),
+        func.coalesce(comment_sq.c.total, 0)
+    ).outerjoin(checklist_sq, checklist_sq.c.task_id == Task.id)\
+     .outerjoin(comment_sq, comment_sq.c.task_id == Task.id)
+    if limit:
+        rows = rows.limit(limit)
+    rows = rows.all()
+
+    labels_by_task = {}
+    label_rows = db.session.query(task_labels.c.task_id, Label.id, Label.name, Label.color)\
+        .join(Label, Label.id == task_labels.c.label_id)\
+        .filter(task_labels.c.task_id.in_(task_ids)).all()
+    for task_id, label_id, name, color in label_rows:
+        labels_by_task.setdefault(task_id, []).append({'id': label_id, 'name': name, 'color': color})
+
     result = []
-    for t in tasks:
+    for t, checklist_count, checklist_completed, comment_count in rows:
         result.append({
             'id': t.id,
             'title': t.title,
@@ -24,18 +126,142 @@ def get_tasks(current_user, project_id):
             'sprint_id': t.sprint_id,
             'due_date': t.due_date.isoformat() if t.due_date else None,
             'estimate': t.estimate,
-            'labels': [{'id': l.id, 'name': l.name, 'color': l.color} for l in t.labels],
-            'checklist_count': len(t.checklist_items),
-            'checklist_completed': sum(1 for c in t.checklist_items if c.is_completed),
-            'comment_count': len(t.comments)
+            'created_at': t.created_at.isoformat() if t.created_at else None,
+            'labels': labels_by_task.get(t.id, []),
+            'checklist_count': int(checklist_count),
+            'checklist_completed': int(checklist_completed),
+            'comment_count': int(comment_count)
         })
-    return jsonify(result)
+    return result
+
+def _parse_date(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+def encode_cursor(task):
+    raw = f"{task['created_at']}|{task['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    created_at, task_id = raw.rsplit('|', 1)
+    return datetime.fromisoformat(created_at), int(task_id)
+
+def _filter_tasks(query, args):
+    """Apply the board's optional query-string filters to a Task query."""
+    for field in ('status', 'priority'):
+        values = args.getlist(field)
+        if values:
+            query = query.filter(getattr(Task, field).in_(values))
+    for field in ('assignee_id', 'sprint_id'):
+        if field in args:
+            value = args.get(field)
+            column = getattr(Task, field)
+            query = query.filter(column.is_(None) if value in ('', 'none') else column == int(value))
+    label_id = args.get('label', type=int)
+    if label_id:
+        query = query.filter(Task.id.in_(
+            db.session.query(task_labels.c.task_id).filter(task_labels.c.label_id == label_id)
+        ))
+    if args.get('due_after'):
+        query = query.filter(Task.due_date >= _parse_date(args['due_after']))
+    if args.get('due_before'):
+        query = query.filter(Task.due_date <= _parse_date(args['due_before']))
+    return query
+
+@tasks_bp.route('/project/<int:project_id>', methods=['GET'])
+@token_required
+@conditional_by_project
+@read_only
+def get_tasks(current_user, project_id):
+    """Retrieve tasks for a project, optionally filtered and keyset-paginated.
+
+    Without ``limit``/``cursor`` the full (filtered) list is returned as before.
+    With them, the response is ``{'tasks': [...], 'next_cursor': ...}`` ordered
+    by ``(created_at, id)``.
+    """
+    _ = current_user
+    # Read in the same transaction, before querying: a client resuming the stream
+    # from here may see a few already-applied events again, but never misses one.
+    # Every board event is idempotent (full field values, absolute counts), so a
+    # replay is harmless.
+    seq = broker.last_id(board_channel(project_id), db.session)
+    try:
+        tasks = _filter_tasks(Task.query.filter_by(project_id=project_id), request.args)
+        cursor = request.args.get('cursor')
+        if cursor:
+            tasks = tasks.filter(tuple_(Task.created_at, Task.id) > decode_cursor(cursor))
+    except ValueError:
+        return jsonify({'error': 'Invalid filter or cursor'}), 400
+    tasks = tasks.order_by(Task.created_at, Task.id)
+
+    if 'limit' not in request.args and not cursor:
+        response = jsonify(_board_payload(tasks))
+        response.headers['X-Board-Seq'] = str(seq)
+        return response
+
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    page = _board_payload(tasks, limit=limit + 1)
+    has_more = len(page) > limit
+    page = page[:limit]
+    response = jsonify({
+        'tasks': page,
+        'next_cursor': encode_cursor(page[-1]) if has_more else None
+    })
+    response.headers['X-Board-Seq'] = str(seq)
+    return response
+
+@tasks_bp.route('/search', methods=['GET'])
+@token_required
+@read_only
+def search_tasks(current_user):
+    """Ranked full-text search over task titles, descriptions and comments.
+
+    Scoped to the caller's projects (or one of them via ``?project_id=``);
+    every word is prefix-matched and hits carry a ``<mark>``-highlighted snippet.
+    """
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'q is required'}), 400
+    try:
+        limit = max(1, min(int(request.args.get('limit', SEARCH_LIMIT)), MAX_SEARCH_LIMIT))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    member_project_ids = db.session.query(ProjectMember.project_id).filter_by(user_id=current_user.id)
+    project_ids = [pid for (pid,) in db.session.query(Project.id).filter(
+        db.or_(Project.owner_id == current_user.id, Project.id.in_(member_project_ids)),
+        Project.deleted_at.is_(None)
+    )]
+    scope = request.args.get('project_id', type=int)
+    if scope is not None:
+        project_ids = [pid for pid in project_ids if pid == scope]
+    return jsonify(task_search.search(q, project_ids, limit))
+
+@tasks_bp.route('/project/<int:project_id>/stream', methods=['GET'])
+@token_required
+def stream_board(current_user, project_id):
+    """Server-Sent Events stream of task deltas for one project board.
+
+    Event ids are the project's sequence numbers; pass the ``X-Board-Seq`` header
+    from ``get_tasks`` as ``Last-Event-ID``/``?last_event_id=`` to pick up exactly
+    where that snapshot left off. A ``resync`` event means refetch the board.
+    """
+    _ = current_user
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    subscription = broker.subscribe(board_channel(project_id), last_event_id)
+    db.session.remove()
+    heartbeat = current_app.config.get('SSE_HEARTBEAT_SECONDS', 15)
+    poll = current_app.config.get('SSE_POLL_SECONDS', 1)
+    return Response(
+        stream_with_context(sse_stream(subscription, heartbeat, poll)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @tasks_bp.route('/project/<int:project_id>', methods=['POST'])
 @token_required
 def create_task(current_user, project_id):
     """Create a new task under a specific project workspace."""
-    _ = current_user
     data = request.get_json()
     new_task = Task(
         title=data['title'],
@@ -47,16 +273,61 @@ def create_task(current_user, project_id):
         parent_id=data.get('parent_id')
     )
     db.session.add(new_task)
+    track_task_change(new_task, user_id=current_user.id)
+    after = project_stats.stats_key(new_task)
+    publish_task_created(new_task)
     db.session.commit()
+    project_stats.apply_task_change(project_id, after=after)
     return jsonify({'message': 'Task created!', 'id': new_task.id, 'priority': new_task.priority})
 
+@tasks_bp.route('/project/<int:project_id>/import', methods=['POST'])
+@token_required
+def import_tasks(current_user, project_id):
+    """Stream-import tasks from CSV or NDJSON (raw body or multipart ``file``).
+
+    The format comes from ``?format=csv|ndjson``, else the upload's filename or
+    content type. Returns counts, throughput and row-level errors.
+    """
+    Project.query.get_or_404(project_id)
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    hint = request.args.get('format') or (upload.filename if upload else request.mimetype) or ''
+    if 'csv' in hint:
+        rows = read_csv(stream)
+    elif 'ndjson' in hint or 'jsonl' in hint or 'json' in hint:
+        rows = read_ndjson(stream)
+    else:
+        return jsonify({'error': 'Unsupported format; send CSV or NDJSON'}), 415
+
+    try:
+        report = TaskImporter(project_id, current_user.id).run(rows)
+    except ImportFormatError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    if report['imported']:
+        db.session.add(ActivityLog(
+            project_id=project_id,
+            user_id=current_user.id,
+            action_type='tasks_imported',
+            description=f"Imported {report['imported']} tasks"
+        ))
+        # Rows went in as bulk statements, not per-task deltas; have open boards refetch
+        publish_board_event(project_id, 'resync', {'reason': 'task_import'})
+    db.session.commit()
+    project_stats.invalidate(project_id)
+    return jsonify(report), 201 if report['imported'] else 200
+
 @tasks_bp.route('/<int:task_id>', methods=['PUT'])
 @token_required
 def update_task(current_user, task_id):
     """Update properties of an existing task."""
-    _ = current_user
     data = request.get_json()
     task = Task.query.get_or_404(task_id)
+    error = task_field_error(data, [task.project_id])
+    if error:
+        return jsonify({'error': error}), 400
+    old_status, old_sprint_id = task.status, task.sprint_id
+    before = project_stats.stats_key(task)
     if 'status' in data:
         task.status = data['status']
     if 'priority' in data:
@@ -73,9 +344,165 @@ def update_task(current_user, task_id):
         task.estimate = data['estimate']
     if 'due_date' in data:
         task.due_date = datetime.fromisoformat(data['due_date'].replace('Z', '+00:00')) if data['due_date'] else None
+    if data.keys() & {'status', 'sprint_id', 'estimate'}:
+        track_task_change(task, old_status, old_sprint_id, current_user.id)
+    changed = [f for f in BOARD_FIELDS if f in data]
+    if changed:
+        publish_board_event(task.project_id, 'task_updated', {'id': task.id, 'changes': _task_fields(task, changed)})
+    after = project_stats.stats_key(task)
     db.session.commit()
+    project_stats.apply_task_change(task.project_id, before, after)
     return jsonify({'message': 'Task updated!'})
 
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def task_field_error(values, project_ids):
+    """Why ``values`` can't be set on tasks of ``project_ids``, or None; shared by single and bulk updates."""
+    if 'status' in values and values['status'] not in STATUSES:
+        return f"status must be one of: {', '.join(STATUSES)}"
+    if 'priority' in values and values['priority'] not in PRIORITIES:
+        return f"priority must be one of: {', '.join(PRIORITIES)}"
+    if values.get('estimate') is not None and not _is_id(values['estimate']):
+        return 'estimate must be an integer or null'
+    assignee_id = values.get('assignee_id')
+    if assignee_id is not None and (not _is_id(assignee_id) or db.session.get(User, assignee_id) is None):
+        return 'assignee_id must be an existing user id or null'
+    sprint_id = values.get('sprint_id')
+    if sprint_id is not None:
+        sprint = db.session.get(Sprint, sprint_id) if _is_id(sprint_id) else None
+        if sprint is None or {sprint.project_id} != set(project_ids):
+            return "sprint_id must be a sprint of the tasks' project or null"
+    return None
+
+def _chunks(ids):
+    for start in range(0, len(ids), IN_CHUNK):
+        yield ids[start:start + IN_CHUNK]
+
+def _bulk_label_pairs(task_ids, label_ids):
+    """Existing (task_id, label_id) links among the given tasks and labels."""
+    pairs = set()
+    for chunk in _chunks(task_ids):
+        pairs.update(db.session.execute(
+            select(task_labels.c.task_id, task_labels.c.label_id)
+            .where(task_labels.c.task_id.in_(chunk), task_labels.c.label_id.in_(label_ids))
+        ).all())
+    return pairs
+
+@tasks_bp.route('/bulk', methods=['PATCH'])
+@token_required
+def bulk_update_tasks(current_user):
+    """Apply one patch to many tasks with set-based statements in a single transaction.
+
+    Body: ``{"ids": [...], "patch": {status, priority, assignee_id, sprint_id,
+    estimate, labels_add: [...], labels_remove: [...]}}``. Returns a result per id.
+    Values are checked like a single-task update; labels must come from the
+    tasks' projects and are only linked to tasks of their own project.
+    """
+    data = request.get_json() or {}
+    ids, patch = data.get('ids'), data.get('patch')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+        return jsonify({'error': 'ids must be a non-empty list of task ids'}), 400
+    if len(ids) > MAX_BULK_TASKS:
+        return jsonify({'error': f'At most {MAX_BULK_TASKS} tasks per request'}), 400
+    if not isinstance(patch, dict) or not patch:
+        return jsonify({'error': 'patch must be a non-empty object'}), 400
+    unsupported = patch.keys() - set(BULK_FIELDS) - {'labels_add', 'labels_remove'}
+    if unsupported:
+        return jsonify({'error': f"Unsupported fields: {', '.join(sorted(unsupported))}"}), 400
+
+    for key in ('labels_add', 'labels_remove'):
+        if key in patch and not (isinstance(patch[key], list) and all(_is_id(l) for l in patch[key])):
+            return jsonify({'error': f'{key} must be a list of label ids'}), 400
+
+    # One query (per IN chunk) for the pre-update state: history, snapshots, stats deltas
+    ids = list(dict.fromkeys(ids))
+    rows = {}
+    for chunk in _chunks(ids):
+        for row in db.session.query(Task.id, Task.project_id, Task.status, Task.priority,
+                                    Task.assignee_id, Task.estimate, Task.sprint_id).filter(Task.id.in_(chunk)):
+            rows[row.id] = row
+    found = [i for i in ids if i in rows]
+    project_ids = {rows[i].project_id for i in found}
+
+    values = {f: patch[f] for f in BULK_FIELDS if f in patch}
+    error = task_field_error(values, project_ids) if found else None
+    if error:
+        return jsonify({'error': error}), 400
+    labels_add = sorted(set(patch.get('labels_add', [])))
+    labels_remove = sorted(set(patch.get('labels_remove', [])) - set(labels_add))
+    labels = {}
+    if labels_add or labels_remove:
+        labels = {l.id: l for l in Label.query.filter(Label.id.in_(labels_add + labels_remove))}
+        missing = set(labels_add + labels_remove) - labels.keys()
+        if missing:
+            return jsonify({'error': f"Unknown label ids: {', '.join(map(str, sorted(missing)))}"}), 400
+        foreign = sorted(l.id for l in labels.values() if found and l.project_id not in project_ids)
+        if foreign:
+            return jsonify({'error': f"Labels from other projects: {', '.join(map(str, foreign))}"}), 400
+
+    if values and found:
+        for chunk in _chunks(found):
+            Task.query.filter(Task.id.in_(chunk)).update(values, synchronize_session=False)
+    added, removed = [], []
+    if labels_add and found:
+        linked = _bulk_label_pairs(found, labels_add)
+        added = [(t, l) for t in found for l in labels_add
+                 if (t, l) not in linked and labels[l].project_id == rows[t].project_id]
+        if added:
+            db.session.execute(task_labels.insert(), [{'task_id': t, 'label_id': l} for t, l in added])
+    if labels_remove and found:
+        removed = sorted(_bulk_label_pairs(found, labels_remove))
+        for chunk in _chunks(found):
+            db.session.execute(task_labels.delete().where(
+                task_labels.c.task_id.in_(chunk), task_labels.c.label_id.in_(labels_remove)))
+
+    if 'status' in values:
+        history = [{'task_id': r.id, 'sprint_id': values.get('sprint_id', r.sprint_id), 'user_id': current_user.id,
+                    'from_status': r.status, 'to_status': values['status']}
+                   for r in rows.values() if r.status != values['status']]
+        if history:
+            db.session.execute(insert(TaskStatusChange), history)
+    if values.keys() & {'status', 'sprint_id', 'estimate'}:
+        for sprint_id in ({r.sprint_id for r in rows.values()} | {values.get('sprint_id')}) - {None}:
+            refresh_sprint_snapshot(sprint_id)
+
+    # One consolidated activity entry (and board deltas) per project touched
+    changes = dict(values)
+    if 'assignee_id' in changes:
+        assignee = db.session.get(User, changes['assignee_id']) if changes['assignee_id'] else None
+        changes['assignee_username'] = assignee.username if assignee else None
+    summary = [f'{k}={v}' for k, v in values.items()]
+    summary += [f'+label {labels[l].name}' for l in labels_add] + [f'-label {labels[l].name}' for l in labels_remove]
+    by_project = {}
+    for task_id in found:
+        by_project.setdefault(rows[task_id].project_id, []).append(task_id)
+    for project_id, task_ids in by_project.items():
+        db.session.add(ActivityLog(
+            project_id=project_id,
+            user_id=current_user.id,
+            action_type='tasks_bulk_updated',
+            description=f"Bulk updated {len(task_ids)} tasks ({', '.join(summary)})"
+        ))
+        if values:
+            for task_id in task_ids:
+                publish_board_event(project_id, 'task_updated', {'id': task_id, 'changes': changes})
+    for task_id, label_id in added:
+        publish_label_event(rows[task_id].project_id, task_id, labels[label_id], assigned=True)
+    for task_id, label_id in removed:
+        publish_label_event(rows[task_id].project_id, task_id, labels[label_id], assigned=False)
+    db.session.commit()
+
+    if values.keys() & {'status', 'priority', 'assignee_id', 'estimate'}:
+        for task_id in found:
+            r = rows[task_id]
+            before = (r.status, r.priority, r.assignee_id, r.estimate)
+            after = tuple(values.get(f, old) for f, old in zip(('status', 'priority', 'assignee_id', 'estimate'), before))
+            project_stats.apply_task_change(r.project_id, before, after)
+
+    results = [{'id': i, 'ok': True} if i in rows else {'id': i, 'ok': False, 'error': 'Task not found'} for i in ids]
+    return jsonify({'message': f'Updated {len(found)} tasks', 'updated': len(found), 'results': results})
+
 @tasks_bp.route('/<int:task_id>', methods=['DELETE'])
 @token_required
 def delete_task(current_user, task_id):
@@ -83,7 +510,11 @@ def delete_task(current_user, task_id):
     task = Task.query.get_or_404(task_id)
     project_id = task.project_id
     task_title = task.title
+    sprint_id = task.sprint_id
+    before = project_stats.stats_key(task)
     db.session.delete(task)
+    if sprint_id:
+        refresh_sprint_snapshot(sprint_id)
     # Log the deletion
     log = ActivityLog(
         project_id=project_id,
@@ -92,7 +523,9 @@ def delete_task(current_user, task_id):
         description=f"Deleted task '{task_title}'"
     )
     db.session.add(log)
+    publish_board_event(project_id, 'task_deleted', {'id': task_id})
     db.session.commit()
+    project_stats.apply_task_change(project_id, before=before)
     return jsonify({'message': 'Task deleted'})
 
 @tasks_bp.route('/<int:task_id>/details', methods=['GET'])
@@ -137,6 +570,8 @@ def add_comment(current_user, task_id):
     task = Task.query.get_or_404(task_id)
     comment = TaskComment(task_id=task.id, user_id=current_user.id, content=data['content'])
     db.session.add(comment)
+    db.session.flush()
+    publish_comment_event(task.project_id, task.id, comment.id, 'comment_added')
     db.session.commit()
     return jsonify({'message': 'Comment added', 'id': comment.id, 'created_at': comment.created_at.isoformat(), 'user': {'id': current_user.id, 'username': current_user.username}})
 
@@ -149,6 +584,8 @@ def add_checklist_item(current_user, task_id):
     task = Task.query.get_or_404(task_id)
     item = ChecklistItem(task_id=task.id, content=data['content'])
     db.session.add(item)
+    db.session.flush()
+    publish_checklist_event(task.project_id, task.id, item.id)
     db.session.commit()
     return jsonify({'message': 'Checklist item added', 'id': item.id, 'content': item.content, 'is_completed': item.is_completed})
 
@@ -158,9 +595,12 @@ def toggle_checklist_item(current_user, item_id):
     """Toggle completion or delete a checklist item."""
     _ = current_user
     item = ChecklistItem.query.get_or_404(item_id)
+    was_completed = bool(item.is_completed)
     
     if request.method == 'DELETE':
         db.session.delete(item)
+        db.session.flush()
+        publish_checklist_event(item.task.project_id, item.task_id, item.id)
         db.session.commit()
         return jsonify({'message': 'Item deleted'})
         
@@ -169,6 +609,9 @@ def toggle_checklist_item(current_user, item_id):
         item.is_completed = data['is_completed']
     if 'content' in data:
         item.content = data['content']
+    if bool(item.is_completed) != was_completed:
+        db.session.flush()
+        publish_checklist_event(item.task.project_id, item.task_id, item.id)
     db.session.commit()
     return jsonify({'message': 'Item updated'})
 
@@ -183,6 +626,7 @@ def assign_label(current_user, task_id):
     
     if label not in task.labels:
         task.labels.append(label)
+        publish_label_event(task.project_id, task.id, label, assigned=True)
         db.session.commit()
         
     return jsonify({'message': 'Label assigned', 'label': {'id': label.id, 'name': label.name, 'color': label.color}})
@@ -197,6 +641,7 @@ def remove_label(current_user, task_id, label_id):
     
     if label in task.labels:
         task.labels.remove(label)
+        publish_label_event(task.project_id, task.id, label, assigned=False)
         db.session.commit()
         
     return jsonify({'message': 'Label removed'})
@@ -2,11 +2,16 @@
 from flask import Blueprint, jsonify, request
 from models import db, TaskTemplate, Task, Project, ActivityLog
 from routes.auth import token_required
+from routes.tasks import publish_task_created
+from services.versioning import conditional_by_project
+from services import project_stats
+from services.burndown import track_task_change
 
 templates_bp = Blueprint('templates', __name__)
 
 @templates_bp.route('/project/<int:project_id>', methods=['GET'])
 @token_required
+@conditional_by_project
 def list_templates(current_user, project_id):
     _ = current_user
     templates = TaskTemplate.query.filter_by(project_id=project_id).all()
@@ -60,6 +65,7 @@ def apply_template(current_user, template_id):
         assignee_id=current_user.id
     )
     db.session.add(task)
+    track_task_change(task, user_id=current_user.id)
     log = ActivityLog(
         project_id=t.project_id,
         user_id=current_user.id,
@@ -67,5 +73,8 @@ def apply_template(current_user, template_id):
         description=f"{current_user.username} created task '{t.title}' from template '{t.name}'"
     )
     db.session.add(log)
+    after = project_stats.stats_key(task)
+    publish_task_created(task)
     db.session.commit()
+    project_stats.apply_task_change(t.project_id, after=after)
     return jsonify({'id': task.id, 'title': task.title}), 201
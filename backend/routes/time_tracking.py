@@ -1,24 +1,28 @@
 """Time tracking routes — log, list, and delete time entries."""
 from flask import Blueprint, jsonify, request
-from models import db, Task, TimeLog, User
+from models import db, Task, TimeLog
 from routes.auth import token_required
+from services.database import read_only
+from services.users import usernames_for
 
 time_tracking_bp = Blueprint('time_tracking', __name__)
 
 @time_tracking_bp.route('/task/<int:task_id>', methods=['GET'])
 @token_required
+@read_only
 def get_logs(current_user, task_id):
     _ = current_user
     Task.query.get_or_404(task_id)
     logs = TimeLog.query.filter_by(task_id=task_id).order_by(TimeLog.logged_at.desc()).all()
     total = sum(l.minutes for l in logs)
+    usernames = usernames_for(l.user_id for l in logs)
     return jsonify({
         'total_minutes': total,
         'logs': [{
             'id': l.id,
             'minutes': l.minutes,
             'note': l.note,
-            'username': User.query.get(l.user_id).username if l.user_id else '?',
+            'username': usernames.get(l.user_id, '?'),
             'logged_at': l.logged_at.isoformat()
         } for l in logs]
     })
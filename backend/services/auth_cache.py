@@ -0,0 +1,72 @@
+"""Bounded TTL/LRU cache of verified JWTs -> authenticated user principals.
+
+``token_required`` consults this before decoding the token or touching the
+database, so steady-state authenticated requests (notification polls, board
+refreshes) resolve identity from memory. Entries never outlive the token's own
+``exp`` claim and are dropped explicitly when a user's credentials change.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+class Principal:
+    """Detached, read-only snapshot of the authenticated user passed to routes."""
+    __slots__ = ('id', 'username', 'created_at')
+
+    def __init__(self, id, username, created_at):
+        self.id = id
+        self.username = username
+        self.created_at = created_at
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.username, user.created_at)
+
+class PrincipalCache:
+    def __init__(self, maxsize=4096, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # token -> (principal, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token, principal, token_exp=None):
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            self._entries[token] = (principal, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        """Drop every cached token belonging to ``user_id``."""
+        with self._lock:
+            for token in [t for t, (p, _) in self._entries.items() if p.id == user_id]:
+                del self._entries[token]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'maxsize': self.maxsize,
+                    'hits': self.hits, 'misses': self.misses}
+
+principal_cache = PrincipalCache()
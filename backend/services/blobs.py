@@ -0,0 +1,173 @@
+"""Content-addressed attachment storage with reference counting.
+
+Attachment bytes live once per distinct content at
+``<UPLOAD_FOLDER>/blobs/<sha[:2]>/<sha[2:4]>/<sha>``, and ``Attachment.stored_name``
+holds that relative path. That way the same spec PDF on 40 tasks is stored once.
+``Blob.refs`` counts the attachments that point at a blob. ``store`` adds a
+reference and moves the new file into place only if the content is new.
+Deleting an Attachment row, directly or through a task/project cascade, drops
+a reference in the same flush (an ``after_delete`` hook). The last one deletes
+the blob row; its file is removed only once that transaction commits, so a
+rollback leaves both the row and the bytes in place.
+
+Reference counts change with single statements. ``store`` upserts
+(``INSERT ... ON CONFLICT DO UPDATE``), so two uploads of the same new content
+both succeed. A new blob row always moves its file into place, and a file
+queued for removal is kept if its blob row exists again by then. An upload of
+the same content racing a delete therefore normally keeps its bytes;
+``collect_garbage`` reports any attachment that still lost them.
+Rows written before this scheme keep their UUID names and no Blob row.
+
+``collect_garbage`` (``flask attachments gc``) reconciles the folder with the
+database:
+- it moves those legacy files into blobs, deduplicating them;
+- it recomputes reference counts;
+- it deletes unreferenced files older than a grace period;
+- it reports attachments whose file is missing.
+"""
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, delete, func, select, update
+from sqlalchemy.orm import object_session
+from models import db, Attachment, Blob, Upload
+from services.database import upsert
+
+BLOB_DIR = 'blobs'
+PARTIAL_DIR = '.partial'
+BLOCK_SIZE = 64 * 1024
+
+def blob_name(digest):
+    return f'{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}'
+
+def digest_of(stored_name):
+    """The SHA-256 a stored_name is keyed by, or None for a legacy UUID name."""
+    parts = stored_name.split('/')
+    return parts[-1] if len(parts) == 4 and parts[0] == BLOB_DIR else None
+
+def _path(stored_name):
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], *stored_name.split('/'))
+
+def hash_file(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        while block := fh.read(BLOCK_SIZE):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def store(src_path, digest, size, keep_source=False):
+    """Take a reference to the blob for ``digest``, consuming ``src_path``; returns the stored_name.
+
+    Runs in the caller's transaction. The file is moved into place when the
+    content is new (or its file went missing); otherwise ``src_path`` is
+    deleted. With ``keep_source`` it is hard-linked (or copied) instead and left
+    alone, so the caller still has it if the transaction fails.
+    """
+    name = blob_name(digest)
+    upsert(db.session.connection(), Blob, ['sha256'],
+           {'sha256': digest, 'size_bytes': size, 'refs': 1, 'created_at': datetime.utcnow()},
+           {'refs': Blob.refs + 1})
+    target = _path(name)
+    if db.session.scalar(select(Blob.refs).where(Blob.sha256 == digest)) > 1 and os.path.exists(target):
+        if not keep_source:
+            os.remove(src_path)
+    else:  # a new row brings its own file, even over one a committed delete is about to remove
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if keep_source:
+            staged = f'{target}.{uuid.uuid4().hex}'
+            try:
+                os.link(src_path, staged)
+            except OSError:
+                shutil.copyfile(src_path, staged)
+            os.replace(staged, target)
+        else:
+            os.replace(src_path, target)
+    return name
+
+@event.listens_for(Attachment, 'after_delete')
+def _release_blob(mapper, connection, target):
+    _ = mapper
+    digest = digest_of(target.stored_name)
+    if digest is not None:
+        connection.execute(update(Blob).where(Blob.sha256 == digest).values(refs=Blob.refs - 1))
+        if not connection.execute(delete(Blob).where(Blob.sha256 == digest, Blob.refs <= 0)).rowcount:
+            return
+    session = object_session(target)
+    session.info.setdefault('blob_removals', []).append((digest, _path(target.stored_name)))
+
+@event.listens_for(db.session, 'after_commit')
+def _remove_released_files(session):
+    removals = session.info.pop('blob_removals', None)
+    if not removals:
+        return
+    digests = [digest for digest, _ in removals if digest is not None]
+    revived = set()
+    if digests:
+        with db.engine.connect() as conn:
+            revived = set(conn.scalars(select(Blob.sha256).where(Blob.sha256.in_(digests))))
+    for digest, path in removals:
+        if digest not in revived and os.path.exists(path):
+            os.remove(path)
+
+@event.listens_for(db.session, 'after_rollback')
+def _keep_released_files(session):
+    session.info.pop('blob_removals', None)
+
+def collect_garbage(dry_run=False, grace_seconds=3600):
+    """Reconcile UPLOAD_FOLDER with the database; returns a report of what was (or would be) done."""
+    folder = current_app.config['UPLOAD_FOLDER']
+    report = {'adopted': 0, 'deduplicated': 0, 'refs_fixed': 0, 'orphans_removed': 0,
+              'bytes_freed': 0, 'missing': []}
+
+    # 1. Legacy UUID-named attachments become (deduplicated) blobs
+    for attachment in Attachment.query.filter(~Attachment.stored_name.startswith(f'{BLOB_DIR}/')).all():
+        path = _path(attachment.stored_name)
+        if not os.path.exists(path):
+            continue
+        digest = hash_file(path)
+        exists = db.session.get(Blob, digest) is not None
+        report['adopted'] += 1
+        report['deduplicated'] += exists
+        if not dry_run:
+            attachment.stored_name = store(path, digest, os.path.getsize(path))
+            db.session.commit()
+
+    # 2. Reference counts match the attachment rows; unreferenced blobs go
+    counts = dict(db.session.query(Attachment.stored_name, func.count())
+                  .filter(Attachment.stored_name.startswith(f'{BLOB_DIR}/')).group_by(Attachment.stored_name))
+    for blob in Blob.query.all():
+        actual = counts.get(blob_name(blob.sha256), 0)
+        if blob.refs != actual:
+            report['refs_fixed'] += 1
+            if not dry_run:
+                if actual:
+                    blob.refs = actual
+                else:
+                    db.session.delete(blob)
+    if not dry_run:
+        db.session.commit()
+
+    # 3. Files nothing points at (older than the grace period, so in-flight writes are left alone)
+    referenced = {blob_name(digest) for (digest,) in db.session.query(Blob.sha256)}
+    referenced |= {name for (name,) in db.session.query(Attachment.stored_name)}
+    referenced |= {f'{PARTIAL_DIR}/{upload_id}' for (upload_id,) in db.session.query(Upload.id)}
+    cutoff = time.time() - grace_seconds
+    for root, _, files in os.walk(folder):
+        for filename in files:
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, folder).replace(os.sep, '/')
+            if name in referenced or os.path.getmtime(path) > cutoff:
+                continue
+            report['orphans_removed'] += 1
+            report['bytes_freed'] += os.path.getsize(path)
+            if not dry_run:
+                os.remove(path)
+
+    # 4. Attachments whose bytes are gone (reported, not deleted)
+    rows = db.session.query(Attachment.id, Attachment.stored_name)
+    report['missing'] = [attachment_id for attachment_id, name in rows if not os.path.exists(_path(name))]
+    return report
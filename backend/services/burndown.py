@@ -0,0 +1,46 @@
+"""Sprint burndown bookkeeping: status-transition history and daily snapshots.
+
+Writes that change a task's status, estimate or sprint call ``track_task_change``
+so the burndown route only has to read one ``SprintSnapshot`` row per day.
+"""
+from datetime import datetime
+from sqlalchemy import func, case
+from models import db, Task, TaskStatusChange, SprintSnapshot
+
+def record_status_change(task, old_status, user_id=None):
+    """Append a TaskStatusChange row if the task's status actually moved."""
+    if old_status == task.status:
+        return None
+    change = TaskStatusChange(
+        task=task,
+        sprint_id=task.sprint_id,
+        user_id=user_id,
+        from_status=old_status,
+        to_status=task.status
+    )
+    db.session.add(change)
+    return change
+
+def refresh_sprint_snapshot(sprint_id, day=None):
+    """Recompute one sprint's totals (single aggregate query) and upsert the day's row."""
+    day = day or datetime.utcnow().date()
+    db.session.flush()
+    points = func.coalesce(Task.estimate, 1)  # default 1 pt if no estimate
+    total, remaining = db.session.query(
+        func.coalesce(func.sum(points), 0),
+        func.coalesce(func.sum(case((Task.status != 'done', points), else_=0)), 0)
+    ).filter(Task.sprint_id == sprint_id).one()
+
+    snapshot = SprintSnapshot.query.filter_by(sprint_id=sprint_id, day=day).first()
+    if snapshot is None:
+        snapshot = SprintSnapshot(sprint_id=sprint_id, day=day)
+        db.session.add(snapshot)
+    snapshot.total_points = int(total)
+    snapshot.remaining_points = int(remaining)
+    return snapshot
+
+def track_task_change(task, old_status=None, old_sprint_id=None, user_id=None):
+    """Record a status transition and refresh today's snapshot for every affected sprint."""
+    record_status_change(task, old_status, user_id)
+    for sprint_id in {old_sprint_id, task.sprint_id} - {None}:
+        refresh_sprint_snapshot(sprint_id)
@@ -0,0 +1,150 @@
+"""Engine setup driven by app config: SQLite pragmas, pooling and read routing.
+
+``init_db(app)`` replaces a bare ``db.init_app(app)``. For SQLite every new
+DBAPI connection gets the configured pragmas (WAL, synchronous, busy timeout,
+mmap and page cache). Pools are sized from ``DB_POOL_*``; for Postgres and
+other server databases connections are also pre-pinged and recycled.
+
+A second ``replica`` engine serves views wrapped in ``read_only``: the
+``DATABASE_REPLICA_URL`` database if configured, otherwise (file SQLite) a pool
+of ``query_only`` connections to the same file, which under WAL read
+concurrently with the writer. Without either, everything uses the primary.
+A ``read_only`` view under ``versioning.conditional_by_project`` also reads its
+project version on the replica (``replica_reads``), so a lagging replica serves
+its old data under its old ETag rather than stale data under a new one.
+"""
+from contextlib import contextmanager
+from functools import wraps
+from importlib import import_module
+from sqlalchemy import event, insert, update
+from sqlalchemy.engine import make_url
+from models import db, READ_BIND
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+def _is_memory(uri):
+    return make_url(uri).database in (None, '', ':memory:')
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database URI."""
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    pool = {
+        'pool_size': config.get('DB_POOL_SIZE', 10),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+    }
+    if is_sqlite(uri):
+        # Python-level lock wait, kept in step with PRAGMA busy_timeout
+        options = {'connect_args': {'timeout': config.get('SQLITE_BUSY_TIMEOUT_MS', 5000) / 1000}}
+        if not _is_memory(uri):
+            options.update(pool)  # in-memory DBs use a StaticPool; files a QueuePool
+        return options
+    return dict(pool, pool_recycle=config.get('DB_POOL_RECYCLE', 1800), pool_pre_ping=True)
+
+def sqlite_pragmas(config, uri):
+    """Ordered PRAGMA statements to run on each new SQLite connection."""
+    pragmas = []
+    if not _is_memory(uri) and config.get('SQLITE_JOURNAL_MODE'):
+        pragmas.append(f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}")
+    if config.get('SQLITE_SYNCHRONOUS'):
+        pragmas.append(f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}")
+    pragmas.append(f"PRAGMA busy_timeout={int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}")
+    if config.get('SQLITE_MMAP_SIZE'):
+        pragmas.append(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+    if config.get('SQLITE_CACHE_SIZE_KB'):
+        pragmas.append(f"PRAGMA cache_size=-{int(config['SQLITE_CACHE_SIZE_KB'])}")  # negative = KiB
+    pragmas.append('PRAGMA temp_store=MEMORY')
+    return pragmas
+
+def install_sqlite_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def _apply(dbapi_connection, connection_record):
+        _ = connection_record
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+def _replica_uri(config):
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    if config.get('SQLALCHEMY_REPLICA_URI'):
+        return config['SQLALCHEMY_REPLICA_URI']
+    if is_sqlite(uri) and not _is_memory(uri):
+        return uri
+    return None
+
+def init_db(app):
+    """Bind ``db`` to the app with engine options/pragmas derived from its config."""
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    options = engine_options(app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}))
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    replica_uri = _replica_uri(app.config)
+    if replica_uri:
+        replica = dict(engine_options(dict(app.config, SQLALCHEMY_DATABASE_URI=replica_uri)), url=replica_uri)
+        app.config['SQLALCHEMY_BINDS'] = dict(app.config.get('SQLALCHEMY_BINDS') or {}, **{READ_BIND: replica})
+    db.init_app(app)
+    with app.app_context():
+        if is_sqlite(uri):
+            install_sqlite_pragmas(db.engine, sqlite_pragmas(app.config, uri))
+        if replica_uri and is_sqlite(replica_uri):
+            # Never let a routed read write: the replica connections refuse it
+            install_sqlite_pragmas(db.engines[READ_BIND],
+                                   sqlite_pragmas(app.config, replica_uri) + ['PRAGMA query_only=ON'])
+
+@contextmanager
+def replica_reads():
+    """Send this session's reads to the replica engine inside the block."""
+    session = db.session()
+    previous = session.info.get('read_only', False)
+    session.info['read_only'] = True
+    try:
+        yield session
+    finally:
+        session.info['read_only'] = previous
+
+def read_only(f):
+    """Run a read-only view's queries on the replica engine (see module docstring).
+
+    Streamed responses keep the routing while their body is generated. Any flush
+    inside the view still goes to the primary. Decorators above can check
+    ``f.read_only`` to read on the same engine as the view.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        with replica_reads() as session:
+            response = f(*args, **kwargs)
+        body = getattr(response, 'response', None)
+        if getattr(response, 'is_streamed', False) and body is not None:
+            response.response = _routed(session, body)
+        return response
+
+    decorated.read_only = True
+    return decorated
+
+def _routed(session, body):
+    session.info['read_only'] = True
+    try:
+        yield from body
+    finally:
+        session.info['read_only'] = False
+        close = getattr(body, 'close', None)
+        if close:
+            close()
+
+def upsert(connection, model, key, values, on_conflict):
+    """INSERT ``values``, or if a row with the same ``key`` columns exists apply ``on_conflict`` to it.
+
+    SQLite and PostgreSQL get a single ``INSERT ... ON CONFLICT DO UPDATE``, so
+    concurrent writers never collide on the key; elsewhere it is UPDATE, then
+    INSERT when nothing matched.
+    """
+    table = model.__table__
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        stmt = import_module(f'sqlalchemy.dialects.{dialect}').insert(table).values(**values)
+        connection.execute(stmt.on_conflict_do_update(index_elements=list(key), set_=on_conflict))
+    elif not connection.execute(update(table).where(*(table.c[k] == values[k] for k in key))
+                                .values(**on_conflict)).rowcount:
+        connection.execute(insert(table).values(**values))
@@ -0,0 +1,119 @@
+"""Streaming project export (NDJSON or CSV, optionally gzip) for backups and BI.
+
+Every record kind is read with a Core ``select`` of plain columns executed with
+``yield_per`` (a server-side cursor where the driver supports one), so no ORM
+objects are built and memory stays flat however large the project is. Task
+labels come from a second cursor ordered by task id and are merged in as the
+task rows go by. Output is buffered into ~64 KB chunks and, when requested,
+passed through an incremental gzip compressor.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from models import db, Task, TaskComment, TimeLog, ActivityLog, Label, User, task_labels
+
+YIELD_PER = 1000
+CHUNK_BYTES = 64 * 1024
+KINDS = ('tasks', 'comments', 'time_logs', 'activity')
+
+def _tasks(project_id):
+    assignee = aliased(User)
+    query = select(
+        Task.id, Task.parent_id, Task.title, Task.description, Task.status, Task.priority,
+        Task.estimate, Task.due_date, Task.sprint_id, Task.assignee_id,
+        assignee.username.label('assignee_username'), Task.github_issue_id, Task.created_at
+    ).outerjoin(assignee, assignee.id == Task.assignee_id)\
+     .where(Task.project_id == project_id).order_by(Task.id)
+    label_query = select(task_labels.c.task_id, Label.name)\
+        .join(Label, Label.id == task_labels.c.label_id)\
+        .join(Task, Task.id == task_labels.c.task_id)\
+        .where(Task.project_id == project_id).order_by(task_labels.c.task_id, Label.name)
+
+    labels = iter(db.session.execute(label_query.execution_options(yield_per=YIELD_PER)))
+    pending = next(labels, None)
+    for row in db.session.execute(query.execution_options(yield_per=YIELD_PER)).mappings():
+        names = []
+        while pending is not None and pending.task_id <= row['id']:
+            if pending.task_id == row['id']:
+                names.append(pending.name)
+            pending = next(labels, None)
+        yield dict(row, labels=names)
+
+def _rows(query):
+    yield from db.session.execute(query.execution_options(yield_per=YIELD_PER)).mappings()
+
+def _comments(project_id):
+    return _rows(select(
+        TaskComment.id, TaskComment.task_id, TaskComment.user_id, User.username,
+        TaskComment.content, TaskComment.created_at
+    ).join(Task, Task.id == TaskComment.task_id).outerjoin(User, User.id == TaskComment.user_id)
+     .where(Task.project_id == project_id).order_by(TaskComment.id))
+
+def _time_logs(project_id):
+    return _rows(select(
+        TimeLog.id, TimeLog.task_id, TimeLog.user_id, User.username,
+        TimeLog.minutes, TimeLog.note, TimeLog.logged_at
+    ).join(Task, Task.id == TimeLog.task_id).outerjoin(User, User.id == TimeLog.user_id)
+     .where(Task.project_id == project_id).order_by(TimeLog.id))
+
+def _activity(project_id):
+    return _rows(select(
+        ActivityLog.id, ActivityLog.user_id, User.username, ActivityLog.action_type,
+        ActivityLog.description, ActivityLog.created_at
+    ).outerjoin(User, User.id == ActivityLog.user_id)
+     .where(ActivityLog.project_id == project_id).order_by(ActivityLog.id))
+
+_SOURCES = {'tasks': _tasks, 'comments': _comments, 'time_logs': _time_logs, 'activity': _activity}
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def ndjson_lines(project_id, kinds):
+    """One JSON object per line, tagged with its record kind."""
+    for kind in kinds:
+        for row in _SOURCES[kind](project_id):
+            record = {'type': kind[:-1] if kind.endswith('s') else kind}
+            record.update((k, _plain(v)) for k, v in dict(row).items())
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+
+def csv_lines(project_id, kind):
+    """CSV for a single record kind; the header comes from the first row's columns."""
+    buffer = io.StringIO()
+    writer = None
+    for row in _SOURCES[kind](project_id):
+        row = dict(row)
+        if 'labels' in row:
+            row['labels'] = ';'.join(row['labels'])
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row))
+            writer.writeheader()
+        writer.writerow({k: _plain(v) for k, v in row.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def chunked(lines, compress=False):
+    """Group text lines into ~CHUNK_BYTES byte chunks, gzip-compressing on the fly if asked."""
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31 = gzip container
+    parts, size = [], 0
+    for line in lines:
+        data = line.encode()
+        parts.append(data)
+        size += len(data)
+        if size >= CHUNK_BYTES:
+            block = b''.join(parts)
+            parts, size = [], 0
+            block = compressor.compress(block) if compressor else block
+            if block:
+                yield block
+    block = b''.join(parts)
+    if compressor:
+        block = compressor.compress(block) + compressor.flush()
+    if block:
+        yield block
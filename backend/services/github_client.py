@@ -0,0 +1,162 @@
+"""GitHub REST client with connection pooling, conditional requests and concurrent paging.
+
+* One pooled ``requests.Session`` per client (keep-alive, retries on 502/503/504).
+* Every GET is sent with ``If-None-Match`` when the URL was fetched before; a 304
+  (which does not count against GitHub's rate limit) replays the body stored in
+  the ``GitHubCache`` table.
+* ``get_pages`` reads the ``Link`` header of the first page and fetches the rest
+  concurrently on a small thread pool. Worker threads only do HTTP; all cache
+  reads and writes happen on the calling (request) thread. When the remaining
+  rate budget cannot cover every page it stops early and says so (``truncated``).
+* ``X-RateLimit-*`` headers are tracked. While the limit is exhausted cached
+  responses are served as-is and uncached URLs raise ``GitHubError(429)``.
+
+``API_URL``/``GITHUB_API_URL`` can point at a local stub server for testing.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlencode, urlparse, parse_qs
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import parse_header_links
+from urllib3.util.retry import Retry
+from flask import current_app
+from models import db, GitHubCache
+from services.database import upsert
+
+API_URL = 'https://api.github.com'
+
+class GitHubError(Exception):
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+class GitHubClient:
+    def __init__(self, base_url=API_URL, token=None, max_workers=4, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=max_workers,
+            pool_maxsize=max_workers,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504),
+                              allowed_methods=('GET',))
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'Accept': 'application/vnd.github+json', 'User-Agent': 'GitManager'})
+        if token:
+            self.session.headers['Authorization'] = f'Bearer {token}'
+        self.rate_remaining = None
+        self.rate_reset = None
+        self._rate_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='github')
+
+    def url(self, path, params=None):
+        """Canonical URL for a path + params (also the cache key)."""
+        query = urlencode(sorted((params or {}).items()))
+        return f"{self.base_url}{path}" + (f"?{query}" if query else '')
+
+    def rate_limited(self):
+        with self._rate_lock:
+            return self.rate_remaining == 0 and self.rate_reset is not None and self.rate_reset > time.time()
+
+    def _request(self, url, etag):
+        """HTTP only (safe to run on a worker thread)."""
+        headers = {'If-None-Match': etag} if etag else {}
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        with self._rate_lock:
+            if 'X-RateLimit-Remaining' in response.headers:
+                self.rate_remaining = int(response.headers['X-RateLimit-Remaining'])
+                self.rate_reset = int(response.headers.get('X-RateLimit-Reset', 0))
+        return response
+
+    def _fetch_many(self, urls):
+        """Fetch URLs (concurrently if more than one), returning ``{url: (data, link)}``."""
+        cached = {c.url: c for c in GitHubCache.query.filter(GitHubCache.url.in_(urls)).all()}
+        if self.rate_limited():
+            missing = [u for u in urls if u not in cached]
+            if missing:
+                raise GitHubError(429, 'GitHub API rate limit exceeded; try again later')
+            return {u: (json.loads(cached[u].body), cached[u].link) for u in urls}
+
+        etags = {u: cached[u].etag if u in cached else None for u in urls}
+        if len(urls) == 1:
+            responses = {urls[0]: self._request(urls[0], etags[urls[0]])}
+        else:
+            futures = {u: self._executor.submit(self._request, u, etags[u]) for u in urls}
+            responses = {u: f.result() for u, f in futures.items()}
+
+        results = {}
+        for url, response in responses.items():
+            entry = cached.get(url)
+            if response.status_code == 304 and entry is not None:
+                results[url] = (json.loads(entry.body), entry.link)
+                continue
+            if response.status_code != 200:
+                raise GitHubError(response.status_code, f'GitHub API returned {response.status_code}')
+            # Upsert: another request or import may be caching the same URL right now
+            fields = {'etag': response.headers.get('ETag'), 'link': response.headers.get('Link'),
+                      'body': response.text, 'fetched_at': datetime.utcnow()}
+            upsert(db.session.connection(), GitHubCache, ['url'], {'url': url, **fields}, fields)
+            results[url] = (response.json(), fields['link'])
+        db.session.commit()
+        return results
+
+    def get(self, path, params=None):
+        """One page of JSON."""
+        url = self.url(path, params)
+        return self._fetch_many([url])[url][0]
+
+    def get_pages(self, path, params=None, max_pages=None):
+        """Pages of a paginated list endpoint, concatenated in order; returns ``(items, truncated)``.
+
+        Follows the ``Link`` header to the last page unless ``max_pages`` is
+        given. ``truncated`` is True when pages were left out, either by
+        ``max_pages`` or to keep some of the rate limit in reserve.
+        """
+        params = dict(params or {})
+        first_url = self.url(path, params)
+        data, link = self._fetch_many([first_url])[first_url]
+        items = list(data) if isinstance(data, list) else []
+        last = _last_page(link)
+        if last <= 1:
+            return items, False
+        fetch_to = last if max_pages is None else min(last, max_pages)
+        if self.rate_remaining is not None and not self.rate_limited():
+            # Leave a little headroom rather than spending the whole budget on one import
+            fetch_to = min(fetch_to, max(1, self.rate_remaining - 5) + 1)
+        page_urls = [self.url(path, {**params, 'page': n}) for n in range(2, fetch_to + 1)]
+        pages = self._fetch_many(page_urls) if page_urls else {}
+        for url in page_urls:
+            page = pages[url][0]
+            if isinstance(page, list):
+                items.extend(page)
+        return items, fetch_to < last
+
+def _last_page(link):
+    if not link:
+        return 1
+    for rel in parse_header_links(link):
+        if rel.get('rel') == 'last':
+            page = parse_qs(urlparse(rel['url']).query).get('page')
+            return int(page[0]) if page else 1
+    return 1
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client():
+    """Shared client for the current app's GitHub settings."""
+    base_url = current_app.config.get('GITHUB_API_URL', API_URL)
+    token = current_app.config.get('GITHUB_TOKEN') or os.environ.get('GITHUB_TOKEN')
+    with _clients_lock:
+        client = _clients.get((base_url, token))
+        if client is None:
+            client = _clients[(base_url, token)] = GitHubClient(base_url, token)
+        return client
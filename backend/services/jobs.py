@@ -0,0 +1,113 @@
+"""In-process background job runner backed by the ``Job`` table.
+
+``enqueue`` records a queued Job row and hands the work to a small thread pool;
+the HTTP request returns the job id immediately. The job function runs inside
+its own app context (so it gets its own ``db.session``) and receives a
+``JobContext`` for progress reporting. Status, progress, result and error are
+persisted, so clients can poll ``/api/jobs/<id>`` and the record survives
+restarts; jobs interrupted by a restart are marked failed by
+``fail_interrupted_jobs`` at startup.
+"""
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from models import db, Job
+
+_executor = None
+_executor_lock = threading.Lock()
+_futures = {}
+
+class JobContext:
+    """Handed to the job function: who/what the job is for, plus progress reporting."""
+    def __init__(self, job_id, project_id=None, user_id=None):
+        self.job_id = job_id
+        self.project_id = project_id
+        self.user_id = user_id
+
+    def report(self, progress, total=None):
+        """Persist progress (commits the job's session)."""
+        job = db.session.get(Job, self.job_id)
+        job.progress = progress
+        if total is not None:
+            job.total = total
+        db.session.commit()
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = current_app.config.get('JOB_WORKERS', 2)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='jobs')
+        return _executor
+
+def serialize(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'project_id': job.project_id,
+        'status': job.status,
+        'progress': job.progress,
+        'total': job.total,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
+
+def enqueue(kind, func, project_id=None, user_id=None, **kwargs):
+    """Persist a queued job and schedule ``func(ctx, **kwargs)`` on the pool.
+
+    ``kwargs`` must be plain values (ids, not ORM objects): the job runs in
+    another thread with its own session.
+    """
+    job_id = uuid.uuid4().hex
+    job = Job(id=job_id, kind=kind, project_id=project_id, user_id=user_id, status='queued')
+    db.session.add(job)
+    db.session.commit()
+    app = current_app._get_current_object()
+    future = _futures[job_id] = _get_executor().submit(_run, app, job_id, func, kwargs)
+    # Registered after the entry exists (runs at once if the job already finished), so none is left behind
+    future.add_done_callback(lambda _: _futures.pop(job_id, None))
+    return job
+
+def _run(app, job_id, func, kwargs):
+    with app.app_context():
+        try:
+            job = db.session.get(Job, job_id)
+            job.status = 'running'
+            job.started_at = datetime.utcnow()
+            db.session.commit()
+            try:
+                result = func(JobContext(job_id, job.project_id, job.user_id), **kwargs)
+            except Exception as e:  # pylint: disable=broad-except
+                db.session.rollback()
+                job = db.session.get(Job, job_id)
+                job.status = 'failed'
+                job.error = str(e) or e.__class__.__name__
+            else:
+                job = db.session.get(Job, job_id)
+                job.status = 'succeeded'
+                job.result = json.dumps(result)
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+        finally:
+            db.session.remove()
+
+def wait(job_id, timeout=None):
+    """Block until a job submitted by this process finishes (used by tests/CLI)."""
+    future = _futures.get(job_id)
+    if future is not None:
+        future.result(timeout)
+
+def fail_interrupted_jobs():
+    """Mark jobs left queued/running by a previous process as failed."""
+    count = Job.query.filter(Job.status.in_(('queued', 'running'))).update(
+        {'status': 'failed', 'error': 'Interrupted by server restart', 'finished_at': datetime.utcnow()},
+        synchronize_session=False
+    )
+    db.session.commit()
+    return count
@@ -0,0 +1,180 @@
+"""Per-request performance instrumentation, slow request/query logging and ``/metrics``.
+
+``init_metrics(app)`` wraps every request: latency goes into a per-endpoint
+histogram, and SQLAlchemy engine events count the SQL statements each request
+issues and the time spent in them. Streamed responses are measured when their
+body is closed, so the time and queries spent producing it count. Response
+sizes are summed where known.
+Requests slower than ``SLOW_REQUEST_MS`` and statements slower than
+``SLOW_QUERY_MS`` are logged (statements with their parameters, truncated).
+``GET /metrics`` serves everything in Prometheus text format, behind a bearer
+``METRICS_TOKEN`` when one is configured.
+
+Like the other in-process registries, numbers are per worker process; scrape
+each worker (or sum them) in a multi-process deployment.
+"""
+import hmac
+import logging
+import threading
+import time
+from collections import defaultdict
+from flask import current_app, g, request, has_request_context, Response, abort
+from sqlalchemy import event
+from models import db
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_LOGGED_PARAMS = 300  # characters
+
+class Registry:
+    """Thread-safe counters and histograms keyed by (endpoint, method[, status])."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = defaultdict(int)  # (endpoint, method, status) -> count
+            self.latency = defaultdict(lambda: [[0] * len(LATENCY_BUCKETS), 0.0, 0])  # buckets, sum, count
+            self.response_bytes = defaultdict(lambda: [0, 0])  # sum, count
+            self.sql = defaultdict(lambda: [0, 0.0])  # statements, seconds
+            self.slow_queries = 0
+            self.slow_requests = 0
+
+    def observe_request(self, endpoint, method, status, seconds, size, statements, sql_seconds):
+        with self._lock:
+            self.requests[(endpoint, method, status)] += 1
+            hist = self.latency[(endpoint, method)]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    hist[0][i] += 1
+            hist[1] += seconds
+            hist[2] += 1
+            if size is not None:
+                sizes = self.response_bytes[(endpoint, method)]
+                sizes[0] += size
+                sizes[1] += 1
+            sql = self.sql[(endpoint, method)]
+            sql[0] += statements
+            sql[1] += sql_seconds
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)."""
+        lines = []
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self._lock:
+            family('http_requests_total', 'counter', 'Requests by endpoint, method and status.')
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+            family('http_request_duration_seconds', 'histogram', 'Request latency by endpoint.')
+            for (endpoint, method), (buckets, total, count) in sorted(self.latency.items()):
+                labels = f'endpoint="{endpoint}",method="{method}"'
+                for bound, n in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {n}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f'http_request_duration_seconds_sum{{{labels}}} {total:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{{labels}}} {count}')
+
+            family('http_response_size_bytes', 'summary', 'Response body size by endpoint (when known).')
+            for (endpoint, method), (total, count) in sorted(self.response_bytes.items()):
+                labels = f'endpoint="{endpoint}",method="{method}"'
+                lines.append(f'http_response_size_bytes_sum{{{labels}}} {total}')
+                lines.append(f'http_response_size_bytes_count{{{labels}}} {count}')
+
+            family('db_statements_total', 'counter', 'SQL statements issued, by endpoint.')
+            for (endpoint, method), (statements, _) in sorted(self.sql.items()):
+                lines.append(f'db_statements_total{{endpoint="{endpoint}",method="{method}"}} {statements}')
+            family('db_statement_seconds_total', 'counter', 'Time spent in SQL statements, by endpoint.')
+            for (endpoint, method), (_, seconds) in sorted(self.sql.items()):
+                lines.append(f'db_statement_seconds_total{{endpoint="{endpoint}",method="{method}"}} {seconds:.6f}')
+
+            family('db_slow_queries_total', 'counter', 'Statements slower than SLOW_QUERY_MS.')
+            lines.append(f'db_slow_queries_total {self.slow_queries}')
+            family('http_slow_requests_total', 'counter', 'Requests slower than SLOW_REQUEST_MS.')
+            lines.append(f'http_slow_requests_total {self.slow_requests}')
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+def _endpoint():
+    return request.endpoint or 'unmatched'
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    _ = conn, cursor, statement, parameters, executemany
+    context._metrics_started = time.perf_counter()
+
+def _make_after_execute(app):
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        _ = conn, cursor, executemany
+        started = getattr(context, '_metrics_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if has_request_context() and 'metrics_sql' in g:
+            g.metrics_sql[0] += 1
+            g.metrics_sql[1] += elapsed
+        if elapsed * 1000 >= app.config['SLOW_QUERY_MS']:
+            with registry._lock:
+                registry.slow_queries += 1
+            where = _endpoint() if has_request_context() else 'background'
+            logger.warning('Slow query (%.1f ms) in %s: %s | params=%s', elapsed * 1000, where,
+                           ' '.join(statement.split()), repr(parameters)[:MAX_LOGGED_PARAMS])
+    return _after_execute
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_sql = [0, 0.0]
+
+def _make_finish_request(app):
+    def _record(started, sql, endpoint, method, path, status, size, log_slow=True):
+        elapsed = time.perf_counter() - started
+        statements, sql_seconds = sql
+        registry.observe_request(endpoint, method, status, elapsed, size, statements, sql_seconds)
+        if log_slow and elapsed * 1000 >= app.config['SLOW_REQUEST_MS']:
+            with registry._lock:
+                registry.slow_requests += 1
+            logger.warning('Slow request (%.1f ms, %d statements, %.1f ms SQL): %s %s -> %s',
+                           elapsed * 1000, statements, sql_seconds * 1000, method, path, status)
+
+    def _finish_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        args = (started, g.metrics_sql, _endpoint(), request.method, request.full_path, response.status_code)
+        if response.is_streamed:
+            # The body (and its queries, counted while stream_with_context keeps g) is produced
+            # after this hook: record once it is closed. Event streams stay open by design.
+            response.call_on_close(lambda: _record(*args, None, log_slow=response.mimetype != 'text/event-stream'))
+        else:
+            g.pop('metrics_sql', None)
+            _record(*args, response.calculate_content_length())
+        return response
+    return _finish_request
+
+def metrics_view():
+    """Prometheus scrape endpoint; requires ``Bearer <METRICS_TOKEN>`` when one is set."""
+    expected = current_app.config.get('METRICS_TOKEN')
+    if expected:
+        header = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(header, f'Bearer {expected}'):
+            abort(401)
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+def init_metrics(app):
+    """Install the request hooks, engine listeners and the ``/metrics`` route."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    app.before_request(_start_request)
+    app.after_request(_make_finish_request(app))
+    after_execute = _make_after_execute(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, 'before_cursor_execute', _before_execute):
+                event.listen(engine, 'before_cursor_execute', _before_execute)
+            event.listen(engine, 'after_cursor_execute', after_execute)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,97 @@
+"""In-process cache of per-project task statistics for the analytics dashboard.
+
+Each cached entry holds status/priority counts and the open-estimate workload per
+assignee. Task writes adjust the cached entry in place after they commit; when a
+delta cannot be applied cheaply (e.g. an unseen assignee) the entry is dropped and
+rebuilt on the next read with one combined GROUP BY query. Entries also expire
+after ``STATS_TTL`` seconds so other worker processes converge.
+"""
+import threading
+import time
+from collections import Counter
+from sqlalchemy import func
+from models import db, Task, User
+
+STATS_TTL = 60
+MAX_PROJECTS = 1024
+
+_cache = {}
+_lock = threading.Lock()
+
+def stats_key(task):
+    """The task fields the aggregate depends on, captured before/after a write."""
+    return (task.status, task.priority, task.assignee_id, task.estimate)
+
+def _load(project_id):
+    rows = db.session.query(
+        Task.status, Task.priority, Task.assignee_id, User.username,
+        func.count(Task.id), func.sum(Task.estimate)
+    ).outerjoin(User, User.id == Task.assignee_id)\
+     .filter(Task.project_id == project_id)\
+     .group_by(Task.status, Task.priority, Task.assignee_id, User.username).all()
+
+    entry = {'status': Counter(), 'priority': Counter(), 'workload': {}, 'usernames': {},
+             'loaded_at': time.monotonic()}
+    for status, priority, assignee_id, username, count, estimate in rows:
+        entry['status'][status] += count
+        entry['priority'][priority] += count
+        entry['usernames'][assignee_id] = username
+        if status != 'done':
+            bucket = entry['workload'].setdefault(assignee_id, [0, 0])
+            bucket[0] += count
+            bucket[1] += int(estimate or 0)
+    return entry
+
+def _serialize(entry):
+    workload = sorted(entry['workload'].items(), key=lambda w: (w[0] is None, w[0] or 0))
+    return {
+        'status_breakdown': [{'name': k, 'value': v} for k, v in sorted(entry['status'].items()) if v],
+        'priority_breakdown': [{'name': k, 'value': v} for k, v in sorted(entry['priority'].items()) if v],
+        'workload': [{
+            'assignee_id': assignee_id,
+            'username': entry['usernames'].get(assignee_id),
+            'total_estimate': estimate
+        } for assignee_id, (open_count, estimate) in workload if open_count]
+    }
+
+def get_project_stats(project_id):
+    """Return the dashboard stats payload, loading it with one query on a cache miss."""
+    with _lock:
+        entry = _cache.get(project_id)
+        if entry and time.monotonic() - entry['loaded_at'] < STATS_TTL:
+            return _serialize(entry)
+    entry = _load(project_id)
+    with _lock:
+        if len(_cache) >= MAX_PROJECTS:
+            _cache.pop(next(iter(_cache)))
+        _cache[project_id] = entry
+        return _serialize(entry)
+
+def invalidate(project_id=None):
+    """Drop one project's cached stats, or all of them."""
+    with _lock:
+        if project_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(project_id, None)
+
+def apply_task_change(project_id, before=None, after=None):
+    """Apply a committed task create (before=None), update or delete (after=None)."""
+    with _lock:
+        entry = _cache.get(project_id)
+        if entry is None:
+            return
+        if after and after[2] not in entry['usernames']:
+            # Unknown assignee: no username to hand, rebuild on next read instead
+            _cache.pop(project_id, None)
+            return
+        for key, sign in ((before, -1), (after, 1)):
+            if key is None:
+                continue
+            status, priority, assignee_id, estimate = key
+            entry['status'][status] += sign
+            entry['priority'][priority] += sign
+            if status != 'done':
+                bucket = entry['workload'].setdefault(assignee_id, [0, 0])
+                bucket[0] += sign
+                bucket[1] += sign * (estimate or 0)
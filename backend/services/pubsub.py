@@ -0,0 +1,178 @@
+"""Publish/subscribe over a shared event log, backing the Server-Sent Events streams.
+
+Channels are plain strings (``user:<id>``, ``project:<id>``). Events are rows
+in ``stream_event``, numbered per channel by the ``stream_channel`` counter, and
+written in the same transaction as the change they describe. Every worker
+therefore sees the same sequence numbers: a snapshot's ``X-Board-Seq`` from one
+worker resumes correctly on a stream served by another, and a rolled-back
+transaction never emits anything. Each channel keeps its last ``REPLAY_SIZE``
+events. A client resuming from further back than that (or from an id the log
+never had) is told to resync.
+
+A stream reads the log after its cursor. It is woken at once by commits in its
+own process and otherwise polls every ``poll`` seconds, which bounds how long
+events from other workers take to arrive.
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import event, delete, insert, select
+from models import db, StreamChannel, StreamEvent
+from services.database import upsert
+
+REPLAY_SIZE = 256
+BATCH_SIZE = 100
+
+class Subscription:
+    def __init__(self, broker, channel, cursor):
+        self.broker = broker
+        self.channel = channel
+        self.cursor = cursor  # last event id delivered
+        self._wake = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def wait(self, timeout):
+        """Sleep until woken by a local commit on the channel or ``timeout`` elapses."""
+        self._wake.wait(timeout)
+        self._wake.clear()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class Broker:
+    def __init__(self, replay_size=REPLAY_SIZE, batch_size=BATCH_SIZE):
+        self.replay_size = replay_size
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._subscribers = {}  # channel -> set of Subscription (this process only)
+
+    def store(self, connection, events):
+        """Append ``(channel, event_type, data)`` events to the log in the caller's transaction.
+
+        Returns the channels written to. The counter row is updated first, so
+        concurrent writers to a channel queue behind each other and ids commit
+        in order.
+        """
+        by_channel = {}
+        for channel, event_type, data in events:
+            by_channel.setdefault(channel, []).append((event_type, data))
+        now = datetime.utcnow()
+        for channel, items in by_channel.items():
+            upsert(connection, StreamChannel, ['channel'], {'channel': channel, 'last_seq': len(items)},
+                   {'last_seq': StreamChannel.last_seq + len(items)})
+            last = connection.scalar(select(StreamChannel.last_seq).where(StreamChannel.channel == channel))
+            first = last - len(items) + 1
+            connection.execute(insert(StreamEvent), [
+                {'channel': channel, 'seq': first + i, 'event_type': event_type, 'data': json.dumps(data),
+                 'created_at': now}
+                for i, (event_type, data) in enumerate(items)
+            ])
+            connection.execute(delete(StreamEvent).where(StreamEvent.channel == channel,
+                                                         StreamEvent.seq <= last - self.replay_size))
+        return list(by_channel)
+
+    def notify(self, channels):
+        """Wake this process's streams on ``channels`` (other workers find out by polling)."""
+        with self._lock:
+            subscribers = [sub for channel in channels for sub in self._subscribers.get(channel, ())]
+        for sub in subscribers:
+            sub.wake()
+
+    def subscribe(self, channel, last_event_id=None):
+        """Register a stream that starts after ``last_event_id`` (default: the current end)."""
+        cursor = last_event_id if last_event_id is not None else self.last_id(channel)
+        sub = Subscription(self, channel, cursor)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subscribers = self._subscribers.get(sub.channel)
+            if subscribers:
+                subscribers.discard(sub)
+                if not subscribers:
+                    del self._subscribers[sub.channel]
+
+    def last_id(self, channel, session=None):
+        """The channel's latest event id; pass the view's session to read it in the same snapshot."""
+        query = select(StreamChannel.last_seq).where(StreamChannel.channel == channel)
+        if session is not None:
+            return session.scalar(query) or 0
+        with db.engine.connect() as conn:
+            return conn.scalar(query) or 0
+
+    def fetch(self, sub):
+        """Next events after ``sub.cursor`` (advancing it), or None if they left the log: resync.
+
+        On resync the cursor moves to the channel's latest id.
+        """
+        with db.engine.connect() as conn:
+            last = conn.scalar(select(StreamChannel.last_seq).where(StreamChannel.channel == sub.channel)) or 0
+            if sub.cursor == last:
+                return []
+            rows = [] if sub.cursor > last else conn.execute(
+                select(StreamEvent.seq, StreamEvent.event_type, StreamEvent.data)
+                .where(StreamEvent.channel == sub.channel, StreamEvent.seq > sub.cursor)
+                .order_by(StreamEvent.seq).limit(self.batch_size)
+            ).all()
+        if not rows or rows[0].seq != sub.cursor + 1:
+            sub.cursor = last
+            return None
+        sub.cursor = rows[-1].seq
+        return [{'id': seq, 'event': event_type, 'data': json.loads(data)} for seq, event_type, data in rows]
+
+broker = Broker()
+
+def publish_after_commit(channel, event_type, data):
+    """Queue an event on the current session; it is logged with the commit and dropped on rollback."""
+    db.session.info.setdefault('pending_events', []).append((channel, event_type, data))
+
+@event.listens_for(db.session, 'before_commit')
+def _store_pending(session):
+    if not session.info.get('pending_events') and not (session.new or session.dirty or session.deleted):
+        return
+    session.flush()  # flush hooks (e.g. new notifications) may queue events of their own
+    pending = session.info.pop('pending_events', None)
+    if pending:
+        session.info.setdefault('stream_channels', set()).update(broker.store(session.connection(), pending))
+
+@event.listens_for(db.session, 'after_commit')
+def _notify_streams(session):
+    channels = session.info.pop('stream_channels', None)
+    if channels:
+        broker.notify(channels)
+
+@event.listens_for(db.session, 'after_rollback')
+def _drop_pending(session):
+    session.info.pop('pending_events', None)
+    session.info.pop('stream_channels', None)
+
+def _format(evt):
+    return f"id: {evt['id']}\nevent: {evt['event']}\ndata: {json.dumps(evt['data'])}\n\n"
+
+def sse_stream(subscription, heartbeat=15, poll=1, retry_ms=3000):
+    """Yield SSE frames for a subscription until the client disconnects."""
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        last_frame = time.monotonic()
+        while True:
+            events = subscription.broker.fetch(subscription)
+            if events is None:
+                # Client asked for events no longer in the log (stale Last-Event-ID): make it refetch
+                yield _format({'id': subscription.cursor, 'event': 'resync', 'data': {}})
+                return
+            for evt in events:
+                yield _format(evt)
+            if events:
+                last_frame = time.monotonic()
+                continue
+            if time.monotonic() - last_frame >= heartbeat:
+                yield ": ping\n\n"
+                last_frame = time.monotonic()
+            subscription.wait(min(poll, heartbeat))
+    finally:
+        subscription.close()
@@ -0,0 +1,131 @@
+"""Full-text task search backed by an SQLite FTS5 index.
+
+``task_fts`` holds one row per task (rowid = task id) with its title,
+description and all of its comments. SQL triggers on ``task`` and
+``task_comment`` keep it current, so executemany imports and bulk UPDATEs are
+indexed too, not just ORM writes. The table and triggers are created alongside
+``db.create_all()`` (and by ``migrate.py``, which also backfills existing rows).
+
+Queries are ranked with bm25 (title weighted above description above
+comments), each term is prefix-matched, and results carry a highlighted
+snippet. On databases without FTS5 (e.g. Postgres) ``search`` falls back to a
+LIKE scan with the same response shape.
+"""
+import html
+import re
+from sqlalchemy import event, inspect, or_, text
+from models import db, Task
+
+# bm25 column weights: title, description, comments
+WEIGHTS = (10.0, 2.0, 1.0)
+SNIPPET_TOKENS = 12
+
+_available = {}  # engine url -> FTS5 index present
+
+_TRIGGER_BODY = """
+    DELETE FROM task_fts WHERE rowid = {id};
+    INSERT INTO task_fts(rowid, title, description, comments)
+    SELECT t.id, t.title, t.description,
+           (SELECT group_concat(c.content, ' ') FROM task_comment c WHERE c.task_id = t.id)
+    FROM task t WHERE t.id = {id};
+"""
+
+_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "title, description, comments, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN"
+    + _TRIGGER_BODY.format(id='NEW.id') + "END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN"
+    + _TRIGGER_BODY.format(id='NEW.id') + "END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN "
+    "DELETE FROM task_fts WHERE rowid = OLD.id; END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_cai AFTER INSERT ON task_comment BEGIN"
+    + _TRIGGER_BODY.format(id='NEW.task_id') + "END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_cau AFTER UPDATE OF content ON task_comment BEGIN"
+    + _TRIGGER_BODY.format(id='NEW.task_id') + "END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_cad AFTER DELETE ON task_comment BEGIN"
+    + _TRIGGER_BODY.format(id='OLD.task_id') + "END",
+]
+
+_BACKFILL = """
+    INSERT INTO task_fts(rowid, title, description, comments)
+    SELECT t.id, t.title, t.description,
+           (SELECT group_concat(c.content, ' ') FROM task_comment c WHERE c.task_id = t.id)
+    FROM task t
+"""
+
+def ensure_index(connection):
+    """Create the FTS table and triggers if missing; backfill when the table is new.
+
+    Returns True if the index is (now) available on this connection.
+    """
+    if connection.dialect.name != 'sqlite':
+        return False
+    _available.pop(str(connection.engine.url), None)
+    if inspect(connection).has_table('task_fts'):
+        return True
+    try:
+        for statement in _DDL:
+            connection.exec_driver_sql(statement)
+    except Exception:  # pylint: disable=broad-except
+        return False  # SQLite built without FTS5
+    connection.exec_driver_sql(_BACKFILL)
+    return True
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_index(target, connection, **kw):
+    _ = target, kw
+    ensure_index(connection)
+
+@event.listens_for(db.metadata, 'before_drop')
+def _drop_index(target, connection, **kw):
+    _ = target, kw
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('DROP TABLE IF EXISTS task_fts')
+        _available.pop(str(connection.engine.url), None)
+
+def fts_available():
+    key = str(db.engine.url)
+    if key not in _available:
+        _available[key] = db.engine.dialect.name == 'sqlite' and inspect(db.engine).has_table('task_fts')
+    return _available[key]
+
+def match_expression(q):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    terms = re.findall(r'\w+', q)
+    return ' '.join(f'"{t}"*' for t in terms)
+
+def search(q, project_ids, limit):
+    """Ranked task hits for ``q`` within ``project_ids`` (list of dicts)."""
+    if fts_available():
+        expression = match_expression(q)
+        if not expression:
+            return []
+        params = {'q': expression, 'limit': limit}
+        params.update({f'p{i}': pid for i, pid in enumerate(project_ids)})
+        placeholders = ', '.join(f':p{i}' for i in range(len(project_ids))) or 'NULL'
+        rows = db.session.execute(text(f"""
+            SELECT t.id, t.project_id, t.title, t.status, t.priority,
+                   snippet(task_fts, -1, char(2), char(3), '…', {SNIPPET_TOKENS}) AS snippet,
+                   bm25(task_fts, {', '.join(map(str, WEIGHTS))}) AS rank
+            FROM task_fts JOIN task t ON t.id = task_fts.rowid
+            WHERE task_fts MATCH :q AND t.project_id IN ({placeholders})
+            ORDER BY rank LIMIT :limit
+        """), params).mappings()
+        # Escape user text, then turn the match markers into <mark> tags
+        return [dict(r, snippet=html.escape(r['snippet'] or '').replace('\x02', '<mark>').replace('\x03', '</mark>'))
+                for r in rows]
+
+    # Fallback: unranked LIKE scan over title/description
+    terms = re.findall(r'\w+', q)
+    if not terms:
+        return []
+    query = Task.query.filter(Task.project_id.in_(project_ids))
+    for term in terms:
+        pattern = f'%{term}%'
+        query = query.filter(or_(Task.title.ilike(pattern), Task.description.ilike(pattern)))
+    return [{
+        'id': t.id, 'project_id': t.project_id, 'title': t.title, 'status': t.status,
+        'priority': t.priority, 'snippet': html.escape(t.title), 'rank': None
+    } for t in query.order_by(Task.created_at.desc()).limit(limit)]
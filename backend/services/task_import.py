@@ -0,0 +1,233 @@
+"""Streaming CSV / NDJSON task import for migrations from other tools.
+
+Rows are parsed one at a time from the upload stream, validated, and resolved
+against cached lookup maps (assignees by username, sprints and labels by name,
+parents by the row's ``ref``). Tasks are inserted in batches with executemany
+``INSERT ... RETURNING`` instead of one ORM object per row; label links and
+status history follow the same way. Invalid rows are skipped and reported with
+their line number; valid rows are imported in a single transaction. A CSV
+file that is not UTF-8 (or not parseable) is rejected as a whole.
+
+Columns / keys: ``title`` (required), ``description``, ``status``, ``priority``,
+``estimate``, ``due_date`` (ISO 8601), ``assignee`` (username), ``sprint``
+(name, created if missing), ``labels`` (list, or ``;``/``,`` separated in CSV;
+created if missing), ``ref`` (any id unique within the file) and ``parent``
+(the ``ref`` of another row, making this task its subtask).
+"""
+import csv
+import io
+import json
+import time
+from datetime import datetime
+from sqlalchemy import insert, update
+from models import db, Task, Sprint, Label, User, TaskStatusChange, task_labels
+from services.burndown import refresh_sprint_snapshot
+
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+STATUSES = ('todo', 'in_progress', 'done')
+PRIORITIES = ('low', 'medium', 'high')
+
+class ImportRowError(ValueError):
+    pass
+
+class ImportFormatError(ValueError):
+    """The stream itself is unreadable (not UTF-8, broken CSV quoting); the import is abandoned."""
+
+def read_csv(stream):
+    """Yield (line_number, row dict) from a binary CSV stream; raises ImportFormatError if it can't be parsed."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    rows = iter(reader)
+    while True:
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except (UnicodeDecodeError, csv.Error) as err:
+            problem = 'is not UTF-8' if isinstance(err, UnicodeDecodeError) else f'is not valid CSV ({err})'
+            raise ImportFormatError(f'File {problem} after line {reader.line_num}') from err
+        yield reader.line_num, row
+
+def read_ndjson(stream):
+    """Yield (line_number, row dict) from a binary NDJSON stream; bad lines become error rows."""
+    for line_number, raw in enumerate(stream, start=1):
+        try:
+            line = raw.decode('utf-8-sig' if line_number == 1 else 'utf-8')
+        except UnicodeDecodeError:
+            yield line_number, ImportRowError('Line is not valid UTF-8')
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else ImportRowError('Invalid JSON object')
+
+def _text(row, key):
+    value = row.get(key)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _label_names(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        names = [str(v).strip() for v in value]
+    else:
+        names = str(value).replace(';', ',').split(',')
+    return list(dict.fromkeys(n.strip() for n in names if n and n.strip()))
+
+class TaskImporter:
+    """Imports one stream of rows into a project; call ``run`` once."""
+    def __init__(self, project_id, user_id):
+        self.project_id = project_id
+        self.user_id = user_id
+        self.users = {}  # username -> id (None if unknown)
+        self.sprints = {s.name: s.id for s in Sprint.query.filter_by(project_id=project_id)}
+        self.labels = {l.name: l.id for l in Label.query.filter_by(project_id=project_id)}
+        self.refs = {}  # row ref -> task id
+        self.seen_refs = set()
+        self.pending_parents = []  # (task_id, parent ref, line) resolved after all inserts
+        self.touched_sprints = set()
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def _error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def _resolve_users(self, rows):
+        wanted = {_text(r, 'assignee') for _, r in rows if isinstance(r, dict)} - {None} - self.users.keys()
+        if wanted:
+            found = dict(db.session.query(User.username, User.id).filter(User.username.in_(wanted)))
+            self.users.update({name: found.get(name) for name in wanted})
+
+    def _sprint_id(self, name):
+        if name not in self.sprints:
+            sprint = Sprint(project_id=self.project_id, name=name)
+            db.session.add(sprint)
+            db.session.flush()
+            self.sprints[name] = sprint.id
+        return self.sprints[name]
+
+    def _label_id(self, name):
+        if name not in self.labels:
+            label = Label(project_id=self.project_id, name=name[:50])
+            db.session.add(label)
+            db.session.flush()
+            self.labels[name] = label.id
+        return self.labels[name]
+
+    def _mapping(self, row):
+        title = _text(row, 'title')
+        if not title:
+            raise ImportRowError('title is required')
+        status = _text(row, 'status') or 'todo'
+        if status not in STATUSES:
+            raise ImportRowError(f'invalid status {status!r}')
+        priority = _text(row, 'priority') or 'medium'
+        if priority not in PRIORITIES:
+            raise ImportRowError(f'invalid priority {priority!r}')
+        estimate = _text(row, 'estimate')
+        try:
+            estimate = int(estimate) if estimate is not None else None
+            due_date = _text(row, 'due_date')
+            due_date = datetime.fromisoformat(due_date.replace('Z', '+00:00')) if due_date else None
+        except ValueError as err:
+            raise ImportRowError(str(err)) from err
+        assignee = _text(row, 'assignee')
+        if assignee and self.users.get(assignee) is None:
+            raise ImportRowError(f'unknown assignee {assignee!r}')
+        ref = _text(row, 'ref')
+        if ref and ref in self.seen_refs:
+            raise ImportRowError(f'duplicate ref {ref!r}')
+        self.seen_refs.add(ref)
+        sprint = _text(row, 'sprint')
+        return {
+            'title': title[:200],
+            'description': _text(row, 'description') or '',
+            'status': status,
+            'priority': priority,
+            'estimate': estimate,
+            'due_date': due_date,
+            'project_id': self.project_id,
+            'assignee_id': self.users.get(assignee) if assignee else None,
+            'sprint_id': self._sprint_id(sprint) if sprint else None,
+            'parent_id': None
+        }
+
+    def _flush(self, rows):
+        self._resolve_users(rows)
+        mappings, extras = [], []
+        for line, row in rows:
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                mappings.append(self._mapping(row))
+            except ImportRowError as err:
+                self._error(line, str(err))
+                continue
+            extras.append((line, _text(row, 'ref'), _text(row, 'parent'),
+                           [self._label_id(n) for n in _label_names(row.get('labels'))]))
+        if not mappings:
+            return
+        task_ids = db.session.scalars(
+            insert(Task).returning(Task.id, sort_by_parameter_order=True), mappings
+        ).all()
+
+        links, history = [], []
+        for task_id, mapping, (line, ref, parent, label_ids) in zip(task_ids, mappings, extras):
+            if ref:
+                self.refs[ref] = task_id
+            if parent:
+                self.pending_parents.append((task_id, parent, line))
+            links += [{'task_id': task_id, 'label_id': label_id} for label_id in label_ids]
+            history.append({'task_id': task_id, 'sprint_id': mapping['sprint_id'], 'user_id': self.user_id,
+                            'from_status': None, 'to_status': mapping['status']})
+            if mapping['sprint_id']:
+                self.touched_sprints.add(mapping['sprint_id'])
+        if links:
+            db.session.execute(task_labels.insert(), links)
+        db.session.execute(insert(TaskStatusChange), history)
+        self.imported += len(task_ids)
+
+    def _link_parents(self):
+        updates = []
+        for task_id, parent, line in self.pending_parents:
+            parent_id = self.refs.get(parent)
+            if parent_id is None or parent_id == task_id:
+                # The task itself is kept; only the subtask link is reported
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    self.errors.append({'line': line, 'error': f'unknown parent ref {parent!r}'})
+                continue
+            updates.append({'id': task_id, 'parent_id': parent_id})
+        for start in range(0, len(updates), BATCH_SIZE):
+            db.session.execute(update(Task), updates[start:start + BATCH_SIZE])
+
+    def run(self, rows):
+        """Consume (line, row) pairs; returns the import report. Does not commit."""
+        started = time.perf_counter()
+        batch = []
+        for item in rows:
+            batch.append(item)
+            if len(batch) >= BATCH_SIZE:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+        self._link_parents()
+        for sprint_id in self.touched_sprints:
+            refresh_sprint_snapshot(sprint_id)
+        elapsed = time.perf_counter() - started
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': self.errors,
+            'elapsed_ms': round(elapsed * 1000, 1),
+            'rows_per_second': round((self.imported + self.failed) / elapsed) if elapsed else None
+        }
@@ -0,0 +1,192 @@
+"""Resumable chunked attachment uploads, streamed straight to disk.
+
+An upload is started with its filename and total size (reserved against the
+project's ``ATTACHMENT_QUOTA_BYTES``), then sent as raw chunks, each tagged
+with the byte offset it starts at. Chunks are copied from the request stream
+into ``<UPLOAD_FOLDER>/.partial/<upload id>`` block by block, never buffered
+whole. The row's ``received`` column is the resume point: after a dropped
+connection whatever arrived is kept, and the client asks for the offset and
+continues from there. A chunk for any other offset gets a 409 carrying the
+expected one.
+
+The SHA-256 is computed as bytes arrive. Hash state is cached per process
+keyed by upload and offset; a chunk landing on another worker (or after a
+restart) re-hashes the partial file once and carries on. ``complete`` checks
+the length and the optional client checksum, then hands the file to the
+content-addressed store (services/blobs.py) and creates the Attachment.
+Deleting an Upload row, directly or through a task/project cascade, removes
+its partial file once the transaction commits.
+"""
+import hashlib
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event, func
+from sqlalchemy.orm import object_session
+from werkzeug.exceptions import ClientDisconnected
+from models import db, Attachment, Task, Upload
+from services import blobs
+
+BLOCK_SIZE = 64 * 1024
+
+class UploadError(Exception):
+    """A rejected upload step; ``status`` is the HTTP status, ``extra`` goes into the body."""
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+_hashers = {}  # upload id -> (offset, sha256 object); per process
+_hashers_lock = threading.Lock()
+
+def upload_folder():
+    return current_app.config['UPLOAD_FOLDER']
+
+def partial_path(upload_id):
+    return os.path.join(upload_folder(), blobs.PARTIAL_DIR, upload_id)
+
+def save_stream(stream):
+    """Copy a whole file stream into a new partial file; returns (path, sha256, size)."""
+    path = partial_path(uuid.uuid4().hex)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    hasher, size = hashlib.sha256(), 0
+    with open(path, 'wb') as fh:
+        while block := stream.read(BLOCK_SIZE):
+            fh.write(block)
+            hasher.update(block)
+            size += len(block)
+    return path, hasher.hexdigest(), size
+
+def quota_used(project_id):
+    """Bytes of the project's attachments plus bytes reserved by its unfinished uploads."""
+    stored = db.session.query(func.coalesce(func.sum(Attachment.size_bytes), 0)) \
+        .join(Task, Task.id == Attachment.task_id).filter(Task.project_id == project_id).scalar()
+    reserved = db.session.query(func.coalesce(func.sum(Upload.size), 0)) \
+        .filter(Upload.project_id == project_id).scalar()
+    return int(stored) + int(reserved)
+
+def check_quota(project_id, size):
+    config = current_app.config
+    if size > config['MAX_ATTACHMENT_BYTES']:
+        raise UploadError(f"File exceeds the {config['MAX_ATTACHMENT_BYTES']} byte limit", 413)
+    used = quota_used(project_id)
+    if used + size > config['ATTACHMENT_QUOTA_BYTES']:
+        raise UploadError('Project attachment quota exceeded', 413,
+                          quota_bytes=config['ATTACHMENT_QUOTA_BYTES'], used_bytes=used)
+
+def start(task, user_id, filename, size, mimetype=None):
+    """Reserve quota and create the upload row and its empty partial file."""
+    expire_stale()
+    check_quota(task.project_id, size)
+    upload = Upload(id=uuid.uuid4().hex, task_id=task.id, project_id=task.project_id, user_id=user_id,
+                    filename=filename, mimetype=mimetype, size=size)
+    os.makedirs(os.path.dirname(partial_path(upload.id)), exist_ok=True)
+    open(partial_path(upload.id), 'wb').close()
+    db.session.add(upload)
+    db.session.commit()
+    return upload
+
+def _hasher_at(upload_id, offset):
+    """SHA-256 state after the first ``offset`` bytes of the partial file."""
+    with _hashers_lock:
+        cached = _hashers.pop(upload_id, None)
+    if cached and cached[0] == offset:
+        return cached[1]
+    hasher, remaining = hashlib.sha256(), offset
+    with open(partial_path(upload_id), 'rb') as fh:
+        while remaining:
+            block = fh.read(min(BLOCK_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+def _remember(upload_id, offset, hasher):
+    with _hashers_lock:
+        _hashers[upload_id] = (offset, hasher)
+
+def write_chunk(upload, stream, offset, length):
+    """Append ``length`` bytes from ``stream`` at ``offset``; returns the new offset.
+
+    Whatever arrives before a disconnect is kept and committed, so the client
+    can resume from ``upload.received``.
+    """
+    if offset != upload.received:
+        raise UploadError('Offset does not match the bytes received so far', 409, offset=upload.received)
+    if length > current_app.config['UPLOAD_CHUNK_BYTES']:
+        raise UploadError(f"Chunk exceeds {current_app.config['UPLOAD_CHUNK_BYTES']} bytes", 413)
+    if offset + length > upload.size:
+        raise UploadError('Chunk extends past the declared file size', 400, offset=upload.received)
+
+    hasher = _hasher_at(upload.id, offset)
+    written = 0
+    with open(partial_path(upload.id), 'r+b') as fh:
+        fh.seek(offset)
+        fh.truncate()  # drop bytes from an earlier attempt that never got committed
+        try:
+            while written < length:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                fh.write(block)
+                hasher.update(block)
+                written += len(block)
+        except ClientDisconnected:
+            pass
+    upload.received = offset + written
+    db.session.commit()
+    _remember(upload.id, upload.received, hasher)
+    return upload.received
+
+def complete(upload, sha256=None):
+    """Verify length and checksum, store the blob and create the Attachment."""
+    if upload.received != upload.size:
+        raise UploadError('Upload is incomplete', 409, offset=upload.received)
+    digest = _hasher_at(upload.id, upload.received).hexdigest()
+    if sha256 and sha256.lower() != digest:
+        discard(upload)
+        raise UploadError('Checksum mismatch; the upload was discarded', 422, sha256=digest)
+
+    # The partial file stays until the commit (the Upload delete hook removes it),
+    # so a failed commit leaves the upload intact for a retried /complete
+    stored = blobs.store(partial_path(upload.id), digest, upload.size, keep_source=True)
+    attachment = Attachment(task_id=upload.task_id, user_id=upload.user_id, filename=upload.filename,
+                            stored_name=stored, mimetype=upload.mimetype, size_bytes=upload.size)
+    db.session.add(attachment)
+    db.session.delete(upload)
+    db.session.commit()
+    return attachment, digest
+
+def discard(upload):
+    """Delete an unfinished upload, its partial file and its quota reservation."""
+    db.session.delete(upload)
+    db.session.commit()
+
+@event.listens_for(Upload, 'after_delete')
+def _release_partial(mapper, connection, target):
+    _ = mapper, connection
+    object_session(target).info.setdefault('partial_removals', []).append(target.id)
+
+@event.listens_for(db.session, 'after_commit')
+def _remove_partials(session):
+    for upload_id in session.info.pop('partial_removals', []):
+        with _hashers_lock:
+            _hashers.pop(upload_id, None)
+        path = partial_path(upload_id)
+        if os.path.exists(path):
+            os.remove(path)
+
+@event.listens_for(db.session, 'after_rollback')
+def _keep_partials(session):
+    session.info.pop('partial_removals', None)
+
+def expire_stale(now=None):
+    """Discard uploads idle for longer than ``UPLOAD_TTL_HOURS``; returns how many."""
+    cutoff = (now or datetime.utcnow()) - timedelta(hours=current_app.config['UPLOAD_TTL_HOURS'])
+    stale = Upload.query.filter(Upload.updated_at < cutoff).all()
+    for upload in stale:
+        discard(upload)
+    return len(stale)
@@ -0,0 +1,25 @@
+"""Request-scoped username lookups.
+
+Listings collect the author ids of all their rows and resolve them with one
+``IN (...)`` query; results are memoized on ``flask.g`` so several listings (or
+the authenticated user, primed by ``token_required``) share them for the rest
+of the request.
+"""
+from flask import g
+from models import db, User
+
+def _cache():
+    if 'usernames' not in g:
+        g.usernames = {}
+    return g.usernames
+
+def remember_username(user_id, username):
+    _cache()[user_id] = username
+
+def usernames_for(user_ids):
+    """Return ``{user_id: username}`` covering ``user_ids`` (one query at most)."""
+    cache = _cache()
+    missing = {uid for uid in user_ids if uid is not None and uid not in cache}
+    if missing:
+        cache.update(db.session.query(User.id, User.username).filter(User.id.in_(missing)).all())
+    return cache
@@ -0,0 +1,123 @@
+"""Per-project version counters for conditional GETs (ETag / Last-Modified).
+
+Any ORM write to a model that feeds a versioned payload (``VERSIONED_MODELS``:
+tasks, sprints, labels, templates, members, comments, checklists, activity)
+bumps that project's row in ``project_version``. Bookkeeping writes such as
+upload progress, job progress or notifications leave cached boards alone. The bump runs in the same flush and transaction, so
+it commits or rolls back with the data. Read routes decorated with
+``conditional_by_project`` derive a strong ETag from the version and answer
+``If-None-Match`` with 304 before the view runs. Unchanged boards are never
+re-queried, and every worker process sees the same counter.
+
+Bulk Core statements bypass the flush hooks; call ``bump`` before committing them.
+"""
+import hashlib
+from functools import wraps
+from email.utils import format_datetime
+from datetime import datetime, timezone
+from contextlib import nullcontext
+from flask import g, request, make_response
+from sqlalchemy import event, select
+from models import (db, Project, ProjectMember, ProjectVersion, Task, Sprint, Label, TaskComment,
+                    ChecklistItem, ActivityLog, TaskTemplate)
+from services.database import replica_reads, upsert
+
+_NEVER_CHANGED = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+def project_version(project_id):
+    """(version, last modified) as committed; (0, a fixed date) for a project never written to."""
+    row = db.session.execute(select(ProjectVersion.version, ProjectVersion.updated_at)
+                             .where(ProjectVersion.project_id == project_id)).first()
+    if row is None:
+        return 0, _NEVER_CHANGED
+    return row.version, row.updated_at.replace(tzinfo=timezone.utc, microsecond=0)
+
+def request_version(project_id):
+    """The version ``conditional_by_project`` already read for this request, else a fresh read."""
+    cached = g.get('project_version')
+    if cached and cached[0] == project_id:
+        return cached[1:]
+    return project_version(project_id)
+
+def bump(project_ids, connection=None):
+    """Increment the projects' versions inside the current transaction (visible once it commits)."""
+    connection = connection or db.session.connection()
+    now = datetime.utcnow()
+    for project_id in sorted(set(project_ids)):
+        upsert(connection, ProjectVersion, ['project_id'], {'project_id': project_id, 'version': 1, 'updated_at': now},
+               {'version': ProjectVersion.version + 1, 'updated_at': now})
+
+# What the ``conditional_by_project`` views render; writes to anything else don't change a version
+VERSIONED_MODELS = (Project, ProjectMember, Sprint, Label, Task, TaskComment, ChecklistItem, ActivityLog,
+                    TaskTemplate)
+
+def _project_of(session, obj):
+    if not isinstance(obj, VERSIONED_MODELS):
+        return None
+    if isinstance(obj, Project):
+        return obj.id
+    if getattr(obj, 'project_id', None) is not None:
+        return obj.project_id
+    if getattr(obj, 'task_id', None) is not None:
+        task = session.get(Task, obj.task_id)
+        return task.project_id if task else None
+    if getattr(obj, 'sprint_id', None) is not None:
+        sprint = session.get(Sprint, obj.sprint_id)
+        return sprint.project_id if sprint else None
+    return None
+
+@event.listens_for(db.session, 'before_flush')
+def _collect_touched_projects(session, flush_context, instances):
+    _ = flush_context, instances
+    touched = session.info.setdefault('touched_projects', set())
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            project_id = _project_of(session, obj)
+            if project_id is not None:
+                touched.add(project_id)
+
+@event.listens_for(db.session, 'after_flush')
+def _bump_touched_projects(session, flush_context):
+    _ = flush_context
+    touched = session.info.pop('touched_projects', None)
+    if touched:
+        bump(touched, session.connection())
+
+@event.listens_for(db.session, 'after_rollback')
+def _drop_touched_projects(session):
+    session.info.pop('touched_projects', None)
+
+def _etag(project_id, version):
+    # Same project version, different query string (filters, pages) -> different tag
+    variant = hashlib.sha1(request.full_path.encode()).hexdigest()[:12]
+    return f"p{project_id}-v{version}-{variant}"
+
+def conditional_by_project(f):
+    """Serve 304s from the project's version counter; tag fresh responses with it.
+
+    Wrap a view taking ``project_id`` (below ``token_required``). For a
+    ``read_only`` view the version is read from the replica, like the view's
+    data. A lagging replica then serves an older tag with its older body,
+    never new tag with stale data. Only
+    ``If-None-Match`` is honoured: Last-Modified has one-second resolution, so
+    two writes in the same second would look unchanged.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        project_id = kwargs['project_id']
+        with replica_reads() if getattr(f, 'read_only', False) else nullcontext():
+            version, last_modified = project_version(project_id)
+        g.project_version = (project_id, version, last_modified)
+        etag = _etag(project_id, version)
+        if request.if_none_match.contains(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.headers['Last-Modified'] = format_datetime(last_modified, usegmt=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return decorated
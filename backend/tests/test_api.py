@@ -0,0 +1,914 @@
+"""API tests run against an isolated, per-test SQLite app."""
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from datetime import datetime, timedelta
+from models import (db, READ_BIND, User, Project, ProjectMember, Task, Label, ChecklistItem, TaskComment, Sprint,
+                    SprintSnapshot, TaskStatusChange, Notification, TimeLog, Attachment, ActivityLog, Upload,
+                    GitHubCache)
+from app import create_app
+from services import project_stats, jobs, uploads, versioning
+from services.auth_cache import principal_cache
+from services import pubsub
+from services.pubsub import broker
+from services.database import engine_options
+from services.metrics import registry
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        # File-backed so background job threads get their own connection
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'SECRET_KEY': 'test-secret-key-that-is-long-enough-for-hs256',
+        'TESTING': True,
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+    })
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    project_stats.invalidate()
+    principal_cache.clear()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def auth(client):
+    """Register and log in a user, returning (user_id, headers)."""
+    client.post('/api/auth/register', json={'username': 'alice', 'password': 'secret1'})
+    res = client.post('/api/auth/login', json={'username': 'alice', 'password': 'secret1'})
+    data = res.get_json()
+    return data['user_id'], {'Authorization': f"Bearer {data['token']}"}
+
+@pytest.fixture
+def project(auth):
+    user_id, _ = auth
+    p = Project(name='Board', owner_id=user_id)
+    db.session.add(p)
+    db.session.commit()
+    db.session.add(ProjectMember(project_id=p.id, user_id=user_id, role='admin'))
+    db.session.commit()
+    return p.id
+
+class QueryCounter:
+    """Count SQL statements issued on the app's engines inside a with-block."""
+    def __init__(self, bind_key=None):
+        self.bind_keys = [bind_key] if bind_key else None
+
+    def __enter__(self):
+        self.count = 0
+        self.engines = [db.engines[k] for k in self.bind_keys] if self.bind_keys else list(db.engines.values())
+        for engine in self.engines:
+            event.listen(engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in self.engines:
+            event.remove(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+def _seed_tasks(project_id, user_id, count, offset=0):
+    label = Label(project_id=project_id, name=f'label-{offset}', color='#fff')
+    db.session.add(label)
+    for i in range(count):
+        t = Task(title=f'Task {offset + i}', project_id=project_id, assignee_id=user_id)
+        t.labels.append(label)
+        t.checklist_items.append(ChecklistItem(content='step', is_completed=i % 2 == 0))
+        t.comments.append(TaskComment(user_id=user_id, content='hi'))
+        db.session.add(t)
+    db.session.commit()
+    db.session.expunge_all()
+
+def test_get_tasks_serializes_board(client, auth, project):
+    user_id, headers = auth
+    _seed_tasks(project, user_id, 2)
+    res = client.get(f'/api/tasks/project/{project}', headers=headers)
+    assert res.status_code == 200
+    tasks = res.get_json()
+    assert [t['title'] for t in tasks] == ['Task 0', 'Task 1']
+    first = tasks[0]
+    assert first['assignee_username'] == 'alice'
+    assert first['labels'][0]['name'] == 'label-0'
+    assert (first['checklist_count'], first['checklist_completed'], first['comment_count']) == (1, 1, 1)
+    assert tasks[1]['checklist_completed'] == 0
+
+def test_get_tasks_query_count_is_constant(client, auth, project):
+    user_id, headers = auth
+    _seed_tasks(project, user_id, 3)
+    client.get(f'/api/tasks/project/{project}', headers=headers)  # warm the principal cache
+    with QueryCounter() as small:
+        client.get(f'/api/tasks/project/{project}', headers=headers)
+    _seed_tasks(project, user_id, 60, offset=3)
+    with QueryCounter() as large:
+        res = client.get(f'/api/tasks/project/{project}', headers=headers)
+    assert len(res.get_json()) == 63
+    assert small.count == large.count
+
+def test_get_tasks_keyset_pagination(client, auth, project):
+    user_id, headers = auth
+    _seed_tasks(project, user_id, 5)
+    seen, cursor = [], None
+    while True:
+        url = f'/api/tasks/project/{project}?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url, headers=headers).get_json()
+        seen += [t['title'] for t in page['tasks']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert seen == [f'Task {i}' for i in range(5)]
+
+def test_get_tasks_filters(client, auth, project):
+    user_id, headers = auth
+    _seed_tasks(project, user_id, 3)
+    db.session.add(Task(title='Done one', status='done', priority='high', project_id=project))
+    db.session.commit()
+    base = f'/api/tasks/project/{project}'
+    assert [t['title'] for t in client.get(f'{base}?status=done', headers=headers).get_json()] == ['Done one']
+    assert len(client.get(f'{base}?assignee_id={user_id}', headers=headers).get_json()) == 3
+    assert len(client.get(f'{base}?assignee_id=none', headers=headers).get_json()) == 1
+    label_id = Label.query.filter_by(project_id=project).first().id
+    assert len(client.get(f'{base}?label={label_id}', headers=headers).get_json()) == 3
+    assert client.get(f'{base}?cursor=not-a-cursor', headers=headers).status_code == 400
+
+def test_migrate_creates_missing_indexes(app):
+    from sqlalchemy import inspect
+    from migrate import upgrade
+    for index in Task.__table__.indexes:
+        index.drop(bind=db.engine)
+    created = upgrade()
+    assert 'ix_task_project_created' in created
+    names = {ix['name'] for ix in inspect(db.engine).get_indexes('task')}
+    assert {ix.name for ix in Task.__table__.indexes} <= names
+    assert upgrade() == []
+
+def test_engine_is_configured_from_app_config(app):
+    with db.engine.connect() as conn:
+        assert conn.exec_driver_sql('PRAGMA journal_mode').scalar() == 'wal'
+        assert conn.exec_driver_sql('PRAGMA synchronous').scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql('PRAGMA busy_timeout').scalar() == 5000
+    options = engine_options({'SQLALCHEMY_DATABASE_URI': 'postgresql://u@db/pm', 'DB_POOL_SIZE': 4})
+    assert (options['pool_size'], options['pool_pre_ping']) == (4, True)
+
+def test_read_only_views_run_on_the_replica_engine(client, auth, project):
+    user_id, headers = auth
+    _seed_tasks(project, user_id, 2)
+    client.get(f'/api/tasks/project/{project}', headers=headers)  # warm the principal cache
+    with QueryCounter(READ_BIND) as replica, QueryCounter(None) as total:
+        assert client.get(f'/api/tasks/project/{project}?limit=1', headers=headers).status_code == 200
+    assert replica.count == total.count > 0
+    task_id = Task.query.filter_by(project_id=project).first().id
+    for path in (f'/api/time/task/{task_id}', f'/api/attachments/task/{task_id}'):
+        with QueryCounter(READ_BIND) as replica, QueryCounter(None) as total:
+            assert client.get(path, headers=headers).status_code == 200
+        assert replica.count == total.count > 0, path
+    with QueryCounter(READ_BIND) as replica:
+        client.post(f'/api/tasks/project/{project}', json={'title': 'write'}, headers=headers)
+    assert replica.count == 0
+    with pytest.raises(OperationalError):  # replica connections are query_only
+        with db.engines[READ_BIND].begin() as conn:
+            conn.exec_driver_sql("UPDATE task SET title = 'x'")
+
+def test_lagging_replica_serves_its_own_version_tag(tmp_path):
+    import sqlite3
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{primary}',
+                      'SQLALCHEMY_REPLICA_URI': f'sqlite:///{replica}',
+                      'SECRET_KEY': 'test-secret-key-that-is-long-enough-for-hs256', 'TESTING': True})
+    client = app.test_client()
+
+    def replicate():
+        with app.app_context():
+            db.session.remove()
+            db.engines[READ_BIND].dispose()
+        source, target = sqlite3.connect(primary), sqlite3.connect(replica)
+        source.backup(target)
+        source.close(), target.close()
+
+    with app.app_context():
+        db.create_all()
+    client.post('/api/auth/register', json={'username': 'bob', 'password': 'secret1'})
+    login = client.post('/api/auth/login', json={'username': 'bob', 'password': 'secret1'}).get_json()
+    headers = {'Authorization': f"Bearer {login['token']}"}
+    with app.app_context():
+        project = Project(name='Lag', owner_id=login['user_id'])
+        db.session.add(project)
+        db.session.commit()
+        url = f'/api/tasks/project/{project.id}'
+    client.post(url, json={'title': 'first'}, headers=headers)
+    replicate()
+    etag = client.get(url, headers=headers).headers['ETag']
+
+    client.post(url, json={'title': 'second'}, headers=headers)  # not replicated yet
+    stale = client.get(url, headers=headers)
+    assert len(stale.get_json()) == 1 and stale.headers['ETag'] == etag  # old data keeps its old tag
+    replicate()
+    fresh = client.get(url, headers={**headers, 'If-None-Match': etag})
+    assert fresh.status_code == 200 and len(fresh.get_json()) == 2
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    principal_cache.clear()
+
+def test_create_app_imports_optional_blueprints_only_when_enabled():
+    code = ("import sys, app; assert 'routes.tasks' not in sys.modules; "
+            "a = app.create_app({'OPTIONAL_BLUEPRINTS': ()}); "
+            "assert 'github' not in a.blueprints and 'requests' not in sys.modules; "
+            "a = app.create_app({'OPTIONAL_BLUEPRINTS': ('github',)}); assert 'github' in a.blueprints")
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    code = "import config; assert config.Config.OPTIONAL_BLUEPRINTS == ('ical', 'github')"
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.dirname(__file__)),
+                   env={**os.environ, 'OPTIONAL_BLUEPRINTS': ' ical, github ,'})
+
+def test_benchmark_suite_runs_against_seeded_data(app):
+    from benchmarks import bench_api
+    dataset = bench_api.generate('small')
+    assert Task.query.filter_by(project_id=dataset['project_id']).count() == dataset['hot_tasks']
+    db.session.remove()
+    results = bench_api.measure(app, dataset, runs=2)
+    assert set(results) == set(bench_api.ENDPOINTS)
+    assert results['get_tasks (board)']['queries'] <= 4  # version, stream seq, tasks, labels
+    assert bench_api._regressions(results, {**results, 'get_projects': {'queries': 0, 'p95_ms': 1e9}}, 1.5)
+
+def test_metrics_endpoint_reports_latency_sql_and_slow_queries(app, client, auth, project, caplog):
+    _, headers = auth
+    registry.reset()
+    app.config['SLOW_QUERY_MS'] = 0  # every statement counts as slow
+    with caplog.at_level('WARNING', logger='services.metrics'):
+        assert client.get(f'/api/tasks/project/{project}', headers=headers).status_code == 200
+    assert any('Slow query' in r.getMessage() and 'params=' in r.getMessage() for r in caplog.records)
+
+    app.config['METRICS_TOKEN'] = 'scrape'
+    assert client.get('/metrics').status_code == 401
+    res = client.get('/metrics', headers={'Authorization': 'Bearer scrape'})
+    assert res.status_code == 200 and res.mimetype == 'text/plain'
+    body = res.get_data(as_text=True)
+    labels = 'endpoint="tasks.get_tasks",method="GET"'
+    assert f'http_requests_total{{{labels},status="200"}} 1' in body
+    assert f'http_request_duration_seconds_count{{{labels}}} 1' in body
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in body
+    statements = next(l for l in body.splitlines() if l.startswith(f'db_statements_total{{{labels}}}'))
+    assert int(statements.split()[-1]) >= 1
+    assert f'http_response_size_bytes_count{{{labels}}} 1' in body
+    assert 'db_slow_queries_total 0' not in body
+
+def test_metrics_measure_streamed_bodies_when_closed(client, auth, project):
+    user_id, headers = auth
+    _seed_tasks(project, user_id, 3)
+    registry.reset()
+    res = client.get(f'/api/projects/{project}/export?format=csv', headers=headers)
+    assert res.is_streamed and not registry.requests
+    assert len(res.get_data(as_text=True).splitlines()) == 4
+    res.close()
+    key = ('projects.export_project', 'GET')
+    assert registry.requests[key + (200,)] == 1 and registry.latency[key][2] == 1
+    assert registry.sql[key][0] >= 4  # user, project, membership, then the body's task rows
+
+def test_burndown_reads_daily_snapshots(client, auth, project):
+    user_id, headers = auth
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    sprint = Sprint(project_id=project, name='S1', start_date=today - timedelta(days=2),
+                    end_date=today + timedelta(days=2))
+    db.session.add(sprint)
+    db.session.commit()
+    sprint_id = sprint.id
+    # Yesterday's point was recorded before today's changes
+    db.session.add(SprintSnapshot(sprint_id=sprint_id, day=(today - timedelta(days=1)).date(),
+                                  total_points=8, remaining_points=8))
+    db.session.add_all([
+        Task(title='A', project_id=project, sprint_id=sprint_id, estimate=5),
+        Task(title='B', project_id=project, sprint_id=sprint_id, estimate=3),
+    ])
+    db.session.commit()
+    task_id = Task.query.filter_by(title='A').first().id
+
+    client.put(f'/api/tasks/{task_id}', json={'status': 'done'}, headers=headers)
+    assert TaskStatusChange.query.filter_by(task_id=task_id, from_status='todo', to_status='done').count() == 1
+
+    data = client.get(f'/api/analytics/project/{project}/burndown?sprint_id={sprint_id}',
+                      headers=headers).get_json()
+    remaining = [d['remaining'] for d in data['data']]
+    assert data['total_points'] == 8
+    assert remaining == [None, 8, 3, None, None]
+
+def test_project_stats_cache_tracks_task_writes(client, auth, project):
+    user_id, headers = auth
+    base = f'/api/analytics/project/{project}/stats'
+    client.post(f'/api/tasks/project/{project}', json={'title': 'A', 'assignee_id': user_id}, headers=headers)
+    stats = client.get(base, headers=headers).get_json()
+    assert stats['workload'] == [{'assignee_id': user_id, 'username': 'alice', 'total_estimate': 0}]
+
+    task_id = client.post(f'/api/tasks/project/{project}', json={'title': 'B', 'assignee_id': user_id},
+                          headers=headers).get_json()['id']
+    client.put(f'/api/tasks/{task_id}', json={'estimate': 5, 'priority': 'high'}, headers=headers)
+    with QueryCounter() as queries:
+        stats = client.get(base, headers=headers).get_json()
+    assert queries.count == 0  # principal and stats both come from cache
+    assert stats['priority_breakdown'] == [{'name': 'high', 'value': 1}, {'name': 'medium', 'value': 1}]
+    assert stats['workload'][0]['total_estimate'] == 5
+
+    client.put(f'/api/tasks/{task_id}', json={'status': 'done'}, headers=headers)
+    client.delete(f'/api/tasks/{task_id}', headers=headers)
+    incremental = client.get(base, headers=headers).get_json()
+    project_stats.invalidate(project)
+    assert client.get(base, headers=headers).get_json() == incremental == {
+        'status_breakdown': [{'name': 'todo', 'value': 1}],
+        'priority_breakdown': [{'name': 'medium', 'value': 1}],
+        'workload': [{'assignee_id': user_id, 'username': 'alice', 'total_estimate': 0}],
+    }
+
+def test_token_required_caches_principal(client, auth):
+    user_id, headers = auth
+    client.get('/api/auth/cache-stats', headers=headers)
+    with QueryCounter() as queries:
+        stats = client.get('/api/auth/cache-stats', headers=headers).get_json()
+    assert queries.count == 0
+    assert stats['hits'] >= 1
+
+    res = client.post('/api/profile/change-password', headers=headers,
+                      json={'current_password': 'secret1', 'new_password': 'secret2'})
+    assert res.status_code == 200
+    misses = principal_cache.stats()['misses']
+    with QueryCounter() as queries:
+        client.get('/api/auth/cache-stats', headers=headers)
+    assert queries.count == 1 and principal_cache.stats()['misses'] == misses + 1
+
+    db.session.delete(db.session.get(User, user_id))
+    db.session.commit()
+    assert client.get('/api/auth/cache-stats', headers=headers).status_code == 401
+
+def _read_events(response, count):
+    """Pull ``count`` SSE events (ignoring comments/retry frames) off a streamed response."""
+    events, chunks = [], iter(response.response)
+    while len(events) < count:
+        frame = next(chunks).decode()
+        if frame.startswith('id:'):
+            fields = dict(line.split(': ', 1) for line in frame.strip().split('\n'))
+            events.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    response.close()
+    return events
+
+def test_notification_stream_replays_from_last_event_id(app, client, auth):
+    user_id, headers = auth
+    app.config['SSE_HEARTBEAT_SECONDS'] = 0.01
+    channel = f'user:{user_id}'
+    start = broker.last_id(channel)
+    db.session.add(Notification(user_id=user_id, message='You were assigned'))
+    db.session.commit()
+    notif_id = Notification.query.first().id
+    client.post(f'/api/notifications/{notif_id}/read', headers=headers)
+
+    res = client.get(f'/api/notifications/stream?token={headers["Authorization"][7:]}',
+                     headers={'Last-Event-ID': str(start)}, buffered=False)
+    assert res.mimetype == 'text/event-stream'
+    (id1, kind1, data1), (id2, kind2, data2) = _read_events(res, 2)
+    assert (kind1, data1['notification']['message'], data1['unread_delta']) == ('notification', 'You were assigned', 1)
+    assert (id2, kind2, data2) == (id1 + 1, 'read', {'id': notif_id, 'unread_delta': -1})
+
+    res = client.get('/api/notifications/stream', headers={**headers, 'Last-Event-ID': str(id2 + 50)},
+                     buffered=False)
+    assert _read_events(res, 1)[0][1] == 'resync'
+
+def test_board_stream_publishes_sequenced_deltas(app, client, auth, project):
+    _, headers = auth
+    app.config['SSE_HEARTBEAT_SECONDS'] = 0.01
+    seq = int(client.get(f'/api/tasks/project/{project}', headers=headers).headers['X-Board-Seq'])
+    label = client.post(f'/api/labels/project/{project}', json={'name': 'bug'}, headers=headers).get_json()
+
+    task_id = client.post(f'/api/tasks/project/{project}', json={'title': 'A'}, headers=headers).get_json()['id']
+    client.put(f'/api/tasks/{task_id}', json={'status': 'in_progress'}, headers=headers)
+    client.post(f'/api/labels/task/{task_id}/assign', json={'label_id': label['id']}, headers=headers)
+    client.post(f'/api/comments/task/{task_id}', json={'content': 'on it'}, headers=headers)
+    item_id = client.post(f'/api/tasks/{task_id}/checklists', json={'content': 'x'}, headers=headers).get_json()['id']
+    client.put(f'/api/tasks/checklists/{item_id}', json={'is_completed': True}, headers=headers)
+    client.delete(f'/api/tasks/{task_id}', headers=headers)
+
+    res = client.get(f'/api/tasks/project/{project}/stream?last_event_id={seq}', headers=headers, buffered=False)
+    events = _read_events(res, 7)
+    assert [e[0] for e in events] == list(range(seq + 1, seq + 8))
+    assert [e[1] for e in events] == ['task_created', 'task_updated', 'label_assigned', 'comment_added',
+                                      'checklist_changed', 'checklist_changed', 'task_deleted']
+    assert events[0][2]['task']['title'] == 'A'
+    assert events[1][2] == {'id': task_id, 'changes': {'status': 'in_progress'}}
+    assert events[3][2]['comment_count'] == 1
+    assert (events[5][2]['checklist_count'], events[5][2]['checklist_completed']) == (1, 1)  # absolute: replay-safe
+
+def test_board_stream_follows_events_logged_by_other_workers(app, client, auth, project):
+    _, headers = auth
+    app.config.update(SSE_HEARTBEAT_SECONDS=0.01, SSE_POLL_SECONDS=0.01)
+    url = f'/api/tasks/project/{project}'
+    seq = int(client.get(url, headers=headers).headers['X-Board-Seq'])
+    with db.engine.begin() as conn:  # another worker's commit: in the shared log, no local wake-up
+        pubsub.Broker().store(conn, [(f'project:{project}', 'task_deleted', {'id': 123})])
+    res = client.get(f'{url}/stream?last_event_id={seq}', headers=headers, buffered=False)
+    assert _read_events(res, 1) == [(seq + 1, 'task_deleted', {'id': 123})]
+    assert int(client.get(url, headers=headers).headers['X-Board-Seq']) == seq + 1
+
+    with db.engine.begin() as conn:
+        pubsub.broker.store(conn, [(f'project:{project}', 'task_deleted', {'id': i}) for i in range(300)])
+    res = client.get(f'{url}/stream?last_event_id={seq + 1}', headers=headers, buffered=False)
+    assert _read_events(res, 1) == [(seq + 301, 'resync', {})]  # fell out of the replay log
+
+def test_template_tasks_reach_the_board_stream_and_history(app, client, auth, project):
+    user_id, headers = auth
+    app.config['SSE_HEARTBEAT_SECONDS'] = 0.01
+    template = client.post(f'/api/templates/project/{project}', headers=headers,
+                           json={'name': 'Bug', 'title': 'Triage bug', 'priority': 'high'}).get_json()
+    seq = int(client.get(f'/api/tasks/project/{project}', headers=headers).headers['X-Board-Seq'])
+    task_id = client.post(f"/api/templates/{template['id']}/apply", headers=headers).get_json()['id']
+
+    res = client.get(f'/api/tasks/project/{project}/stream?last_event_id={seq}', headers=headers, buffered=False)
+    [(_, kind, data)] = _read_events(res, 1)
+    assert kind == 'task_created'
+    assert (data['task']['id'], data['task']['priority'], data['task']['assignee_id']) == (task_id, 'high', user_id)
+    assert TaskStatusChange.query.filter_by(task_id=task_id, to_status='todo').count() == 1
+
+def test_conditional_get_answers_304_until_project_changes(client, auth, project):
+    user_id, headers = auth
+    url = f'/api/tasks/project/{project}'
+    first = client.get(url, headers=headers)
+    etag = first.headers['ETag']
+    assert first.headers['Last-Modified']
+
+    db.session.add(Notification(user_id=user_id, project_id=project, message='ping'))  # not on the board
+    db.session.commit()
+    with QueryCounter() as queries:
+        cached = client.get(url, headers={**headers, 'If-None-Match': etag})
+    assert cached.status_code == 304 and queries.count == 1  # just the shared version lookup
+    assert client.get(f'{url}?status=done', headers={**headers, 'If-None-Match': etag}).status_code == 200
+
+    task_id = client.post(url, json={'title': 'A'}, headers=headers).get_json()['id']
+    changed = client.get(url, headers={**headers, 'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+
+    # Writes to child rows (checklists) also bump the owning project's version
+    etag = changed.headers['ETag']
+    client.post(f'/api/tasks/{task_id}/checklists', json={'content': 'x'}, headers=headers)
+    assert client.get(url, headers={**headers, 'If-None-Match': etag}).status_code == 200
+
+    # The counter lives in the database: a write committed by another worker invalidates this one's tags
+    latest = client.get(url, headers=headers)
+    with db.engine.begin() as conn:
+        versioning.bump([project], conn)
+    assert client.get(url, headers={**headers, 'If-None-Match': latest.headers['ETag']}).status_code == 200
+    since = {'If-Modified-Since': latest.headers['Last-Modified']}
+    assert client.get(url, headers={**headers, **since}).status_code == 200  # dates are too coarse to trust
+
+def test_bulk_update_uses_set_based_statements(client, auth, project):
+    user_id, headers = auth
+    sprint = Sprint(project_id=project, name='S1')
+    urgent = Label(project_id=project, name='urgent', color='#f00')
+    db.session.add_all([sprint, urgent])
+    db.session.commit()
+    sprint_id, urgent_id = sprint.id, urgent.id
+    client.get(f'/api/analytics/project/{project}/stats', headers=headers)  # warm stats cache
+
+    counts = []
+    for n in (3, 30):
+        _seed_tasks(project, user_id, n, offset=n)
+        ids = [t.id for t in Task.query.filter_by(project_id=project, status='todo')]
+        with QueryCounter() as queries:
+            res = client.patch('/api/tasks/bulk', headers=headers, json={
+                'ids': ids + [999999],
+                'patch': {'status': 'done', 'sprint_id': sprint_id, 'labels_add': [urgent_id]}
+            })
+        counts.append(queries.count)
+        assert res.status_code == 200
+        body = res.get_json()
+        assert body['updated'] == n
+        assert body['results'][-1] == {'id': 999999, 'ok': False, 'error': 'Task not found'}
+    assert counts[0] == counts[1]
+
+    db.session.expire_all()
+    tasks = Task.query.filter_by(project_id=project).all()
+    assert {(t.status, t.sprint_id) for t in tasks} == {('done', sprint_id)}
+    assert all(urgent_id in [l.id for l in t.labels] for t in tasks)
+    assert TaskStatusChange.query.filter_by(to_status='done').count() == 33
+    assert SprintSnapshot.query.filter_by(sprint_id=sprint_id).one().remaining_points == 0
+    assert ActivityLog.query.filter_by(action_type='tasks_bulk_updated').count() == 2
+    stats = client.get(f'/api/analytics/project/{project}/stats', headers=headers).get_json()
+    assert stats['status_breakdown'] == [{'name': 'done', 'value': 33}]
+
+    res = client.patch('/api/tasks/bulk', headers=headers, json={'ids': [1], 'patch': {'title': 'x'}})
+    assert res.status_code == 400
+    other = Project(name='Other', owner_id=user_id)
+    db.session.add(other)
+    db.session.flush()
+    foreign = Label(project_id=other.id, name='theirs')
+    db.session.add(foreign)
+    db.session.commit()
+    for bad in ({'labels_add': 5}, {'labels_remove': 'ab'}, {'labels_add': [foreign.id]}, {'status': 'bogus'},
+                {'priority': None}, {'estimate': '3'}, {'assignee_id': 999999}, {'sprint_id': 999999}):
+        res = client.patch('/api/tasks/bulk', headers=headers, json={'ids': ids, 'patch': bad})
+        assert res.status_code == 400, bad
+    assert client.put(f'/api/tasks/{ids[0]}', json={'status': 'bogus'}, headers=headers).status_code == 400
+    db.session.expire_all()
+    assert {t.status for t in Task.query.filter_by(project_id=project)} == {'done'}
+
+def test_import_tasks_from_csv_and_ndjson(client, auth, project):
+    _, headers = auth
+    csv_body = (
+        'ref,title,status,priority,estimate,assignee,sprint,labels,parent\n'
+        'a,Epic,in_progress,high,5,alice,S1,backend;api,\n'
+        'b,Child,done,,2,alice,S1,api,a\n'
+        ',,todo,,,,,,\n'
+        'c,Ghost,todo,,,bob,,,\n'
+    )
+    res = client.post(f'/api/tasks/project/{project}/import?format=csv', headers=headers,
+                      data=csv_body, content_type='text/csv')
+    assert res.status_code == 201
+    report = res.get_json()
+    assert (report['imported'], report['failed']) == (2, 2)
+    assert [e['line'] for e in report['errors']] == [4, 5]
+
+    ndjson = '{"ref": "x", "title": "Sub", "parent": "y"}\nnot json\n{"ref": "y", "title": "Top", "sprint": "S1"}\n'
+    res = client.post(f'/api/tasks/project/{project}/import', headers=headers,
+                      data=ndjson, content_type='application/x-ndjson')
+    assert res.get_json()['imported'] == 2
+    assert res.get_json()['errors'] == [{'line': 2, 'error': 'Invalid JSON object'}]
+
+    tasks = {t.title: t for t in Task.query.filter_by(project_id=project)}
+    assert tasks['Child'].parent_id == tasks['Epic'].id
+    assert tasks['Sub'].parent_id == tasks['Top'].id
+    assert sorted(l.name for l in tasks['Epic'].labels) == ['api', 'backend']
+    assert Sprint.query.filter_by(project_id=project).count() == 1
+    assert tasks['Top'].sprint_id == tasks['Epic'].sprint_id
+    snapshot = SprintSnapshot.query.filter_by(sprint_id=tasks['Epic'].sprint_id).one()
+    assert (snapshot.total_points, snapshot.remaining_points) == (8, 6)
+
+    url = f'/api/tasks/project/{project}/import'
+    res = client.post(f'{url}?format=csv', headers=headers, data=b'title,sprint\nNew,S2\n\xff\xfe bad\n',
+                      content_type='text/csv')
+    assert res.status_code == 400 and 'not UTF-8' in res.get_json()['error']
+    res = client.post(f'{url}?format=csv', headers=headers, data=b'title\n' + b'x' * 200_000 + b'\n',
+                      content_type='text/csv')  # over csv's field size limit
+    assert res.status_code == 400
+    assert Sprint.query.filter_by(project_id=project).count() == 1  # nothing from the rejected files was kept
+    res = client.post(f'{url}?format=ndjson', headers=headers, data=b'{"title": "Ok"}\n\xff{"title": "x"}\n')
+    assert res.get_json()['imported'] == 1
+    assert res.get_json()['errors'] == [{'line': 2, 'error': 'Line is not valid UTF-8'}]
+
+def test_project_export_streams_ndjson_csv_and_gzip(client, auth, project):
+    user_id, headers = auth
+    _seed_tasks(project, user_id, 3)
+    task_id = Task.query.filter_by(project_id=project).first().id
+    db.session.add(TimeLog(task_id=task_id, user_id=user_id, minutes=30))
+    db.session.commit()
+
+    res = client.get(f'/api/projects/{project}/export', headers=headers)
+    assert res.is_streamed
+    records = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [r['type'] for r in records] == ['task'] * 3 + ['comment'] * 3 + ['time_log']
+    assert records[0]['labels'] == ['label-0'] and records[0]['assignee_username'] == 'alice'
+    assert records[3]['username'] == 'alice'
+
+    res = client.get(f'/api/projects/{project}/export?format=csv&kind=tasks&gzip=1', headers=headers)
+    assert res.mimetype == 'application/gzip'
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(res.get_data()).decode())))
+    assert [r['title'] for r in rows] == ['Task 0', 'Task 1', 'Task 2']
+    assert rows[0]['labels'] == 'label-0'
+
+    assert client.get(f'/api/projects/{project}/export?include=bogus', headers=headers).status_code == 400
+
+def test_task_search_ranks_prefix_matches_within_scope(client, auth, project):
+    user_id, headers = auth
+    other = Project(name='Elsewhere', owner_id=user_id + 1000)
+    db.session.add(other)
+    db.session.commit()
+    hits = lambda q, **kw: client.get('/api/tasks/search', query_string=dict(q=q, **kw), headers=headers).get_json()
+
+    client.post(f'/api/tasks/project/{project}', json={'title': 'Deploy pipeline'}, headers=headers)
+    client.post(f'/api/tasks/project/{project}', json={'title': 'Fix login',
+                'description': 'deploy blocked by <script> in the pipeline'}, headers=headers)
+    db.session.add(Task(title='Deploy secret', project_id=other.id))
+    db.session.commit()
+
+    results = hits('depl pipe')
+    assert [r['title'] for r in results] == ['Deploy pipeline', 'Fix login']  # title outranks description
+    assert '<mark>Deploy</mark>' in results[0]['snippet']
+    assert '&lt;script&gt;' in results[1]['snippet']
+
+    login = results[1]['id']
+    client.post(f'/api/tasks/{login}/comments', json={'content': 'waiting on oauth'}, headers=headers)
+    assert [r['id'] for r in hits('oauth', project_id=project)] == [login]
+    client.put(f'/api/tasks/{login}', json={'title': 'Fix signup'}, headers=headers)
+    assert [r['title'] for r in hits('signup')] == ['Fix signup']
+    client.delete(f'/api/tasks/{login}', headers=headers)
+    assert hits('oauth') == []
+
+def test_ical_feed_streams_and_serves_cached_body(client, auth, project):
+    user_id, headers = auth
+    _seed_tasks(project, user_id, 3)
+    db.session.add(Sprint(project_id=project, name='S1'))
+    db.session.commit()
+    feed = client.get(f'/api/ical/project/{project}/subscribe', headers=headers).get_json()['url']
+    path = feed.split('localhost', 1)[1]
+
+    first = client.get(path)
+    body = first.get_data(as_text=True)
+    assert first.mimetype == 'text/calendar'
+    assert body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n')
+    assert body.count('BEGIN:VEVENT') == 4
+
+    with QueryCounter() as queries:
+        again = client.get(path)
+    assert queries.count == 1 and again.get_data(as_text=True) == body  # version lookup only
+    assert client.get(path, headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    assert client.get(path.replace('.ics', 'x.ics')).status_code == 404
+
+    # A task committed by another worker (raw connection, shared version bump) is not hidden by the cache
+    with db.engine.begin() as conn:
+        conn.execute(Task.__table__.insert().values(title='Elsewhere', status='todo', priority='medium',
+                                                    project_id=project, created_at=datetime.utcnow()))
+        versioning.bump([project], conn)
+    assert client.get(path).get_data(as_text=True).count('BEGIN:VEVENT') == 5
+
+def _seed_task_activity(task_id, count):
+    users = [User(username=f'u{task_id}-{i}-{count}', password='x') for i in range(3)]
+    db.session.add_all(users)
+    db.session.flush()
+    for i in range(count):
+        author = users[i % 3].id
+        db.session.add(TaskComment(task_id=task_id, user_id=author, content=f'c{i}'))
+        db.session.add(TimeLog(task_id=task_id, user_id=author, minutes=5))
+        db.session.add(Attachment(task_id=task_id, user_id=author, filename='a.txt', stored_name=f'{task_id}-{i}'))
+    db.session.commit()
+
+def test_task_listings_resolve_usernames_in_one_query(client, auth, project):
+    _, headers = auth
+    small = Task(title='small', project_id=project)
+    large = Task(title='large', project_id=project)
+    db.session.add_all([small, large])
+    db.session.commit()
+    small_id, large_id = small.id, large.id
+    _seed_task_activity(small_id, 3)
+    _seed_task_activity(large_id, 40)
+    client.get('/api/auth/cache-stats', headers=headers)  # warm the principal cache
+
+    for url in ('/api/comments/task/{}', '/api/time/task/{}', '/api/attachments/task/{}'):
+        counts = []
+        for task_id in (small_id, large_id):
+            with QueryCounter() as queries:
+                res = client.get(url.format(task_id), headers=headers)
+            counts.append(queries.count)
+        assert res.status_code == 200
+        assert counts[0] == counts[1] <= 4, url  # task lookup (+labels), rows, one user IN query
+    comments = client.get(f'/api/comments/task/{large_id}', headers=headers).get_json()
+    assert comments[0]['username'].startswith(f'u{large_id}-0')
+
+def test_chunked_upload_resumes_and_verifies_checksum(app, client, auth, project, monkeypatch):
+    _, headers = auth
+    task = Task(title='Files', project_id=project)
+    db.session.add(task)
+    db.session.commit()
+    assert app.config['MAX_CONTENT_LENGTH'] is None  # other routes (e.g. task import) stay unlimited
+    app.config.update(UPLOAD_CHUNK_BYTES=4, ATTACHMENT_QUOTA_BYTES=16, MAX_ATTACHMENT_BYTES=1000)
+    res = client.post(f'/api/attachments/task/{task.id}', headers={**headers, 'Transfer-Encoding': 'chunked'},
+                      content_type='multipart/form-data; boundary=x', input_stream=io.BytesIO(b'x' * 2000),
+                      environ_overrides={'wsgi.input_terminated': True})
+    assert res.status_code == 413  # no Content-Length to check, the stream itself is capped
+    payload = b'hello chunked'
+    res = client.post(f'/api/attachments/task/{task.id}/uploads', headers=headers,
+                      json={'filename': 'notes.txt', 'size': len(payload)})
+    assert res.status_code == 201
+    upload_url = f"/api/attachments/uploads/{res.get_json()['upload_id']}"
+    assert client.post(f'/api/attachments/task/{task.id}/uploads', headers=headers,
+                       json={'filename': 'big.txt', 'size': 8}).status_code == 413  # 13 of 16 reserved
+    with monkeypatch.context() as patched:
+        patched.setattr(uploads, 'save_stream', lambda stream: pytest.fail('over-quota body was written'))
+        res = client.post(f'/api/attachments/task/{task.id}', headers=headers,
+                          data={'file': (io.BytesIO(b'tiny'), 'tiny.txt')})
+    assert res.status_code == 413 and res.get_json()['used_bytes'] == 13
+
+    def put(offset):
+        return client.put(f'{upload_url}?offset={offset}', data=payload[offset:offset + 4], headers=headers)
+    assert put(0).get_json()['offset'] == 4
+    res = put(0)  # a retried chunk the server already has
+    assert res.status_code == 409 and res.get_json()['offset'] == 4
+    uploads._hashers.clear()  # next chunk lands on a "different worker": hash state is rebuilt from disk
+    offset = client.get(upload_url, headers=headers).get_json()['offset']
+    while offset < len(payload):
+        offset = put(offset).get_json()['offset']
+
+    def failing_commit():
+        raise RuntimeError('database went away')
+    monkeypatch.setattr(db.session, 'commit', failing_commit)
+    with pytest.raises(RuntimeError):
+        client.post(f'{upload_url}/complete', headers=headers, json={})
+    monkeypatch.undo()
+    db.session.rollback()  # the request's failed transaction; the partial file must still be there
+    res = client.post(f'{upload_url}/complete', headers=headers,
+                      json={'sha256': hashlib.sha256(payload).hexdigest()})
+    assert res.status_code == 201 and res.get_json()['sha256'] == hashlib.sha256(payload).hexdigest()
+    attachment = db.session.get(Attachment, res.get_json()['id'])
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], attachment.stored_name), 'rb') as fh:
+        assert fh.read() == payload
+    assert os.listdir(os.path.join(app.config['UPLOAD_FOLDER'], '.partial')) == []
+
+    res = client.post(f'/api/attachments/task/{task.id}/uploads', headers=headers,
+                      json={'filename': 'x.txt', 'size': 3})
+    upload_url = f"/api/attachments/uploads/{res.get_json()['upload_id']}"
+    client.put(f'{upload_url}?offset=0', data=b'abc', headers=headers)
+    assert client.post(f'{upload_url}/complete', headers=headers, json={'sha256': '0' * 64}).status_code == 422
+    assert client.get(upload_url, headers=headers).status_code == 404
+
+    res = client.post(f'/api/attachments/task/{task.id}/uploads', headers=headers,
+                      json={'filename': 'y.txt', 'size': 3})
+    client.put(f"/api/attachments/uploads/{res.get_json()['upload_id']}?offset=0", data=b'ab', headers=headers)
+    db.session.delete(task)  # unfinished uploads and their partial files go with the task
+    db.session.commit()
+    assert Upload.query.count() == 0
+    assert os.listdir(os.path.join(app.config['UPLOAD_FOLDER'], '.partial')) == []
+
+def test_identical_attachments_share_one_blob_until_the_last_reference(app, client, auth, project):
+    from models import Blob
+    from services.blobs import blob_name
+    _, headers = auth
+    tasks = [Task(title=f'Spec {i}', project_id=project) for i in range(2)]
+    db.session.add_all(tasks)
+    db.session.commit()
+    task_ids = [t.id for t in tasks]
+    ids = [client.post(f'/api/attachments/task/{task_id}', headers=headers,
+                       data={'file': (io.BytesIO(b'%PDF spec'), 'spec.pdf')}).get_json()['id'] for task_id in task_ids]
+    digest = hashlib.sha256(b'%PDF spec').hexdigest()
+    blob_path = os.path.join(app.config['UPLOAD_FOLDER'], *blob_name(digest).split('/'))
+    assert {a.stored_name for a in Attachment.query.all()} == {blob_name(digest)}
+    assert db.session.get(Blob, digest).refs == 2
+    assert client.get(f'/api/attachments/download/{ids[0]}', headers=headers).data == b'%PDF spec'
+
+    assert client.delete(f'/api/attachments/{ids[0]}', headers=headers).status_code == 200
+    assert os.path.exists(blob_path) and db.session.get(Blob, digest).refs == 1
+    db.session.delete(db.session.get(Task, task_ids[1]))
+    db.session.flush()
+    db.session.rollback()  # the released file outlives a rolled-back delete
+    assert os.path.exists(blob_path) and db.session.get(Blob, digest).refs == 1
+    db.session.delete(db.session.get(Task, task_ids[1]))  # cascade drops the last reference
+    db.session.commit()
+    assert not os.path.exists(blob_path) and db.session.get(Blob, digest) is None
+
+    # gc: adopt a pre-blob UUID file, drop an old orphan, keep a fresh one
+    folder = app.config['UPLOAD_FOLDER']
+    for name, body in (('legacy.txt', b'old'), ('orphan.bin', b'zz'), ('fresh.bin', b'new')):
+        with open(os.path.join(folder, name), 'wb') as fh:
+            fh.write(body)
+    os.utime(os.path.join(folder, 'orphan.bin'), (0, 0))
+    db.session.add(Attachment(task_id=task_ids[0], user_id=auth[0], filename='a.txt', stored_name='legacy.txt'))
+    db.session.commit()
+    out = app.test_cli_runner().invoke(args=['attachments', 'gc']).output
+    assert 'adopted=1' in out and 'orphans_removed=1' in out
+    assert Attachment.query.filter_by(filename='a.txt').one().stored_name == blob_name(hashlib.sha256(b'old').hexdigest())
+    assert sorted(os.listdir(folder)) == ['.partial', 'blobs', 'fresh.bin']
+
+def test_attachment_download_supports_ranges_etags_and_proxy_offload(app, client, auth, project):
+    _, headers = auth
+    task = Task(title='Files', project_id=project)
+    db.session.add(task)
+    db.session.commit()
+    body = b'0123456789' * 10
+    attachment_id = client.post(f'/api/attachments/task/{task.id}', headers=headers,
+                                data={'file': (io.BytesIO(body), 'big.zip')}).get_json()['id']
+    url = f'/api/attachments/download/{attachment_id}'
+    digest = hashlib.sha256(body).hexdigest()
+
+    res = client.get(url, headers=headers)
+    assert res.data == body and res.headers['ETag'] == f'"{digest}"' and res.headers['Accept-Ranges'] == 'bytes'
+    assert {'private', 'immutable', f"max-age={app.config['ATTACHMENT_MAX_AGE']}"} <= \
+        {d.strip() for d in res.headers['Cache-Control'].split(',')}
+    res = client.get(url, headers={**headers, 'Range': 'bytes=10-19', 'If-Range': f'"{digest}"'})
+    assert res.status_code == 206 and res.data == body[10:20]
+    assert res.headers['Content-Range'] == f'bytes 10-19/{len(body)}'
+    assert client.get(url, headers={**headers, 'If-None-Match': f'"{digest}"'}).status_code == 304
+
+    app.config['ATTACHMENT_OFFLOAD'] = 'x-accel-redirect'
+    res = client.get(url, headers=headers)
+    assert res.data == b'' and res.headers['X-Accel-Redirect'].endswith(f'/{digest[:2]}/{digest[2:4]}/{digest}')
+    assert res.headers['Content-Disposition'] == 'attachment; filename=big.zip'
+    assert client.get(url, headers={**headers, 'If-None-Match': f'"{digest}"'}).status_code == 304
+    app.config['ATTACHMENT_OFFLOAD'] = 'x-sendfile'
+    assert os.path.isfile(client.get(url, headers=headers).headers['X-Sendfile'])
+
+def test_comment_thread_pagination(client, auth, project):
+    _, headers = auth
+    task = Task(title='t', project_id=project)
+    db.session.add(task)
+    db.session.commit()
+    task_id = task.id
+    _seed_task_activity(task_id, 5)
+    seen, cursor = [], None
+    while True:
+        url = f'/api/comments/task/{task_id}?limit=2' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url, headers=headers).get_json()
+        seen += [c['content'] for c in page['comments']]
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert seen == [f'c{i}' for i in range(5)]
+
+@pytest.fixture
+def github_stub(app):
+    """Local stand-in for api.github.com: 3 pages of issues with ETags and Link headers."""
+    pages = {n: [{'id': n * 100 + i, 'number': n * 100 + i, 'title': f'Issue {n}.{i}', 'state': 'open'}
+                 for i in range(2)] for n in (1, 2, 3)}
+    class Hits(list):
+        rate_remaining = 4999  # what the stub reports in X-RateLimit-Remaining
+    hits = Hits()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            page = int(parse_qs(urlparse(self.path).query).get('page', ['1'])[0])
+            etag = f'"issues-{page}"'
+            hits.append((page, self.headers.get('If-None-Match') == etag))
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('X-RateLimit-Remaining', '4999')
+                self.end_headers()
+                return
+            body = json.dumps(pages[page]).encode()
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('X-RateLimit-Remaining', str(hits.rate_remaining))
+            self.send_header('X-RateLimit-Reset', '0')
+            base = f'http://127.0.0.1:{self.server.server_port}/repos/o/r/issues?per_page=100&state=open'
+            self.send_header('Link', f'<{base}&page=2>; rel="next", <{base}&page=3>; rel="last"')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    app.config['GITHUB_API_URL'] = f'http://127.0.0.1:{server.server_port}'
+    yield hits
+    server.shutdown()
+
+def _run_import(client, headers, project):
+    res = client.post(f'/api/github/import_issues/{project}', headers=headers)
+    assert res.status_code == 202
+    job_id = res.get_json()['job_id']
+    jobs.wait(job_id, timeout=10)
+    return client.get(res.get_json()['status_url'], headers=headers).get_json()
+
+def test_github_import_pages_concurrently_and_revalidates(client, auth, project, github_stub):
+    _, headers = auth
+    db.session.get(Project, project).github_repo = 'https://github.com/o/r.git'
+    db.session.commit()
+
+    job = _run_import(client, headers, project)
+    assert job['status'] == 'succeeded', job['error']
+    assert (job['progress'], job['total']) == (6, 6)
+    assert job['result']['count'] == 6 and job['result']['truncated'] is False
+    assert sorted(github_stub) == [(1, False), (2, False), (3, False)]
+    titles = [t.title for t in Task.query.filter_by(project_id=project).order_by(Task.id)]
+    assert titles == [f'Issue {n}.{i}' for n in (1, 2, 3) for i in range(2)]
+    assert TaskStatusChange.query.filter_by(to_status='todo').count() == 6
+
+    github_stub.clear()
+    job = _run_import(client, headers, project)
+    assert job['result']['count'] == 0
+    assert sorted(github_stub) == [(1, True), (2, True), (3, True)]  # all answered 304 from cache
+
+def test_github_cache_write_tolerates_a_concurrent_fetch(app, github_stub):
+    from services.github_client import GitHubClient
+    client = GitHubClient(base_url=app.config['GITHUB_API_URL'])
+    url = client.url('/repos/o/r/issues', {'page': 1})
+    request = client._request
+
+    def racing_request(u, etag):
+        with db.engine.begin() as conn:  # another worker caches the same URL first
+            conn.execute(GitHubCache.__table__.insert().values(url=u, etag='"old"', body='[]'))
+        return request(u, etag)
+
+    client._request = racing_request
+    assert [i['title'] for i in client.get('/repos/o/r/issues', {'page': 1})] == ['Issue 1.0', 'Issue 1.1']
+    db.session.expire_all()
+    assert db.session.get(GitHubCache, url).etag == '"issues-1"'
+
+def test_github_import_reports_pages_skipped_for_the_rate_limit(client, auth, project, github_stub):
+    _, headers = auth
+    db.session.get(Project, project).github_repo = 'o/r'
+    db.session.commit()
+    github_stub.rate_remaining = 6  # budget for one more page after the first
+
+    job = _run_import(client, headers, project)
+    assert job['status'] == 'succeeded', job['error']
+    assert job['result']['count'] == 4 and job['result']['truncated'] is True
+    assert 'run the import again' in job['result']['message']
+    assert sorted(github_stub) == [(1, False), (2, False)]
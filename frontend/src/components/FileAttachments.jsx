@@ -9,9 +9,59 @@ const fmt = (bytes) => {
     return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
 };
 
+const MAX_RETRIES = 5;
+
+// Hex SHA-256 of the file, for the server's end-to-end check (null where WebCrypto is unavailable)
+const sha256Hex = async (file) => {
+    if (!window.crypto?.subtle) return null;
+    const digest = await window.crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+    return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+};
+
+// Resumable chunked upload: after a dropped connection, ask the server how much
+// it has and continue from there.
+const uploadInChunks = async (taskId, file, onProgress) => {
+    const checksum = sha256Hex(file).catch(() => null);  // hashed while the chunks go up
+    const { data } = await api.post(`/attachments/task/${taskId}/uploads`, {
+        filename: file.name, size: file.size, mimetype: file.type || null
+    });
+    const url = `/attachments/uploads/${data.upload_id}`;
+    let offset = 0;
+    let retries = 0;
+    try {
+        while (offset < file.size) {
+            try {
+                const chunk = file.slice(offset, offset + data.chunk_size);
+                const res = await api.put(`${url}?offset=${offset}`, chunk, {
+                    headers: { 'Content-Type': 'application/octet-stream' }
+                });
+                offset = res.data.offset;
+                retries = 0;
+                onProgress(Math.round((offset / file.size) * 100));
+            } catch (err) {
+                if (err.response?.status === 409) {
+                    offset = err.response.data.offset;
+                } else if (!err.response && retries++ < MAX_RETRIES) {
+                    await new Promise(r => setTimeout(r, 1000 * retries));
+                    offset = (await api.get(url)).data.offset;
+                } else {
+                    throw err;
+                }
+            }
+        }
+        const sha256 = await checksum;
+        await api.post(`${url}/complete`, sha256 ? { sha256 } : {});
+    } catch (err) {
+        // Give up for good: drop the partial file and free the quota it reserved
+        api.delete(url).catch(() => {});
+        throw err;
+    }
+};
+
 const FileAttachments = ({ taskId }) => {
     const [attachments, setAttachments] = useState([]);
     const [uploading, setUploading] = useState(false);
+    const [progress, setProgress] = useState(0);
     const inputRef = useRef(null);
 
     const fetchAttachments = useCallback(async () => {
@@ -27,12 +77,9 @@ const FileAttachments = ({ taskId }) => {
         const file = e.target.files?.[0];
         if (!file) return;
         setUploading(true);
-        const form = new FormData();
-        form.append('file', file);
+        setProgress(0);
         try {
-            await api.post(`/attachments/task/${taskId}`, form, {
-                headers: { 'Content-Type': 'multipart/form-data' }
-            });
+            await uploadInChunks(taskId, file, setProgress);
             fetchAttachments();
         } catch (_e) { /* ignore */ } finally {
             setUploading(false);
@@ -62,7 +109,7 @@ const FileAttachments = ({ taskId }) => {
                     onClick={() => inputRef.current?.click()}
                     disabled={uploading}
                     className="flex items-center space-x-1 px-2 py-1 bg-gray-800 hover:bg-gray-700 border border-gray-700 rounded-lg text-xs text-gray-400 hover:text-white transition-colors disabled:opacity-40">
-                    <Upload className="w-3 h-3" /><span>{uploading ? 'Uploading…' : 'Upload'}</span>
+                    <Upload className="w-3 h-3" /><span>{uploading ? `Uploading… ${progress}%` : 'Upload'}</span>
                 </button>
             </h4>
 
@@ -6,16 +6,15 @@ import { formatDistanceToNow } from 'date-fns';
 
 const NotificationBell = () => {
     const [notifications, setNotifications] = useState([]);
-    const [unread, setUnread] = useState(0);
     const [open, setOpen] = useState(false);
     const dropdownRef = useRef(null);
     const navigate = useNavigate();
+    const unread = notifications.filter(n => !n.is_read).length;
 
     const fetchNotifications = useCallback(async () => {
         try {
             const res = await api.get('/notifications/');
             setNotifications(res.data);
-            setUnread(res.data.filter(n => !n.is_read).length);
         } catch (_err) {
             // silently ignore if user logs out
         }
@@ -24,9 +23,27 @@ const NotificationBell = () => {
     useEffect(() => {
         // Slight delay on mount to avoid synchronous setState in effect
         const timer = setTimeout(fetchNotifications, 0);
-        // Poll every 30 seconds
-        const interval = setInterval(fetchNotifications, 30000);
-        return () => { clearTimeout(timer); clearInterval(interval); };
+        const token = localStorage.getItem('token');
+        if (!token || typeof EventSource === 'undefined') {
+            // No push channel available — fall back to polling every 30 seconds
+            const interval = setInterval(fetchNotifications, 30000);
+            return () => { clearTimeout(timer); clearInterval(interval); };
+        }
+
+        // Server pushes new notifications and read deltas; the browser reconnects
+        // on its own and resends Last-Event-ID so nothing is missed.
+        const source = new EventSource(`${api.defaults.baseURL}/notifications/stream?token=${encodeURIComponent(token)}`);
+        source.addEventListener('notification', (e) => {
+            const { notification } = JSON.parse(e.data);
+            setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)].slice(0, 30));
+        });
+        source.addEventListener('read', (e) => {
+            const { id, all } = JSON.parse(e.data);
+            setNotifications(prev => prev.map(n => (all || n.id === id) ? { ...n, is_read: true } : n));
+        });
+        // Missed too many events (or the server restarted): refetch the full list
+        source.addEventListener('resync', fetchNotifications);
+        return () => { clearTimeout(timer); source.close(); };
     }, [fetchNotifications]);
 
     // Close on outside click
@@ -44,7 +61,6 @@ const NotificationBell = () => {
         try {
             await api.post('/notifications/mark-read');
             setNotifications(prev => prev.map(n => ({ ...n, is_read: true })));
-            setUnread(0);
         } catch (_err) {
             console.error('Failed to mark notifications read');
         }
@@ -55,7 +71,6 @@ const NotificationBell = () => {
             try {
                 await api.post(`/notifications/${notif.id}/read`);
                 setNotifications(prev => prev.map(n => n.id === notif.id ? { ...n, is_read: true } : n));
-                setUnread(prev => Math.max(0, prev - 1));
             } catch (_err) {/* ignore */ }
         }
         setOpen(false);
@@ -117,7 +132,7 @@ const NotificationBell = () => {
                         )}
                     </div>
                     <div className="px-4 py-2 border-t border-white/10 text-center">
-                        <span className="text-xs text-gray-600">Updates every 30 seconds</span>
+                        <span className="text-xs text-gray-600">Live updates</span>
                     </div>
                 </div>
             )}
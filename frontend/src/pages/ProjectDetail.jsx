@@ -51,6 +51,7 @@ const ProjectDetail = () => {
     const { id } = useParams();
     const navigate = useNavigate();
     const [allTasks, setAllTasks] = useState([]);
+    const [boardSeq, setBoardSeq] = useState(null);
     const [tasks, setTasks] = useState({ todo: [], in_progress: [], done: [] });
     const [commits, setCommits] = useState([]);
     const [loading, setLoading] = useState(true);
@@ -93,6 +94,9 @@ const ProjectDetail = () => {
             const tasksRes = await api.get(`/tasks/project/${id}`);
 
             setAllTasks(tasksRes.data);
+            // A fresh object each time, so a refetch always reopens the stream even if the seq is unchanged
+            const seq = tasksRes.headers['x-board-seq'];
+            setBoardSeq(seq === undefined ? null : { seq });
 
             // Fetch activities
             try {
@@ -121,6 +125,37 @@ const ProjectDetail = () => {
         fetchData();
     }, [id, fetchData]);
 
+    // Live board: apply other collaborators' deltas instead of refetching the project
+    useEffect(() => {
+        const token = localStorage.getItem('token');
+        if (boardSeq === null || !token || typeof EventSource === 'undefined') return undefined;
+        const source = new EventSource(
+            `${api.defaults.baseURL}/tasks/project/${id}/stream?token=${encodeURIComponent(token)}&last_event_id=${boardSeq.seq}`
+        );
+        const patchTask = (taskId, fn) => setAllTasks(prev => prev.map(t => t.id === taskId ? fn(t) : t));
+        const on = (type, handler) => source.addEventListener(type, (e) => handler(JSON.parse(e.data)));
+
+        on('task_created', ({ task }) => setAllTasks(prev => prev.some(t => t.id === task.id) ? prev : [...prev, task]));
+        on('task_updated', ({ id: taskId, changes }) => patchTask(taskId, t => ({ ...t, ...changes })));
+        on('task_deleted', ({ id: taskId }) => setAllTasks(prev => prev.filter(t => t.id !== taskId)));
+        on('label_assigned', ({ task_id, label }) => patchTask(task_id, t => ({
+            ...t, labels: t.labels.some(l => l.id === label.id) ? t.labels : [...t.labels, label]
+        })));
+        on('label_removed', ({ task_id, label_id }) => patchTask(task_id, t => ({
+            ...t, labels: t.labels.filter(l => l.id !== label_id)
+        })));
+        // Counts arrive as totals, so an event replayed after the snapshot is harmless
+        on('checklist_changed', ({ task_id, checklist_count, checklist_completed }) => patchTask(task_id, t => ({
+            ...t, checklist_count, checklist_completed
+        })));
+        const onComment = ({ task_id, comment_count }) => patchTask(task_id, t => ({ ...t, comment_count }));
+        on('comment_added', onComment);
+        on('comment_deleted', onComment);
+        // Stream could not be resumed: fall back to a full refetch (which reopens the stream)
+        source.addEventListener('resync', () => { source.close(); fetchData(); });
+        return () => source.close();
+    }, [id, boardSeq, fetchData]);
+
     useEffect(() => {
         // Apply filters
         const filtered = allTasks.filter(task => {
@@ -248,7 +283,15 @@ const ProjectDetail = () => {
         if (!project || !project.github_repo) return;
         setImportingIssues(true);
         try {
-            await api.post(`/github/import_issues/${project.id}`);
+            // Import runs as a background job; poll it until it finishes
+            const { data } = await api.post(`/github/import_issues/${project.id}`);
+            let job = data;
+            while (job.status === 'queued' || job.status === 'running') {
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                job = (await api.get(`/jobs/${data.job_id}`)).data;
+            }
+            if (job.status === 'failed') console.error('GitHub import failed', job.error);
+            if (job.result?.truncated) console.warn(job.result.message);
             fetchData(); // Refresh board to show new tasks
         } catch (error) {
             console.error('Failed to import issues', error);
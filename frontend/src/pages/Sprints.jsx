@@ -155,6 +155,21 @@ const Sprints = () => {
                                 <Download className="w-4 h-4" />
                                 <span>Export iCal</span>
                             </button>
+                            <button
+                                onClick={async () => {
+                                    try {
+                                        const res = await api.get(`/ical/project/${id}/subscribe`);
+                                        window.location.href = res.data.webcal_url;
+                                    } catch (_err) {
+                                        console.error('Failed to get calendar subscription link');
+                                    }
+                                }}
+                                title="Subscribe in your calendar app (auto-refreshing feed)"
+                                className="flex items-center space-x-2 bg-gray-800 hover:bg-gray-700 text-gray-300 px-3 py-2 rounded-lg font-semibold border border-gray-700 transition-colors text-sm"
+                            >
+                                <Calendar className="w-4 h-4" />
+                                <span>Subscribe</span>
+                            </button>
                             {!showForm && (
                                 <button
                                     onClick={() => setShowForm(true)}